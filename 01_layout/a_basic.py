@@ -1,6 +1,11 @@
 from dash import Dash, html, dcc
-import plotly.express as px
 import pandas as pd
+import sys
+from pathlib import Path
+
+# Make the shared helpers at the repo root importable when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.deferred import deferred_layout
 
 # Instantiates the DASH app
 app = Dash(__name__)
@@ -12,25 +17,34 @@ df = pd.DataFrame({
     "City": ["SF", "SF", "SF", "Montreal", "Montreal", "Montreal"]
 })
 
-# Figure object for the chart - bar chart
-fig = px.bar(df, x="Fruit", y="Amount", color="City", barmode="group")
 
 # Layout
 # html.Div is a standard component - can define a number of children
 # dcc.Graph - is the container for the figure
 # id - this is how components are tagged, registered and identified
-app.layout = html.Div(children=[
-    html.H1(children='Mad Dash'),
-
-    html.Div(children='''
-        Dash: A web application framework for your data.
-    '''),
-
-    dcc.Graph(
-        id='example-graph',
-        figure=fig
-    )
-])
+def build_layout():
+    # plotly.express takes a few hundred ms to import - only the first page load pays for it
+    import plotly.express as px
+
+    # Figure object for the chart - bar chart
+    fig = px.bar(df, x="Fruit", y="Amount", color="City", barmode="group")
+
+    return html.Div(children=[
+        html.H1(children='Mad Dash'),
+
+        html.Div(children='''
+            Dash: A web application framework for your data.
+        '''),
+
+        dcc.Graph(
+            id='example-graph',
+            figure=fig
+        )
+    ])
+
+
+# Built on the first page load rather than at import, then reused
+deferred_layout(app, build_layout)
 
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
@@ -1,6 +1,11 @@
 from dash import Dash, dcc, html
-import plotly.express as px
 import pandas as pd
+import sys
+from pathlib import Path
+
+# Make the shared helpers at the repo root importable when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.deferred import deferred_layout
 
 app = Dash(__name__)
 
@@ -16,36 +21,45 @@ df = pd.DataFrame({
     "City": ["SF", "SF", "SF", "Montreal", "Montreal", "Montreal"]
 })
 
-fig = px.bar(df, x="Fruit", y="Amount", color="City", barmode="group")
-
-# Can customize the figure in terms of colours
-fig.update_layout(
-    plot_bgcolor=colors['background'],
-    paper_bgcolor=colors['background'],
-    font_color=colors['text']
-)
-
-# html.Div can be styled
-# text can be formatted via 'textAlign'
-app.layout = html.Div(style={'backgroundColor': colors['background']}, children=[
-    html.H1(
-        children='Hello Dash',
-        style={
+
+def build_layout():
+    # Imported with the first layout build - plotly.express alone is a few hundred ms of start-up
+    import plotly.express as px
+
+    fig = px.bar(df, x="Fruit", y="Amount", color="City", barmode="group")
+
+    # Can customize the figure in terms of colours
+    fig.update_layout(
+        plot_bgcolor=colors['background'],
+        paper_bgcolor=colors['background'],
+        font_color=colors['text']
+    )
+
+    # html.Div can be styled
+    # text can be formatted via 'textAlign'
+    return html.Div(style={'backgroundColor': colors['background']}, children=[
+        html.H1(
+            children='Hello Dash',
+            style={
+                'textAlign': 'center',
+                'color': colors['text']
+            }
+        ),
+
+        html.Div(children='Dash: A web application framework for your data.', style={
             'textAlign': 'center',
             'color': colors['text']
-        }
-    ),
+        }),
 
-    html.Div(children='Dash: A web application framework for your data.', style={
-        'textAlign': 'center',
-        'color': colors['text']
-    }),
+        dcc.Graph(
+            id='example-graph-2',
+            figure=fig
+        )
+    ])
 
-    dcc.Graph(
-        id='example-graph-2',
-        figure=fig
-    )
-])
+
+# Built on the first page load rather than at import, then reused
+deferred_layout(app, build_layout)
 
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
@@ -1,22 +1,16 @@
 from dash import Dash, html
-import pandas as pd
+import sys
+from pathlib import Path
 
-df = pd.read_csv('https://gist.githubusercontent.com/chriddyp/c78bf172206ce24f77d6363a2d754b59/raw/c353e8ef842413cae56ae3920b8fd78468aa4cb2/usa-agricultural-exports-2011.csv')
+# Make the shared helpers at the repo root importable when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import datasets
+from common.html_table import generate_table
 
+df = datasets.load('usa_agricultural_exports_2011')
 
-# Can generate a table from data via functions
-def generate_table(dataframe, max_rows=10):
-    return html.Table([
-        html.Thead(
-            html.Tr([html.Th(col) for col in dataframe.columns])
-        ),
-        html.Tbody([
-            html.Tr([
-                html.Td(dataframe.iloc[i][col]) for col in dataframe.columns
-            ]) for i in range(min(len(dataframe), max_rows))
-        ])
-    ])
-
+# Can generate a table from data via functions - generate_table lives in common/html_table.py
+# For big frames: generate_table(df, max_rows=None, chunk_size=500, scroll_height='60vh')
 
 app = Dash(__name__)
 
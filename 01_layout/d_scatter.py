@@ -1,24 +1,65 @@
-from dash import Dash, dcc, html
-import plotly.express as px
-import pandas as pd
+from dash import Dash, dcc, html, Input, Output
+from dash.exceptions import PreventUpdate
+import sys
+from pathlib import Path
 
+# Make the shared helpers at the repo root importable when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import datasets, lod
+from common.deferred import deferred_layout
+from common.metrics import install_metrics
 
-app = Dash(__name__)
 
-df = pd.read_csv('https://gist.githubusercontent.com/chriddyp/5d1ea79569ed194d432e56108a04d188/raw/a9f9e8076b837d541398e999dcbac2b2826a81f8/gdp-life-exp-2007.csv')
+app = Dash(__name__)
+install_metrics(app)
 
 # Different type of chart - bubble.
 # Can customize what to show and how
-fig = px.scatter(df, x="gdp per capita", y="life expectancy",
-                 size="population", color="continent", hover_name="country",
-                 log_x=False, size_max=60)
-
-app.layout = html.Div([
-    dcc.Graph(
-        id='life-exp-vs-gdp',
-        figure=fig
-    )
-])
+SCATTER = dict(x="gdp per capita", y="life expectancy",
+               size="population", color="continent", hover_name="country",
+               log_x=False, size_max=60)
+
+
+def build_figure(df, x_range=None, y_range=None):
+    # Not at the top: importing plotly.express costs every start a few hundred ms
+    import plotly.express as px
+
+    # Large frames are drawn with WebGL or as a density image instead (common/lod.py)
+    if lod.needs_lod(len(df)):
+        return lod.lod_figure(df, **SCATTER, x_range=x_range, y_range=y_range)
+    return px.scatter(df, **SCATTER)
+
+
+# Loading is a memory mapped read of the cached frame; building the figure is what the deferred layout saves
+df = datasets.load('gdp_life_exp_2007')
+
+
+def build_layout():
+    return html.Div([
+        dcc.Graph(
+            id='life-exp-vs-gdp',
+            figure=build_figure(df)
+        )
+    ])
+
+
+# Zooming into a large scatter re-aggregates the points in view at full resolution. A small one has every
+# point on the client already and zooms there, so the callback is not registered and no event is sent
+def zoom_figure(relayout_data):
+    ranges = lod.relayout_ranges(relayout_data, log_x=SCATTER['log_x'])
+    if ranges is None:
+        raise PreventUpdate
+    return build_figure(df, *ranges)
+
+
+if lod.needs_lod(len(df)):
+    app.callback(Output('life-exp-vs-gdp', 'figure'),
+                 Input('life-exp-vs-gdp', 'relayoutData'),
+                 prevent_initial_call=True)(zoom_figure)
+
+
+# The figure is built on the first page load rather than at import, then reused
+deferred_layout(app, build_layout)
 
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
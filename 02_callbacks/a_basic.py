@@ -1,6 +1,15 @@
 from dash import Dash, dcc, html, Input, Output
 
+import sys
+from pathlib import Path
+
+# Make the shared helpers at the repo root importable when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.clientside import clientside_callback
+from common.metrics import install_metrics
+
 app = Dash(__name__)
+install_metrics(app)
 
 app.layout = html.Div([
     html.H6("Change the value in the text box to see callbacks in action!"),
@@ -16,10 +25,12 @@ app.layout = html.Div([
 # Inputs and outputs are just the properties of the components
 # We ìnput into the value property of my_input component
 # This is output in the children property of my_output component
+# It runs in the browser - the function is translated to JavaScript, so typing costs no server request
 
-@app.callback(
+@clientside_callback(
     Output(component_id='my-output', component_property='children'),
-    Input(component_id='my-input', component_property='value')
+    Input(component_id='my-input', component_property='value'),
+    app=app
 )
 def update_output_div(input_value):
     return f'Output: {input_value}'
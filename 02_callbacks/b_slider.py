@@ -1,11 +1,64 @@
-from dash import Dash, dcc, html, Input, Output
+from dash import Dash, dcc, html, Input, Output, State, Patch, ctx
+from dash.exceptions import PreventUpdate
 import plotly.express as px
 
-import pandas as pd
+import sys
+from pathlib import Path
+
+# Make the shared helpers at the repo root importable when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import datasets, lod
+from common.figure_payload import install_compression, slim_figure
+from common.metrics import install_metrics
+
+df = datasets.load('gapminder_five_year')
+
+# Send only the per-trace data that changes between years instead of the whole figure
+PATCH_UPDATES = True
+
+
+def build_figure(filtered_df, x_range=None, y_range=None):
+    # Large frames are drawn with WebGL or as a density image instead (common/lod.py)
+    if lod.needs_lod(len(filtered_df)):
+        return lod.lod_figure(filtered_df, x="gdpPercap", y="lifeExp", size="pop", color="continent",
+                              hover_name="country", log_x=True, size_max=55, x_range=x_range, y_range=y_range)
+
+    fig = px.scatter(filtered_df, x="gdpPercap", y="lifeExp",
+                     size="pop", color="continent", hover_name="country",
+                     log_x=True, size_max=55)
+
+    # transition_duration allows for smooth transition when the chart is changing
+    fig.update_layout(transition_duration=500)
+
+    return fig
+
+
+# Precompute stage - group the frame by year once and build every figure up front,
+# so a slider move is a dictionary lookup rather than a mask + px.scatter.
+# Figures are slimmed here too (rounded, pop as ints), so it costs nothing per request
+year_frames = {int(year): year_df for year, year_df in df.groupby('year')}
+figures = {year: slim_figure(build_figure(year_df)) for year, year_df in year_frames.items()}
+
+# Patching is only safe when every year has the same scatter traces in the same order (one per continent),
+# otherwise trace i on the client may not be trace i of the new year
+patchable = (len({tuple(trace['name'] for trace in fig['data']) for fig in figures.values()}) == 1
+             and all(trace['type'] == 'scatter' for fig in figures.values() for trace in fig['data']))
+
+
+def build_patch(figure):
+    patch = Patch()
+    for i, trace in enumerate(figure['data']):
+        patch['data'][i]['x'] = trace['x']
+        patch['data'][i]['y'] = trace['y']
+        patch['data'][i]['hovertext'] = trace['hovertext']
+        patch['data'][i]['marker']['size'] = trace['marker']['size']
+        patch['data'][i]['marker']['sizeref'] = trace['marker']['sizeref']
+    return patch
 
-df = pd.read_csv('https://raw.githubusercontent.com/plotly/datasets/master/gapminderDataFiveYear.csv')
 
 app = Dash(__name__)
+install_metrics(app)
+install_compression(app)
 
 app.layout = html.Div([
     dcc.Graph(id='graph-with-slider'),
@@ -24,18 +77,37 @@ app.layout = html.Div([
     Output('graph-with-slider', 'figure'),
     Input('year-slider', 'value'))
 def update_figure(selected_year):
-    filtered_df = df[df.year == selected_year]
+    figure = figures.get(selected_year)
+    if figure is None:
+        # Not one of the marks - build it the slow way
+        return slim_figure(build_figure(df[df.year == selected_year]))
 
-    # We regenerate a figure and return the component
-    fig = px.scatter(filtered_df, x="gdpPercap", y="lifeExp",
-                     size="pop", color="continent", hover_name="country",
-                     log_x=True, size_max=55)
+    # The initial call has nothing on the client to patch
+    if PATCH_UPDATES and patchable and ctx.triggered_id is not None:
+        return build_patch(figure)
 
-    # transition_duration allows for smooth transition when the chart is changing
-    fig.update_layout(transition_duration=500)
+    return figure
 
-    return fig
+
+# Zooming into a large year re-aggregates the points in view at full resolution. Small years have every point
+# on the client already and zoom there; if every year is small the callback is not registered at all
+def zoom_figure(relayout_data, selected_year):
+    year_df = year_frames.get(selected_year)
+    if year_df is None:
+        year_df = df[df.year == selected_year]
+    ranges = lod.relayout_ranges(relayout_data, log_x=True)
+    if ranges is None or not lod.needs_lod(len(year_df)):
+        raise PreventUpdate
+    return slim_figure(build_figure(year_df, *ranges))
+
+
+if any(lod.needs_lod(len(year_df)) for year_df in year_frames.values()):
+    app.callback(
+        Output('graph-with-slider', 'figure', allow_duplicate=True),
+        Input('graph-with-slider', 'relayoutData'),
+        State('year-slider', 'value'),
+        prevent_initial_call=True)(zoom_figure)
 
 
 if __name__ == '__main__':
-    app.run_server(debug=True)
\ No newline at end of file
+    app.run_server(debug=True)
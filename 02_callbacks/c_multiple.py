@@ -1,19 +1,38 @@
 from dash import Dash, dcc, html, Input, Output
 import plotly.express as px
 
-import pandas as pd
+import sys
+from pathlib import Path
+
+# Make the shared helpers at the repo root importable when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import datasets
+from common.indicator_cube import IndicatorCube
+from common.figure_payload import DIGITS, MIN_LENGTH, install_compression, slim_figure
+from common.memoize import memoized_callback
+from common.metrics import install_metrics
 
 app = Dash(__name__)
+install_metrics(app)
+install_compression(app)
+
+df = datasets.load('country_indicators')
+
+# Pivot once into a (Year x Indicator x Country) array - callbacks slice it instead of masking df
+cube = IndicatorCube(df)
 
-df = pd.read_csv('https://plotly.github.io/datasets/country_indicators.csv')
+# Offline, the data is a stand-in with other indicators (common/datasets.py) - default to ones it has
+indicators = df['Indicator Name'].unique()
+x_default = next((i for i in ['Fertility rate, total (births per woman)'] if i in indicators), indicators[-1])
+y_default = next((i for i in ['Life expectancy at birth, total (years)'] if i in indicators), indicators[0])
 
 app.layout = html.Div([
     html.Div([
 
         html.Div([
             dcc.Dropdown(
-                df['Indicator Name'].unique(),
-                'Fertility rate, total (births per woman)',
+                indicators,
+                x_default,
                 id='xaxis-column'
             ),
             dcc.RadioItems(
@@ -26,8 +45,8 @@ app.layout = html.Div([
 
         html.Div([
             dcc.Dropdown(
-                df['Indicator Name'].unique(),
-                'Life expectancy at birth, total (years)',
+                indicators,
+                y_default,
                 id='yaxis-column'
             ),
             dcc.RadioItems(
@@ -60,14 +79,15 @@ app.layout = html.Div([
     Input('xaxis-type', 'value'),
     Input('yaxis-type', 'value'),
     Input('year--slider', 'value'))
+# Shared between workers and restarts - keyed on the data and slim_figure's settings as well as the arguments
+@memoized_callback(maxsize=256, shared=True, version=[datasets.version('country_indicators'), DIGITS, MIN_LENGTH])
 def update_graph(xaxis_column_name, yaxis_column_name,
                  xaxis_type, yaxis_type,
                  year_value):
-    dff = df[df['Year'] == year_value]
+    # x and y are aligned by country - countries missing either indicator are dropped
+    x, y, countries = cube.pair(year_value, xaxis_column_name, yaxis_column_name)
 
-    fig = px.scatter(x=dff[dff['Indicator Name'] == xaxis_column_name]['Value'],
-                     y=dff[dff['Indicator Name'] == yaxis_column_name]['Value'],
-                     hover_name=dff[dff['Indicator Name'] == yaxis_column_name]['Country Name'])
+    fig = px.scatter(x=x, y=y, hover_name=countries)
 
     fig.update_layout(margin={'l': 40, 'b': 40, 't': 10, 'r': 0}, hovermode='closest')
 
@@ -77,7 +97,7 @@ def update_graph(xaxis_column_name, yaxis_column_name,
     fig.update_yaxes(title=yaxis_column_name,
                      type='linear' if yaxis_type == 'Linear' else 'log')
 
-    return fig
+    return slim_figure(fig)
 
 
 if __name__ == '__main__':
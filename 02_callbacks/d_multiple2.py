@@ -1,9 +1,18 @@
 from dash import Dash, dcc, html
 from dash.dependencies import Input, Output
 
+import sys
+from pathlib import Path
+
+# Make the shared helpers at the repo root importable when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.clientside import clientside_callback
+from common.metrics import install_metrics
+
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = Dash(__name__, external_stylesheets=external_stylesheets)
+install_metrics(app)
 
 app.layout = html.Div([
     dcc.Input(
@@ -21,13 +30,15 @@ app.layout = html.Div([
 ])
 
 
-@app.callback(
+# Runs in the browser (translated to JavaScript) - no server request per keystroke
+@clientside_callback(
     Output('square', 'children'),
     Output('cube', 'children'),
     Output('twos', 'children'),
     Output('threes', 'children'),
     Output('x^x', 'children'),
-    Input('num-multi', 'value'))
+    Input('num-multi', 'value'),
+    app=app)
 def callback_a(x):
     return x**2, x**3, 2**x, 3**x, x**x
 
@@ -1,8 +1,21 @@
 from dash import Dash, dcc, html, Input, Output
 
+import sys
+from pathlib import Path
+
+# Make the shared helpers at the repo root importable when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.callback_chain import CallbackChain
+from common.memoize import memoized_callback
+from common.metrics import install_metrics
+
+# Resolve the whole countries -> cities options -> city -> text chain in one request instead of three
+RESOLVE_CHAINS = True
+
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = Dash(__name__, external_stylesheets=external_stylesheets)
+install_metrics(app)
 
 all_options = {
     'America': ['New York City', 'San Francisco', 'Cincinnati'],
@@ -24,22 +37,25 @@ app.layout = html.Div([
     html.Div(id='display-selected-values')
 ])
 
+chain = CallbackChain()
 
-@app.callback(
+
+@chain.callback(
     Output('cities-radio', 'options'),
     Input('countries-radio', 'value'))
+@memoized_callback()
 def set_cities_options(selected_country):
     return [{'label': i, 'value': i} for i in all_options[selected_country]]
 
 
-@app.callback(
+@chain.callback(
     Output('cities-radio', 'value'),
     Input('cities-radio', 'options'))
 def set_cities_value(available_options):
     return available_options[0]['value']
 
 
-@app.callback(
+@chain.callback(
     Output('display-selected-values', 'children'),
     Input('countries-radio', 'value'),
     Input('cities-radio', 'value'))
@@ -49,5 +65,7 @@ def set_display_children(selected_country, selected_city):
     )
 
 
+chain.register(app, merge=RESOLVE_CHAINS)
+
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
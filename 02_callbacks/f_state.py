@@ -1,9 +1,18 @@
 from dash import Dash, dcc, html
 from dash.dependencies import Input, Output, State
 
+import sys
+from pathlib import Path
+
+# Make the shared helpers at the repo root importable when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.clientside import clientside_callback
+from common.metrics import install_metrics
+
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = Dash(__name__, external_stylesheets=external_stylesheets)
+install_metrics(app)
 
 app.layout = html.Div([
     dcc.Input(id='input-1-state', type='text', value='Montréal'),
@@ -13,10 +22,12 @@ app.layout = html.Div([
 ])
 
 
-@app.callback(Output('output-state', 'children'),
-              Input('submit-button-state', 'n_clicks'),
-              State('input-1-state', 'value'),
-              State('input-2-state', 'value'))
+# Runs in the browser (translated to JavaScript) - no server request per click
+@clientside_callback(Output('output-state', 'children'),
+                     Input('submit-button-state', 'n_clicks'),
+                     State('input-1-state', 'value'),
+                     State('input-2-state', 'value'),
+                     app=app)
 def update_output(n_clicks, input1, input2):
     return u'''
         The Button has been pressed {} times,
@@ -1,20 +1,55 @@
 from dash import Dash, Input, Output, callback, dash_table
-import pandas as pd
 import dash_bootstrap_components as dbc
+import sys
+from pathlib import Path
 
-df = pd.read_csv('https://git.io/Juf1t')
+# Make the shared helpers at the repo root importable when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import datasets
+from common.table_engine import TableEngine
+from common.metrics import install_metrics
+
+df = datasets.load('solar')
+
+# Server-side mode: the browser gets one page at a time, sorting / filtering run on the server
+SERVER_SIDE = True
+PAGE_SIZE = 25
+
+engine = TableEngine(df)
 
 app = Dash(external_stylesheets=[dbc.themes.BOOTSTRAP])
+install_metrics(app)
+
+if SERVER_SIDE:
+    table = dash_table.DataTable([], [{"name": i, "id": i} for i in df.columns], id='tbl',
+                                 page_current=0, page_size=PAGE_SIZE, page_action='custom',
+                                 sort_action='custom', sort_mode='multi', sort_by=[],
+                                 filter_action='custom', filter_query='')
+else:
+    table = dash_table.DataTable(df.to_dict('records'),[{"name": i, "id": i} for i in df.columns], id='tbl')
 
 app.layout = dbc.Container([
     dbc.Label('Click a cell in the table:'),
-    dash_table.DataTable(df.to_dict('records'),[{"name": i, "id": i} for i in df.columns], id='tbl'),
+    table,
     dbc.Alert(id='tbl_out'),
 ])
 
+if SERVER_SIDE:
+    # page_current is an output too - the engine moves it back to the last page a new filter leaves
+    @callback(Output('tbl', 'data'), Output('tbl', 'page_count'), Output('tbl', 'page_current'),
+              Input('tbl', 'page_current'), Input('tbl', 'page_size'),
+              Input('tbl', 'sort_by'), Input('tbl', 'filter_query'))
+    def update_page(page_current, page_size, sort_by, filter_query):
+        return engine.page(page_current, page_size, sort_by, filter_query)
+
 @callback(Output('tbl_out', 'children'), Input('tbl', 'active_cell'))
 def update_graphs(active_cell):
-    return str(active_cell) if active_cell else "Click the table"
+    if not active_cell:
+        return "Click the table"
+    # active_cell['row'] is relative to the page - row_id is the global row in df
+    if active_cell.get('row_id') is not None:
+        active_cell = {**active_cell, 'row': active_cell['row_id']}
+    return str(active_cell)
 
 if __name__ == "__main__":
-    app.run_server(debug=True)
\ No newline at end of file
+    app.run_server(debug=True)
@@ -1,4 +1,5 @@
-from dash import Dash, Input, Output, callback, dash_table
+from dash import Dash, Input, Output, Patch, callback, ctx, dash_table
+from dash.exceptions import PreventUpdate
 import pandas as pd
 import dash_bootstrap_components as dbc
 from dash import html
@@ -6,9 +7,19 @@ from dash import dcc
 import datetime
 import numpy as np
 import plotly.graph_objs as go
+import sys
+from pathlib import Path
+
+# Make the shared helpers at the repo root importable when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.result_store import store_from_env
+from common.metrics import install_metrics
 
 dummy_df = pd.DataFrame([[None]])
 
+# Frames stay on the server - the df_data Store only carries their key
+result_store = store_from_env()
+
 # HELPERS = callback
 # ======================================================================================================================
 @callback(Output('df_data', 'data'), Input(f'run-button', 'value'))
@@ -17,37 +28,64 @@ def generate_numbers(n_clicks: int):
     numbers = np.random.uniform(low=-10, high=15, size=(n,n))
     data = {str(x): numbers[x] for x in range(0, n)}
     df = pd.DataFrame.from_dict(data, orient='index')
-    return df.to_json()
+    return result_store.put(df)
 
 
 @callback(Output('table-average', 'data'), Input('df_data', 'data'))
-def update_table(df_string: str):
-    df = pd.read_json(df_string)
+def update_table(df_key: str):
+    df = result_store.get(df_key)
+    if df is None:
+        raise PreventUpdate
     averages = {x : np.mean(df[x]) for x in df.columns}
     df_averages = pd.DataFrame.from_dict(averages, orient='index')
     return df_averages.to_dict("records")
 
 @callback(Output(f'tbl_out', 'children'),
           [Input(f'table-average', 'active_cell'), Input('df_data', 'data')])
-def update_graphs(active_cell, df_serialised):
+def update_graphs(active_cell, df_key):
     if active_cell:
         # Take the row
         row = active_cell['row']
 
-        # Deserialise the data into a dataframe
-        df = pd.read_json(df_serialised)
+        # Resolve the key to the frame held on the server
+        df = result_store.get(df_key)
+        if df is None:
+            return "Data has expired - click Run"
         data = df[row]
 
         output = data.values.tolist()
 
-        # Graph doesnt quite work - don't know why
-        # fig = go.Bar(x=data.index.to_list(), y=data.values.tolist())
-
         return output
     else:
         return "Click on a cell"
 
 
+def build_bar_chart(df: pd.DataFrame, row):
+    y = df[row].to_numpy() if row is not None else []
+    fig = go.Figure(go.Bar(x=df.index.to_list(), y=y))
+    fig.update_layout(title_text=f'Row {row}' if row is not None else 'Click on a cell', template='plotly_dark')
+    return fig
+
+
+# A click on another row only changes the bar heights: the chart is built in full when new numbers are run,
+# and a click afterwards sends a Patch replacing the trace's y (and the title) - the x labels, layout and
+# template already on the client are left alone. The row is read from the frame held in result_store.
+@callback(Output('bar_chart', 'figure'),
+          [Input('table-average', 'active_cell'), Input('df_data', 'data')])
+def update_bar_chart(active_cell, df_key):
+    df = result_store.get(df_key)
+    if df is None:
+        raise PreventUpdate
+    row = active_cell['row'] if active_cell else None
+
+    if ctx.triggered_id != 'table-average' or row is None:
+        return build_bar_chart(df, row)
+
+    patch = Patch()
+    patch['data'][0]['y'] = df[row].to_numpy()
+    patch['layout']['title']['text'] = f'Row {row}'
+    return patch
+
 
 # HELPERS = layout
 # ======================================================================================================================
@@ -86,6 +124,7 @@ def build_layout():
 # ======================================================================================================================
 app = Dash(external_stylesheets=[dbc.themes.SLATE])
 app.layout = build_layout()
+install_metrics(app)
 
 if __name__ == "__main__":
     app.run_server(debug=True)
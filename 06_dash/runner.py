@@ -1,28 +1,97 @@
-from dash import Dash, Input, Output, callback, dash_table, State
+from dash import Dash, Input, Output, callback, ctx, dash_table, State, DiskcacheManager, ALL
+from dash.exceptions import PreventUpdate
 import pandas as pd
 import dash_bootstrap_components as dbc
 from dash import html
 from dash import dcc
 import datetime
 import numpy as np
-
-# Create dummy data
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+import diskcache
+import dash
+
+# Make the shared helpers at the repo root importable when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.result_store import store_from_env
+from common import model_jobs
+from common.fva_model import run_fva_model
+from common.market_data import (CURRENCIES, SECTORS, SpreadCube, bucket_years, generate_constituents,
+                                generate_spread_cube)
+from common.history_store import HistoryStore
+from common.table_diff import frame_key, highlight_styles, table_update
+from common.index_engine import IndexEngine
+from common.metrics import install_metrics
+from common.memoize import MemoCache, normalize_key
+from common.clientside import clientside_callback
+from common.push import LIVE_PORT, PushHub
+from common.launcher import designated_worker
+
+# Frames stay on the server - the df_data Store only carries their key
+result_store = store_from_env()
+
+# Background jobs (model runs) and their results share one on-disk cache - no external broker needed
+job_cache = diskcache.Cache(os.environ.get('DASH_JOB_CACHE_DIR',
+                                           Path(__file__).resolve().parents[1] / '.cache' / 'jobs'))
+background_callback_manager = DiskcacheManager(job_cache)
+MODEL_CURRENCIES = ['GBP', 'EUR', 'USD']
+
+# Create dummy data - seeded, so every worker process shows the same grid (see common/market_data.py)
 ratings = ['AAA', 'AA', 'A', 'BBB']
 buckets = ['3y', '5y', '7y', '10y', '12y', '15y', '20y', '25y', '30y', '35y', '40y', '70y']
 
-dummy_data = {}
-for b in buckets:
-    dummy_data[b] = {r: int(np.random.uniform(low=20, high=100, size=(1,))[0]) for r in ratings}
-
-dummy_df = pd.DataFrame.from_records(dummy_data, index=ratings)
-dummy_df = dummy_df[buckets]
-dummy_df.reset_index(inplace=True)
-dummy_df.rename(columns={'index': 'Rating'}, inplace=True)
+dummy_df = generate_spread_cube(currencies=['GBP'], sectors=['fin'], ratings=ratings, buckets=buckets).grid()
+DUMMY_DF_KEY = result_store.put(dummy_df, key='dummy_df', ttl=None)
+
+# CoB history - one (currency x sector x rating x bucket) grid per date, memory-mapped (common/history_store.py).
+# Only the batch job appends to it, once per CoB:  python 06_dash/runner.py --append-cob [YYYY-MM-DD]
+# runs the model for every currency and appends the CoB if it is after the last one and not after the last
+# business day (record_history). Model runs from the app never touch it. A new store is backfilled with
+# synthetic history up to the business day before the last, which leaves the last one to the batch job.
+HISTORY_DAYS = 2 * 260
+HISTORY_CHART_DAYS = 260
+HISTORY_CHART_BUCKET = '10y'
+history = HistoryStore(os.environ.get('COB_HISTORY_DIR',
+                                      Path(__file__).resolve().parents[1] / '.cache' / 'cob_history'),
+                       axes={'currency': CURRENCIES, 'sector': SECTORS, 'rating': ratings, 'bucket': buckets})
+
+
+def last_business_day() -> pd.Timestamp:
+    """Today, or the Friday before on a weekend - the latest CoB there can be data for."""
+    return pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=1)[0]
+
+
+if not len(history):
+    backfill = generate_spread_cube(dates=pd.bdate_range(end=last_business_day() - pd.offsets.BDay(1),
+                                                         periods=HISTORY_DAYS),
+                                    ratings=ratings, buckets=buckets)
+    try:
+        history.append_many(backfill.dates, backfill.values)
+    except ValueError:
+        pass  # another worker backfilled it first
+
+# Custom indices are aggregated over synthetic constituents priced off the CoB's grid (common/index_engine.py)
+CUSTOM_CONSTITUENTS = int(os.environ.get('CUSTOM_INDEX_CONSTITUENTS', 5000))
+CUSTOM_DEFAULT_BUCKETS = ['5y', '10y', '30y']
+INDEX_ENGINE_CACHE_SIZE = 4
+# CoB -> IndexEngine, a locked LRU of the last few CoBs; an engine is built once when sessions ask together
+index_engines = MemoCache('06_dash.index_engines', maxsize=INDEX_ENGINE_CACHE_SIZE)
+
+# Live spreads are pushed to the open currency tab over Server-Sent Events (common/push.py): one stand-in feed
+# ticks every LIVE_TICK seconds, each browser is sent the latest tick at most every LIVE_INTERVAL seconds
+LIVE_TICK = float(os.environ.get('LIVE_TICK_SECONDS', 0.1))
+LIVE_INTERVAL = float(os.environ.get('LIVE_INTERVAL_SECONDS', 0.5))
+LIVE_VOL = 0.001          # per tick, on the log spread
+LIVE_CHART_POINTS = 600   # live points kept on a chart, after its history
+live_hub = PushHub(port=LIVE_PORT, topics=MODEL_CURRENCIES, min_interval=LIVE_INTERVAL)
 
 
 # CALLBACKS
 # ======================================================================================================================
-@callback(
+@clientside_callback(
     Output(f'fade_desc', "is_in"),
     [Input(f'btn_desc', "n_clicks")],
     [State(f'fade_desc', "is_in")],
@@ -34,20 +103,172 @@ def toggle_description_fade(n, is_in):
     return not is_in
 
 
+# Rendered tab bodies keyed by (tab, CoB date, currency) and the versions of what they are built from - the
+# model result of (CoB, currency) and the length of the history - shared by every session: a locked LRU of
+# the last TAB_CACHE_SIZE bodies, built once when several sessions ask at the same time (common/memoize.py).
+# Alongside the body goes {table id: key of the frame it shows} - what this client has been sent - into the
+# viewer_tables Store; the frames themselves stay in result_store.
+TAB_CACHE_SIZE = 64
+tab_cache = MemoCache('06_dash.viewer_tabs', maxsize=TAB_CACHE_SIZE)
+
+
+@callback(
+    [Output(f'viewer_content', "children"), Output(f'viewer_tables', "data")],
+    [Input(f'viewer_tabs', "active_tab"), Input(f'date_input', "date")],
+)
+def render_viewer_tab(active_tab, cob):
+    _, builder, currency = VIEWER_TABS[active_tab]
+    key = normalize_key(active_tab, cob, currency, model_jobs.result_version(job_cache, cob, currency), len(history))
+    return tab_cache.get_or_compute(key, lambda: builder(currency, cob))
+
+
+# A finished model run refreshes the open tab's tables in place: each table gets only the cells that differ
+# from what this client was sent (common/table_diff.py), highlighted until the next refresh
+@callback(
+    [Output({'type': 'viewer_table', 'index': ALL}, "data"),
+     Output({'type': 'viewer_table', 'index': ALL}, "style_data_conditional"),
+     Output(f'viewer_tables', "data", allow_duplicate=True)],
+    Input(f'model_run', "data"),
+    [State(f'date_input', "date"), State(f'viewer_tables', "data"), State(f'live_toggle', "value")],
+    prevent_initial_call=True,
+)
+def refresh_viewer_tables(model_run, cob, sent, live):
+    if not model_run or model_run['cob'] != cob:
+        raise PreventUpdate  # the run was for another CoB than the one on screen
+    sent = dict(sent or {}) if not live else {}
+    data, styles = [], []
+    for output in ctx.outputs_list[0]:
+        table_id = output['id']['index']
+        currency, sector = VIEWER_TABLES[table_id]
+        df = viewer_frame(currency, sector, cob)
+        update, changed = table_update(result_store.get(sent.get(table_id)), df)
+        data.append(update)
+        styles.append(highlight_styles(changed, TABLE_STYLE_CONDITIONAL))
+        sent[table_id] = remember_frame(df)
+    return data, styles, sent
+
+
+# Live toggle / tab change: (re)connects the page's EventSource to the open tab's currency. Each message sets the
+# tables' data and extends the charts in the browser - no request back to Dash. The server's record of what
+# the tables show (viewer_tables) is void while live, so the next model run refresh sends them in full.
+LIVE_JS = """
+function(on, active_tab, config) {
+    var dc = window.dash_clientside;
+    var live = window.liveViewer = window.liveViewer || {};
+    var was_on = !!live.source;
+    if (live.source) {
+        live.source.close();
+        live.source = null;
+    }
+    var currency = config.tabs[active_tab];
+    if (!on || !currency) {
+        return [on ? 'Live: no live data on this tab' : '', was_on ? {} : dc.no_update];
+    }
+    // The hub only speaks plain HTTP - not the page's protocol, which may be https behind a TLS proxy
+    var url = 'http://' + window.location.hostname + ':' + config.port + '/' + currency
+              + '?interval=' + config.interval;
+    var source = live.source = new EventSource(url);
+    source.onmessage = function (event) {
+        var message = JSON.parse(event.data);
+        Object.keys(message.tables).forEach(function (id) {
+            dc.set_props({type: 'viewer_table', index: id}, {data: message.tables[id]});
+        });
+        Object.keys(message.graphs).forEach(function (id) {
+            dc.set_props(id, {extendData: message.graphs[id].concat([config.max_points])});
+        });
+        dc.set_props('live_status', {children: 'Live: ' + message.time});
+    };
+    source.onerror = function () {
+        dc.set_props('live_status', {children: 'Live: reconnecting'});
+    };
+    return ['Live: connecting', {}];
+}
+"""
+dash.clientside_callback(
+    LIVE_JS,
+    [Output(f'live_status', "children"), Output(f'viewer_tables', "data", allow_duplicate=True)],
+    [Input(f'live_toggle', "value"), Input(f'viewer_tabs', "active_tab")],
+    State(f'live_config', "data"),
+    prevent_initial_call=True,
+)
+
+
+@callback(
+    [Output(f'tbl_custom', "data"), Output(f'graph_custom', "figure"), Output(f'custom_summary', "children")],
+    [Input(f'custom_ratings', "value"), Input(f'custom_buckets', "value"),
+     Input(f'custom_currencies', "value"), Input(f'custom_sectors', "value")],
+    State(f'date_input', "date"),
+)
+def update_custom_index(custom_ratings, custom_buckets, custom_currencies, custom_sectors, cob):
+    engine = index_engine(cob)
+    result = engine.index(custom_ratings, custom_buckets, custom_currencies, custom_sectors)
+
+    spread = result['spread'].round(1)
+    table = spread.astype(object).where(spread.notna(), None).reset_index(names='Rating')
+    years = bucket_years(spread.columns).tolist()
+    lines = [{'type': 'scatter', 'mode': 'lines+markers', 'name': row, 'x': years, 'y': spread.loc[row].tolist()}
+             for row in spread.index]
+
+    count, notional = int(result['count'].loc['Index'].sum()), result['notional'].loc['Index'].sum()
+    summary = f'{count:,} of {engine.size:,} constituents, notional {notional:,.0f}mm'
+    return table.to_dict('records'), graph_figure(lines, 'Custom index spread (bp) by bucket (years)'), summary
+
+
+# Runs the model for every currency in parallel on a process pool, inside a background job. Clicking
+# again (e.g. after changing the CoB) cancels the running job; currencies already computed for that CoB
+# are reused and ones being computed by another session are waited on instead of started again.
+@callback(
+    Output(f'model_run', "data"),
+    Input(f'btn_run_model', "n_clicks"),
+    State(f'date_input', "date"),
+    background=True,
+    manager=background_callback_manager,
+    progress=Output(f'status_progress', "children"),
+    prevent_initial_call=True,
+)
+def run_model(set_progress, n_clicks, cob):
+    start = time.perf_counter()
+    status = model_jobs.run_currencies(job_cache, run_fva_model, cob, MODEL_CURRENCIES, args=(ratings, buckets),
+                                       progress=lambda s: set_progress(build_status_lines(cob, s)))
+    return {'cob': cob, 'status': status, 'seconds': time.perf_counter() - start,
+            'finished': datetime.datetime.now().isoformat()}
+
+
+@callback(
+    Output(f'status_last_run', "children"),
+    Input(f'model_run', "data"),
+)
+def show_last_run(model_run):
+    if not model_run:
+        return "Model not run yet"
+    return f"Last run: CoB {model_run['cob']} in {model_run['seconds']:.1f}s"
+
+
 # Standard components
 # ======================================================================================================================
-def build_dash_graph(id: str):
-    style = {'width': '72vh', 'height': '60vh'}
+def graph_figure(data: list = None, title: str = None):
     colors = {'background': '#262626', 'text': '#cc7a00'}
 
-    figure = {'layout': {'plot_bgcolor': colors['background'],
-                         'paper_bgcolor': colors['background'],
-                         'font': {'color': colors['text']}}}
+    return {'data': data or [],
+            'layout': {'plot_bgcolor': colors['background'],
+                       'paper_bgcolor': colors['background'],
+                       'font': {'color': colors['text']},
+                       'title': {'text': title}}}
+
+
+def build_dash_graph(id: str, data: list = None, title: str = None):
+    style = {'width': '72vh', 'height': '60vh'}
+
+    return dcc.Graph(id=id, style=style, figure=graph_figure(data, title))
+
 
-    return dcc.Graph(id=id, style=style, figure=figure)
+TABLE_STYLE_CONDITIONAL = [{'if': {'state': 'active'},
+                            'backgroundColor': '#cc7a00',
+                            'border': '1px solid #cc7a00'
+                            }]
 
 
-def build_dash_table(id: str, data):
+def build_dash_table(id, data):
     table = dash_table.DataTable(id=id, data=data,
                                  style_cell={'textAlign': 'center'},
                                  style_header={'backgroundColor': 'rgb(50, 50, 50)',
@@ -56,10 +277,7 @@ def build_dash_table(id: str, data):
                                  style_data={'backgroundColor': 'rgb(80, 80, 80)',
                                              'color': 'white',
                                              'border': '1px black'},
-                                 style_data_conditional=[{'if': {'state': 'active'},
-                                                          'backgroundColor': '#cc7a00',
-                                                          'border': '1px solid #cc7a00'
-                                                          }])
+                                 style_data_conditional=TABLE_STYLE_CONDITIONAL)
 
     return table
 
@@ -69,9 +287,10 @@ def build_dash_table(id: str, data):
 # Input card
 def build_card_user_inputs(id: str):
     date_picker = dcc.DatePickerSingle(id=f'date_input',
-                                       initial_visible_month=datetime.date.today(),
+                                       initial_visible_month=last_business_day().date(),
                                        display_format='DD/MM/YYYY',
-                                       date=datetime.date.today(),
+                                       date=last_business_day().date(),
+                                       max_date_allowed=last_business_day().date(),
                                        style={'font-size': '6px', 'display': 'inline-block'})
 
     input_tabs = dbc.Tabs([dbc.Tab(id=f'tab_input_buckets', label='Buckets'),
@@ -102,46 +321,203 @@ def build_card_user_analysis(id: str):
     return dbc.Card([body], id=id, style={"margin-left": "15px"})
 
 # Status card
+def build_status_lines(cob: str, status: dict):
+    lines = [html.Div(f'Running CoB {cob}')]
+    for currency, s in status.items():
+        timing = f" ({s['seconds']:.1f}s)" if s['state'] == 'done' else ''
+        lines.append(html.Div(f"{currency}: {s['state']}{timing}"))
+    # A single component - set_progress treats a list as one value per progress output
+    return html.Div(lines)
+
+
 def build_card_app_status(id: str):
     body = dbc.CardBody([html.H6("APP STATUS"),
-                         html.Hr()])
+                         html.Hr(),
+                         html.Div(id=f'status_progress'),
+                         html.Div(id=f'status_last_run'),
+                         html.Br(),
+                         dbc.Switch(id=f'live_toggle', label='Live spreads', value=False),
+                         html.Div(id=f'live_status')])
     return dbc.Card([body], id=id, style={"margin-left": "15px"})
 
 
-# Viewer card
+# Viewer card - tab bodies are rendered on demand by render_viewer_tab
+def history_grid(currency: str, sector: str, cob: str):
+    """(rating x bucket) grid of the CoB - or the last one before it - from the history, in the table layout."""
+    _, grid = history.asof(cob)
+    if grid is None:
+        return None
+    df = pd.DataFrame(grid[history.locate(currency=currency, sector=sector)].round().astype(int), columns=buckets)
+    df.insert(0, 'Rating', ratings)
+    return df
+
+
+def history_series(currency: str, sector: str, cob: str) -> list:
+    """One line per rating of the chart bucket over the year up to the CoB - sliced from the mapping, not copied."""
+    dates, values = history.range(end=cob)
+    dates, values = dates[-HISTORY_CHART_DAYS:], values[-HISTORY_CHART_DAYS:]
+    series = values[(slice(None),) + history.locate(currency=currency, sector=sector, bucket=HISTORY_CHART_BUCKET)]
+    x = dates.strftime('%Y-%m-%d').tolist()
+    return [{'type': 'scatter', 'mode': 'lines', 'name': rating, 'x': x, 'y': series[:, i].round(1)}
+            for i, rating in enumerate(ratings)]
+
+
+def viewer_frame(currency: str, sector: str, cob: str) -> pd.DataFrame:
+    """Model output for this CoB if it has been run, the CoB's history otherwise, the dummy grid failing both."""
+    results = model_jobs.get_result(job_cache, cob, currency)
+    df = results[sector] if results else history_grid(currency, sector, cob)
+    return df if df is not None else dummy_df
+
+
+def record_history(cob: str) -> bool:
+    """Appends the model output of a CoB to the history if every currency has run and the CoB is after the last
+    one, and not after the last business day - history is never rewritten. True if it was appended."""
+    if pd.Timestamp(cob) > last_business_day():
+        return False
+    results = [model_jobs.get_result(job_cache, cob, currency) for currency in CURRENCIES]
+    if any(result is None for result in results):
+        return False
+    grid = np.stack([np.stack([result[sector].set_index('Rating').loc[ratings, buckets].to_numpy()
+                               for sector in SECTORS]) for result in results])
+    try:
+        history.append(cob, grid)
+    except ValueError:
+        return False  # an earlier CoB, or another session's run appended it first
+    return True
+
+
+def remember_frame(df: pd.DataFrame) -> str:
+    """Keeps a frame sent to a table in result_store and returns its key, for the next diff."""
+    return result_store.put(df, key=frame_key(df))
+
+
+def build_tab_currency(currency: str, cob: str):
+    ccy = currency.lower()
+    tables, graphs, sent = [], [], {}
+    for sector in ['fin', 'nonfin']:
+        table_id = f'tbl_{ccy}_{sector}'
+        df = viewer_frame(currency, sector, cob)
+        sent[table_id] = remember_frame(df)
+        tables.append(dbc.Col(build_dash_table(id={'type': 'viewer_table', 'index': table_id},
+                                               data=df.to_dict('records'))))
+        graphs.append(dbc.Col(build_dash_graph(id=f'scatter_{ccy}_{sector}',
+                                               data=history_series(currency, sector, cob),
+                                               title=f'{currency} {sector} {HISTORY_CHART_BUCKET} spread (bp)')))
+    return [html.Br(),
+            dbc.Row(tables),
+            html.Br(),
+            dbc.Row(graphs)], sent
+
+
+# Live feed - a stand-in for a market data subscription, started with the push server (start_live)
+def live_message(grid: np.ndarray, currency: str, stamp: str) -> dict:
+    """One tick of a currency tab: the records of its tables and a point per rating for its charts."""
+    ccy, chart_bucket = currency.lower(), buckets.index(HISTORY_CHART_BUCKET)
+    tables, graphs = {}, {}
+    for sector in SECTORS:
+        values = grid[history.locate(currency=currency, sector=sector)]
+        tables[f'tbl_{ccy}_{sector}'] = [{'Rating': rating, **dict(zip(buckets, row))}
+                                         for rating, row in zip(ratings, values.round().astype(int).tolist())]
+        # extendData: [{'x': [[x] per trace], 'y': [[y] per trace]}, trace indices]
+        points = values[:, chart_bucket].round(1).tolist()
+        graphs[f'scatter_{ccy}_{sector}'] = [{'x': [[stamp]] * len(ratings), 'y': [[p] for p in points]},
+                                             list(range(len(ratings)))]
+    return {'time': stamp, 'tables': tables, 'graphs': graphs}
+
+
+def run_live_feed():
+    """Random walk off the latest CoB's grid. A tick is computed once for every session, and not at all for
+    currencies nobody is watching."""
+    _, grid = history.asof(datetime.date.today())
+    if grid is None:
+        grid = generate_spread_cube(ratings=ratings, buckets=buckets).values[0]
+    base, moves = np.array(grid), np.zeros(grid.shape)
+    rng = np.random.default_rng()
+    while True:
+        time.sleep(LIVE_TICK)
+        watched = [currency for currency in MODEL_CURRENCIES if live_hub.subscribers(currency)]
+        moves = 0.999 * moves + LIVE_VOL * rng.standard_normal(moves.shape)
+        if watched:
+            live = base * np.exp(moves)
+            now = datetime.datetime.now().isoformat(sep=' ', timespec='milliseconds')
+            for currency in watched:
+                live_hub.publish(currency, live_message(live, currency, now))
+
+
+def start_live():
+    """Runs before every request; starts the hub and the feed in the launcher's designated worker only - never in
+    the master, whose warm-up requests come before it forks."""
+    if designated_worker() and live_hub.start():
+        threading.Thread(target=run_live_feed, name='live-feed', daemon=True).start()
+
+
+def build_tab_usd_muni(currency: str, cob: str):
+    return [], {}
+
+
+def index_engine(cob: str) -> IndexEngine:
+    """The custom index engine of a CoB, over constituents priced off its grid in the history."""
+    day, grid = history.asof(cob)
+
+    def build():
+        if grid is None:
+            cube = generate_spread_cube(dates=[cob], ratings=ratings, buckets=buckets)
+        else:
+            cube = SpreadCube(grid[None], [day], CURRENCIES, SECTORS, ratings, buckets)
+        constituents = generate_constituents(cube, CUSTOM_CONSTITUENTS, seed=cube.dates[0].toordinal())
+        return IndexEngine(constituents, ratings, buckets)
+
+    # CoBs before the history each get their own synthetic grid, so they key on the CoB itself
+    return index_engines.get_or_compute(normalize_key(str(day.date()) if day is not None else cob), build)
+
+
+def build_custom_selection(id: str, label: str, options: list, value: list):
+    return dbc.Col([dbc.Label(label, html_for=id),
+                    dbc.Checklist(id=id, options=options, value=value, inline=True)])
+
+
+def build_tab_custom(currency: str, cob: str):
+    # Ratings / buckets / currencies / sectors of the index - update_custom_index aggregates on every change
+    selections = dbc.Row([build_custom_selection(f'custom_ratings', 'Ratings', ratings, ratings),
+                          build_custom_selection(f'custom_buckets', 'Buckets', buckets, CUSTOM_DEFAULT_BUCKETS),
+                          build_custom_selection(f'custom_currencies', 'Currencies', CURRENCIES, CURRENCIES),
+                          build_custom_selection(f'custom_sectors', 'Sectors', SECTORS, SECTORS)])
+    return [html.Br(),
+            selections,
+            html.Div(id=f'custom_summary'),
+            html.Br(),
+            dbc.Row([dbc.Col(build_dash_table(id=f'tbl_custom', data=[])),
+                     dbc.Col(build_dash_graph(id=f'graph_custom'))])], {}
+
+
+# tab id -> (label, builder, currency)
+VIEWER_TABS = {'tab_gbp': ('GBP', build_tab_currency, 'GBP'),
+               'tab_eur': ('EUR', build_tab_currency, 'EUR'),
+               'tab_usd': ('USD', build_tab_currency, 'USD'),
+               'tab_usd_muni': ('USD Muni', build_tab_usd_muni, 'USD'),
+               'tab_custom': ('Custom', build_tab_custom, None)}
+
+# table id -> (currency, sector), for the tables of the currency tabs
+VIEWER_TABLES = {f'tbl_{currency.lower()}_{sector}': (currency, sector)
+                 for currency in MODEL_CURRENCIES for sector in ['fin', 'nonfin']}
+
+
+# What the live clientside callback needs: the push port, and the currency of each tab with live tables
+LIVE_CONFIG = {'port': LIVE_PORT, 'interval': LIVE_INTERVAL, 'max_points': HISTORY_CHART_DAYS + LIVE_CHART_POINTS,
+               'tabs': {tab_id: currency for tab_id, (_, builder, currency) in VIEWER_TABS.items()
+                        if builder is build_tab_currency}}
+
+
 def build_card_viewer(id: str):
-    # Build tabs
-    tab_gbp_content = [html.Br(),
-                       dbc.Row([dbc.Col(build_dash_table(id=f'tbl_gbp_fin', data=dummy_df.to_dict('records'))),
-                                dbc.Col(build_dash_table(id=f'tbl_gbp_nonfin', data=dummy_df.to_dict('records')))]),
-                       html.Br(),
-                       dbc.Row([dbc.Col(build_dash_graph(id=f'scatter_gbp_fin')),
-                                dbc.Col(build_dash_graph(id=f'scatter_gbp_nonfin'))])]
-
-    tab_eur_content = [html.Br(),
-                       dbc.Row([dbc.Col(build_dash_table(id=f'tbl_eur_fin', data=dummy_df.to_dict('records'))),
-                                dbc.Col(build_dash_table(id=f'tbl_eur_nonfin', data=dummy_df.to_dict('records')))]),
-                       html.Br(),
-                       dbc.Row([dbc.Col(build_dash_graph(id=f'scatter_eur_fin')),
-                                dbc.Col(build_dash_graph(id=f'scatter_eur_nonfin'))])]
-
-    tab_usd_content = [html.Br(),
-                       dbc.Row([dbc.Col(build_dash_table(id=f'tbl_usd_fin', data=dummy_df.to_dict('records'))),
-                                dbc.Col(build_dash_table(id=f'tbl_usd_nonfin', data=dummy_df.to_dict('records')))]),
-                       html.Br(),
-                       dbc.Row([dbc.Col(build_dash_graph(id=f'scatter_usd_fin')),
-                                dbc.Col(build_dash_graph(id=f'scatter_usd_nonfin'))])]
-
-    # Combine into a list
-    viewer_tabs = dbc.Tabs([dbc.Tab(tab_gbp_content, id=f'tab_gbp', label='GBP'),
-                            dbc.Tab(tab_eur_content, id=f'tab_eur', label='EUR'),
-                            dbc.Tab(tab_usd_content, id=f'tab_usd', label='USD'),
-                            dbc.Tab(id=f'tab_usd_muni', label='USD Muni'),
-                            dbc.Tab(id=f'tab_custom', label='Custom')])
+    # Tabs only carry their labels - the active one is rendered into viewer_content
+    viewer_tabs = dbc.Tabs([dbc.Tab(id=tab_id, tab_id=tab_id, label=label)
+                            for tab_id, (label, _, _) in VIEWER_TABS.items()],
+                           id=f'viewer_tabs', active_tab='tab_gbp')
 
     body = dbc.CardBody([html.H6("INDEX VIEWER"),
                          html.Hr(),
-                         viewer_tabs])
+                         viewer_tabs,
+                         html.Div(id=f'viewer_content')])
 
     return dbc.Card([body], id=id, style={"margin-left": "15px"})
 
@@ -183,8 +559,11 @@ def build_layout():
                                      dbc.Row([build_card_app_status(f'card_status')])], width=2),
                             dbc.Col([build_card_viewer(id=f'card_viewer')], width=10)])]
 
-    # Define the data store
-    dcc_stores = [dcc.Store(id=f'df_data')]
+    # Define the data store - holds a result store key, resolve it with result_store.get
+    dcc_stores = [dcc.Store(id=f'df_data', data=DUMMY_DF_KEY),
+                  dcc.Store(id=f'model_run'),
+                  dcc.Store(id=f'viewer_tables'),
+                  dcc.Store(id=f'live_config', data=LIVE_CONFIG)]
 
     # Define the main layout
 
@@ -196,8 +575,27 @@ def build_layout():
 
 # CREATE THE APP + assign layout
 # ======================================================================================================================
-app = Dash(external_stylesheets=[dbc.themes.SLATE])
+# Tab contents (and their ids) only exist once rendered, so callbacks may target ids not in the initial layout
+app = Dash(external_stylesheets=[dbc.themes.SLATE], suppress_callback_exceptions=True,
+           background_callback_manager=background_callback_manager)
 app.layout = build_layout()
+install_metrics(app)
+app.server.before_request(start_live)
+
+
+
+def append_cob(cob: str) -> bool:
+    """The batch job: runs the model for every currency of the CoB, then appends it to the history."""
+    if pd.Timestamp(cob) > last_business_day():
+        return False  # no data for it yet - not worth a model run
+    model_jobs.run_currencies(job_cache, run_fva_model, cob, CURRENCIES, args=(ratings, buckets))
+    return record_history(cob)
+
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--append-cob':
+        cob = sys.argv[2] if len(sys.argv) > 2 else str(last_business_day().date())
+        appended = append_cob(cob)
+        print(f"CoB {cob} {'appended to' if appended else 'not appended to'} the history ({len(history)} CoBs)")
+        sys.exit(0 if appended else 1)
     app.run_server(debug=True)
@@ -0,0 +1,139 @@
+# Chained callbacks (common/callback_chain.py): round trips and latency of one user change with every link
+# a separate callback against the chain resolved server side in one request.
+#
+#   python benchmarks/bench_callback_chain.py [--rtt 0 20 80]
+#
+# A small stand-in for the Dash renderer drives the Flask test client: it sends the callbacks triggered by a
+# change in waves, holding back any callback with an input still to be produced upstream, as the browser
+# does. Every wave is one network round trip; --rtt adds that many ms per wave to the measured server time.
+import argparse
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+from dash import Dash, Input, Output, dcc, html
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from common.callback_chain import CallbackChain
+
+DEPTHS = [5, 10]
+
+
+def load_module(path: Path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def deep_chain(depth: int) -> CallbackChain:
+    # stage-0 -> stage-1 -> ... -> stage-depth, each link a separate callback
+    chain = CallbackChain()
+    for i in range(1, depth + 1):
+        chain.callback(Output(f'stage-{i}', 'children'), Input(f'stage-{i - 1}', 'children'))(
+            lambda value: f'{value}+1')
+    return chain
+
+
+def deep_layout(depth: int):
+    return html.Div([dcc.Input(id='stage-0', value='0')] + [html.Div(id=f'stage-{i}') for i in range(1, depth + 1)])
+
+
+class Renderer:
+    def __init__(self, app):
+        self.client = app.server.test_client()
+        self.deps = self.client.get('/_dash-dependencies').get_json()
+        for dep in self.deps:
+            dep['output_keys'] = set(dep['output'].strip('.').split('...'))
+            dep['input_keys'] = {f"{i['id']}.{i['property']}" for i in dep['inputs']}
+
+    def downstream(self, callbacks: set) -> set:
+        outputs, frontier = set(), set(callbacks)
+        while frontier:
+            new = set().union(*(self.deps[i]['output_keys'] for i in frontier)) - outputs
+            outputs |= new
+            frontier = {i for i, d in enumerate(self.deps) if d['input_keys'] & new}
+        return outputs
+
+    def post(self, dep, values: dict, changed: set) -> dict:
+        outputs = [dict(zip(('id', 'property'), key.split('.'))) for key in dep['output'].strip('.').split('...')]
+        body = {'output': dep['output'], 'outputs': outputs if dep['output'].startswith('..') else outputs[0],
+                'inputs': [{**i, 'value': values.get(f"{i['id']}.{i['property']}")} for i in dep['inputs']],
+                'state': [{**s, 'value': values.get(f"{s['id']}.{s['property']}")} for s in dep['state']],
+                'changedPropIds': sorted(changed & dep['input_keys'])}
+        response = self.client.post('/_dash-update-component', json=body)
+        if response.status_code == 204:
+            return {}
+        return {f'{cid}.{prop}': value for cid, props in response.get_json()['response'].items()
+                for prop, value in props.items()}
+
+    def change(self, values: dict, key: str, value):
+        """Applies a user change and runs everything downstream; returns (requests, waves, server seconds)."""
+        values[key] = value
+        changed = {key}
+        triggered = {i for i, d in enumerate(self.deps) if d['input_keys'] & changed}
+        requests = waves = 0
+        start = time.perf_counter()
+        while triggered:
+            blocked = {i for i in triggered if self.deps[i]['input_keys'] & self.downstream(triggered - {i})}
+            ready = (triggered - blocked) or triggered
+            updates = {}
+            for i in ready:
+                updates.update(self.post(self.deps[i], values, changed))
+                requests += 1
+            waves += 1
+            values.update(updates)
+            changed = set(updates)
+            triggered = (triggered - ready) | {i for i, d in enumerate(self.deps)
+                                                if d['input_keys'] & (changed - d['output_keys'])}
+        return requests, waves, time.perf_counter() - start
+
+
+def measure(build, key: str, values: list, repeat: int = 50):
+    results = {}
+    for merge in (False, True):
+        renderer = Renderer(build(merge))
+        state = {}
+        renderer.change(state, key, values[0])
+        runs = [renderer.change(state, key, values[(n + 1) % len(values)]) for n in range(repeat)]
+        requests, waves, _ = runs[-1]
+        results[merge] = requests, waves, min(r[2] for r in runs), dict(state)
+    assert results[False][3] == results[True][3], 'chained and resolved runs ended in different states'
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rtt', type=float, nargs='+', default=[0, 20, 80], help='network round trip, ms')
+    args = parser.parse_args()
+
+    chained = load_module(ROOT / '02_callbacks' / 'e_chained.py')
+
+    def build_chained(merge):
+        app = Dash(__name__)
+        app.layout = chained.app.layout
+        chained.chain.register(app, merge=merge)
+        return app
+
+    scenarios = [('e_chained', build_chained, 'countries-radio.value', ['Canada', 'America'])]
+    for depth in DEPTHS:
+        def build_deep(merge, depth=depth):
+            app = Dash(__name__)
+            app.layout = deep_layout(depth)
+            deep_chain(depth).register(app, merge=merge)
+            return app
+        scenarios.append((f'linear depth {depth}', build_deep, 'stage-0.children', ['a', 'b']))
+
+    rtt_headers = ''.join(f"{f'@{rtt:g}ms':>10}" for rtt in args.rtt)
+    print(f"{'scenario':<18} {'mode':<9} {'requests':>8} {'trips':>6} {'server ms':>10}{rtt_headers}")
+    for name, build, key, values in scenarios:
+        for merge, (requests, waves, seconds, _) in measure(build, key, values).items():
+            wall = ''.join(f'{seconds * 1e3 + waves * rtt:>10.1f}' for rtt in args.rtt)
+            print(f"{name:<18} {'resolved' if merge else 'chained':<9} {requests:>8} {waves:>6} "
+                  f"{seconds * 1e3:>10.2f}{wall}")
+
+
+if __name__ == '__main__':
+    main()
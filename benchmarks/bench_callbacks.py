@@ -0,0 +1,483 @@
+# Headless micro-benchmarks for every callback of every app in the repo.
+#
+#   python benchmarks/bench_callbacks.py                      run all apps and print the results
+#   python benchmarks/bench_callbacks.py --save               ... and write them as the new baseline
+#   python benchmarks/bench_callbacks.py --check              compare against the baseline, exit 1 on regression
+#   python benchmarks/bench_callbacks.py --apps 02_callbacks.b_slider --samples 500
+#
+# Each app is imported in its own subprocess (apps using the global @callback would otherwise collide).
+# Callbacks are driven through the app's Flask test client - the same dispatch the browser hits, without
+# a browser - in dependency order, with inputs generated from the layout: slider marks, dropdown / radio
+# options, table cells for active_cell, n_clicks, dates, tabs. Outputs feed the callbacks downstream of
+# them, so chained callbacks see realistic values (e.g. a Store key produced upstream).
+#
+# Per callback: p50 / p95 / p99 of compute time, JSON serialization time (timed separately by wrapping
+# plotly's to_json_plotly, which dash uses for responses), total request time, and response size.
+# Pattern-matching ALL ids are expanded to every component in the current layout that matches, including
+# ones a callback rendered (e.g. the tables of the open 06_dash tab), and sent as explicit lists the way the
+# browser sends them. Background callbacks, and MATCH / ALLSMALLER ones (none in the repo), are skipped;
+# props only a background callback produces take their value from FIXTURES. Callbacks that raised
+# PreventUpdate on every sample are listed as such rather than timed - their numbers would say nothing.
+#
+# Calibration: every app's subprocess also times a fixed calibration callback (a seeded groupby and a bar
+# figure, through a test client of its own) before and after its samples. The baseline keeps each callback's
+# times as multiples of that, so it holds on another machine or a busier one; --check compares the ratios,
+# and reports the baseline in ms of this run (ratio x this run's calibration time).
+#
+# --check fails on a slowdown, on an app that no longer runs and on a baseline callback that is gone.
+# The baseline is committed next to this file (callbacks_baseline.json); refresh it with --save.
+import argparse
+import importlib
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE = Path(__file__).resolve().parent / 'callbacks_baseline.json'
+APP_DIRS = ['01_layout', '02_callbacks', '04_datatable', '05_example', '06_dash']
+METRICS = ['compute_ms', 'serialize_ms', 'total_ms']
+CALIBRATION_SAMPLES = 50
+
+# Values of props that only a skipped (background) callback outputs, so the callbacks downstream still run
+FIXTURES = {
+    '06_dash.runner': {
+        ('model_run', 'data'): lambda: {'cob': time.strftime('%Y-%m-%d'), 'status': {}, 'seconds': 0.0,
+                                        'finished': time.strftime('%Y-%m-%dT%H:%M:%S')},
+    },
+}
+
+
+def discover_apps():
+    apps = []
+    for folder in APP_DIRS:
+        for path in sorted((ROOT / folder).glob('*.py')):
+            if path.name != '__init__.py':
+                apps.append(f'{folder}.{path.stem}')
+    return apps
+
+
+# INPUT GENERATION
+# ======================================================================================================================
+def stringify_id(component_id) -> str:
+    """Ids as Dash keys them: strings as they are, dict ids as JSON with sorted keys."""
+    if isinstance(component_id, dict):
+        return json.dumps(component_id, sort_keys=True, separators=(',', ':'))
+    return component_id
+
+
+def walk_layout(node, components, owners=None, owner=None):
+    """Collects components with an id; owners maps (id, prop) to the ids found inside that prop's value."""
+    if isinstance(node, list):
+        for child in node:
+            walk_layout(child, components, owners, owner)
+    elif isinstance(node, dict) and 'props' in node:
+        props = node['props']
+        component_id = stringify_id(props.get('id')) if isinstance(props.get('id'), (str, dict)) else None
+        if component_id is not None:
+            components[component_id] = node
+            if owners is not None and owner is not None:
+                owners[owner].add(component_id)
+        for prop, value in props.items():
+            if isinstance(value, (list, dict)):
+                walk_layout(value, components, owners, (component_id, prop) if component_id else owner)
+
+
+def matching_ids(pattern: dict, components) -> list:
+    """Ids of the components matching a pattern-matching id whose wildcards are all ALL."""
+    matches = []
+    for component_id in components:
+        if not component_id.startswith('{'):
+            continue
+        candidate = json.loads(component_id)
+        if candidate.keys() == pattern.keys() and all(value == ['ALL'] or candidate[key] == value
+                                                      for key, value in pattern.items()):
+            matches.append(component_id)
+    return matches
+
+
+def option_values(options):
+    values = []
+    for option in options or []:
+        values.append(option.get('value') if isinstance(option, dict) else option)
+    return values
+
+
+def generate_value(component, prop, values, rng):
+    """A plausible value for component.prop, or the current value when there is nothing better."""
+    kind = component['type'] if component else None
+    props = component['props'] if component else {}
+    current = values.get(prop)
+
+    if prop == 'n_clicks':
+        return rng.randint(1, 50)
+    if prop == 'value' and kind in ('Slider', 'RangeSlider'):
+        marks = [float(m) for m in (props.get('marks') or {})]
+        if marks:
+            value = rng.choice(marks)
+            return int(value) if value.is_integer() else value
+        return rng.uniform(props.get('min', 0), props.get('max', 10))
+    if prop == 'value' and kind in ('Dropdown', 'RadioItems', 'Checklist'):
+        choices = option_values(values.get('options', props.get('options')))
+        if not choices:
+            return current
+        if kind == 'Checklist' or props.get('multi'):
+            return rng.sample(choices, rng.randint(0, len(choices)))
+        return rng.choice(choices)
+    if prop == 'value' and kind == 'Input':
+        if props.get('type') == 'number':
+            return rng.randint(1, 10)
+        return rng.choice(['Montréal', 'Canada', 'dash', 'benchmark'])
+    if prop == 'date':
+        return time.strftime('%Y-%m-%d')
+    if prop == 'active_tab':
+        tabs = [child['props'].get('tab_id') for child in props.get('children') or [] if isinstance(child, dict)]
+        tabs = [tab for tab in tabs if tab]
+        return rng.choice(tabs) if tabs else current
+    if prop == 'active_cell':
+        data = values.get('data') or props.get('data') or []
+        columns = values.get('columns') or props.get('columns') or [{'id': c} for c in (data[0] if data else {})]
+        if not data or not columns:
+            return {'row': 0, 'column': 0, 'column_id': None}
+        row, column = rng.randrange(len(data)), rng.randrange(len(columns))
+        cell = {'row': row, 'column': column, 'column_id': columns[column]['id']}
+        if isinstance(data[row], dict) and 'id' in data[row]:
+            cell['row_id'] = data[row]['id']
+        return cell
+    if prop == 'page_current':
+        return rng.randrange(max(1, values.get('page_count') or 1))
+    if prop == 'sort_by':
+        columns = values.get('columns') or props.get('columns') or []
+        if not columns or rng.random() < 0.3:
+            return []
+        return [{'column_id': rng.choice(columns)['id'], 'direction': rng.choice(['asc', 'desc'])}]
+    return current
+
+
+# RUNNER (one app, in-process)
+# ======================================================================================================================
+def output_specs(dependency):
+    output = dependency['output']
+    parts = output[2:-2].split('...') if output.startswith('..') else [output]
+    specs = []
+    for part in parts:
+        component_id, _, prop = part.rpartition('.')
+        specs.append({'id': component_id, 'property': prop})
+    return specs
+
+
+def is_pattern(component_id: str) -> bool:
+    return component_id.startswith('{')
+
+
+def dependency_order(dependencies):
+    produced = {}
+    for i, dep in enumerate(dependencies):
+        for spec in output_specs(dep):
+            produced[(spec['id'], spec['property'])] = i
+
+    order, seen = [], set()
+
+    def visit(i, stack=()):
+        if i in seen or i in stack:
+            return
+        for item in dependencies[i]['inputs']:
+            upstream = produced.get((item['id'], item['property']))
+            if upstream is not None and upstream != i:
+                visit(upstream, stack + (i,))
+        seen.add(i)
+        order.append(i)
+
+    for i in range(len(dependencies)):
+        visit(i)
+    return order, produced
+
+
+def run_app(module_name: str, samples: int, seed: int) -> dict:
+    sys.path.insert(0, str(ROOT))
+    import numpy as np
+    import plotly.io.json as plotly_json
+
+    serialize_time = [0.0]
+    to_json_plotly = plotly_json.to_json_plotly
+
+    def timed_to_json(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return to_json_plotly(*args, **kwargs)
+        finally:
+            serialize_time[0] += time.perf_counter() - start
+
+    plotly_json.to_json_plotly = timed_to_json
+
+    module = importlib.import_module(module_name)
+    client = module.app.server.test_client()
+    dependencies = client.get('/_dash-dependencies').get_json()
+    # After the app's first request, which takes the global @callback list - the calibration app gets none
+    calibration = calibration_client()
+    calibration_ms = time_calibration(calibration, CALIBRATION_SAMPLES // 2)
+    components, owners = {}, defaultdict(set)
+    walk_layout(client.get('/_dash-layout').get_json(), components, owners)
+
+    # Current value of every (id, prop) - starts from the layout, then follows callback outputs
+    state = defaultdict(dict)
+    for component_id, component in components.items():
+        state[component_id].update(component['props'])
+    for (component_id, prop), fixture in FIXTURES.get(module_name, {}).items():
+        state[component_id][prop] = fixture()
+
+    def replace_prop(component_id, prop, value):
+        """Sets a prop; components rendered into it replace the ones it held before."""
+        stale = list(owners.pop((component_id, prop), ()))
+        while stale:
+            gone = stale.pop()
+            components.pop(gone, None)
+            state.pop(gone, None)
+            stale.extend(ids for (owner, _), ids in list(owners.items()) if owner == gone)
+            for key in [key for key in owners if key[0] == gone]:
+                del owners[key]
+        state[component_id][prop] = value
+        if isinstance(value, (list, dict)):
+            found = {}
+            walk_layout(value, found, owners, (component_id, prop))
+            components.update(found)
+            for found_id, component in found.items():
+                state[found_id] = dict(component['props'])
+
+    def expand(item, with_value: bool):
+        """One input / state / output, or the list of every component an ALL id matches."""
+        if not is_pattern(item['id']):
+            return {**item, 'value': state[item['id']].get(item['property'])} if with_value else item
+        pattern = json.loads(item['id'])
+        return [{'id': json.loads(match), 'property': item['property'],
+                 **({'value': state[match].get(item['property'])} if with_value else {})}
+                for match in matching_ids(pattern, components)]
+
+    order, produced = dependency_order(dependencies)
+    rng = random.Random(seed)
+    timings = defaultdict(lambda: defaultdict(list))
+    skipped = []
+
+    for sample in range(samples + 1):  # the first pass warms caches and is not recorded
+        for i in order:
+            dep = dependencies[i]
+            wildcards = dep['output'] + json.dumps(dep['inputs']) + json.dumps(dep['state'])
+            if (dep.get('background') or dep.get('long') or dep.get('clientside_function')
+                    or '"MATCH"' in wildcards or '"ALLSMALLER"' in wildcards):
+                if sample == 0:
+                    skipped.append(dep['output'])
+                continue
+
+            inputs = []
+            for item in dep['inputs']:
+                key = (item['id'], item['property'])
+                if key not in produced and not is_pattern(item['id']):
+                    component = components.get(item['id'])
+                    state[item['id']][item['property']] = generate_value(component, item['property'],
+                                                                         state[item['id']], rng)
+                inputs.append(expand(item, with_value=True))
+            states = [expand(item, with_value=True) for item in dep['state']]
+
+            outputs = [expand(spec, with_value=False) for spec in output_specs(dep)]
+            changed = [item for item in inputs if not isinstance(item, list)] + [
+                entry for item in inputs if isinstance(item, list) for entry in item]
+            body = {'output': dep['output'], 'outputs': outputs if len(outputs) > 1 else outputs[0],
+                    'inputs': inputs, 'state': states,
+                    'changedPropIds': [f"{stringify_id(changed[0]['id'])}.{changed[0]['property']}"]
+                    if changed else []}
+
+            serialize_time[0] = 0.0
+            start = time.perf_counter()
+            response = client.post('/_dash-update-component', json=body)
+            total = time.perf_counter() - start
+
+            if response.status_code == 200:
+                for component_id, props in (response.get_json().get('response') or {}).items():
+                    for prop, value in props.items():
+                        # Patches describe a change, not a value - keep the previous value downstream
+                        if not (isinstance(value, dict) and '__dash_patch_update' in value):
+                            replace_prop(component_id, prop, value)
+            elif response.status_code != 204:  # 204 = PreventUpdate
+                raise RuntimeError(f"{module_name} {dep['output']}: HTTP {response.status_code}")
+
+            if sample:
+                record = timings[dep['output']]
+                record['prevented'].append(response.status_code == 204)
+                record['total_ms'].append(total * 1e3)
+                record['serialize_ms'].append(serialize_time[0] * 1e3)
+                record['compute_ms'].append((total - serialize_time[0]) * 1e3)
+                record['bytes'].append(len(response.data))
+
+    calibration_ms += time_calibration(calibration, CALIBRATION_SAMPLES - CALIBRATION_SAMPLES // 2)
+    prevented = [name for name, record in timings.items() if all(record['prevented'])]
+    return {'callbacks': {name: summarise(record) for name, record in timings.items() if name not in prevented},
+            'skipped': skipped, 'prevented': prevented, 'calibration_ms': float(np.percentile(calibration_ms, 50))}
+
+
+# CALIBRATION
+# ======================================================================================================================
+def calibration_client():
+    """Test client of a one-callback app doing a fixed amount of the work callbacks do: pandas, then a figure."""
+    import numpy as np
+    import pandas as pd
+    import plotly.express as px
+    from dash import Dash, Input, Output, dcc, html
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'group': rng.integers(0, 50, 20_000).astype(str), 'value': rng.normal(size=20_000),
+                       'year': rng.integers(1990, 2020, 20_000)})
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Input(id='year', value=2000), dcc.Graph(id='graph')])
+
+    @app.callback(Output('graph', 'figure'), Input('year', 'value'))
+    def update(year):
+        means = df[df['year'] >= year].groupby('group', as_index=False)['value'].mean()
+        return px.bar(means, x='group', y='value')
+
+    client = app.server.test_client()
+    client.get('/_dash-dependencies')
+    return client
+
+
+def time_calibration(client, samples: int) -> list:
+    body = {'output': 'graph.figure', 'outputs': {'id': 'graph', 'property': 'figure'},
+            'inputs': [{'id': 'year', 'property': 'value', 'value': 2000}], 'changedPropIds': ['year.value']}
+    times = []
+    for sample in range(samples + 1):  # the first pass warms up and is not recorded
+        start = time.perf_counter()
+        response = client.post('/_dash-update-component', json=body)
+        if response.status_code != 200:
+            raise RuntimeError(f'calibration callback: HTTP {response.status_code}')
+        if sample:
+            times.append((time.perf_counter() - start) * 1e3)
+    return times
+
+
+def to_ratios(results: dict) -> dict:
+    """Results with each callback's times divided by its app's calibration time - the baseline form."""
+    ratios = {}
+    for app, result in results.items():
+        if 'error' in result:
+            ratios[app] = result
+            continue
+        scale = result['calibration_ms']
+        callbacks = {name: {metric: ({k: v / scale for k, v in values.items()} if metric in METRICS else values)
+                            for metric, values in stats.items()}
+                     for name, stats in result['callbacks'].items()}
+        ratios[app] = {**result, 'callbacks': callbacks}
+    return ratios
+
+
+def summarise(record) -> dict:
+    import numpy as np
+    result = {}
+    for metric in METRICS:
+        values = np.array(record[metric])
+        result[metric] = {f'p{p}': float(np.percentile(values, p)) for p in (50, 95, 99)}
+    result['bytes'] = {'p50': float(np.percentile(record['bytes'], 50)), 'max': float(max(record['bytes']))}
+    return result
+
+
+# SUITE
+# ======================================================================================================================
+def run_suite(apps, samples: int, seed: int) -> dict:
+    results = {}
+    for app in apps:
+        proc = subprocess.run([sys.executable, __file__, '--worker', app, '--samples', str(samples),
+                               '--seed', str(seed)], capture_output=True, text=True, cwd=ROOT,
+                              env={**os.environ, 'PYTHONHASHSEED': '0'})
+        if proc.returncode != 0:
+            results[app] = {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'}
+        else:
+            results[app] = json.loads(proc.stdout.strip().splitlines()[-1])
+    return results
+
+
+def print_results(results: dict):
+    print(f"{'app / callback':<58} {'compute p50/p95/p99 ms':>24} {'serialize p50':>14} {'bytes p50':>10}")
+    for app, result in results.items():
+        if 'error' in result:
+            print(f'{app:<58} ERROR {result["error"]}')
+            continue
+        if not result['callbacks']:
+            print(f'{app:<58} {"(no callbacks)":>24}')
+        for name, stats in result['callbacks'].items():
+            c = stats['compute_ms']
+            label = f'{app} {name}'
+            label = label if len(label) <= 58 else label[:55] + '...'
+            print(f"{label:<58} {c['p50']:>8.2f}/{c['p95']:>6.2f}/{c['p99']:>7.2f} "
+                  f"{stats['serialize_ms']['p50']:>14.3f} {stats['bytes']['p50']:>10,.0f}")
+        print(f"{app + ' (calibration)':<58} {result['calibration_ms']:>8.2f}")
+        for name in result.get('skipped', []):
+            print(f'{app + " " + name:<58} {"skipped":>24}')
+        for name in result.get('prevented', []):
+            print(f'{app + " " + name:<58} {"always PreventUpdate":>24}')
+
+
+def check_regressions(results: dict, baseline: dict, threshold: float, metric: str, percentile: str,
+                      min_delta: float):
+    """Compares results (ms) against a baseline of calibration ratios (to_ratios)."""
+    regressions = []
+    for app, result in results.items():
+        if 'error' in result:
+            regressions.append(f'{app}: failed to run - {result["error"]}')
+            continue
+        measured = set(result['callbacks']) | set(result.get('skipped', [])) | set(result.get('prevented', []))
+        for name in baseline.get(app, {}).get('callbacks', {}):
+            if name not in measured:
+                regressions.append(f'{app} {name}: in the baseline but no longer registered')
+        for name, stats in result.get('callbacks', {}).items():
+            before = baseline.get(app, {}).get('callbacks', {}).get(name)
+            if not before:
+                continue
+            # The baseline in ms of this run's machine
+            old, new = before[metric][percentile] * result['calibration_ms'], stats[metric][percentile]
+            # min_delta keeps sub-millisecond jitter on trivial callbacks from failing the check
+            if new > old * (1 + threshold) and new - old > min_delta:
+                regressions.append(f'{app} {name}: {metric} {percentile} {old:.3f} -> {new:.3f} ms '
+                                   f'(+{(new / old - 1) * 100:.0f}%)')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless callback micro-benchmarks.')
+    parser.add_argument('--apps', nargs='*', help='dotted app modules, e.g. 02_callbacks.b_slider (default: all)')
+    parser.add_argument('--samples', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', action='store_true', help=f'write the results to {BASELINE.name}')
+    parser.add_argument('--check', action='store_true', help='fail when slower than the baseline')
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown, 0.25 = 25%%')
+    parser.add_argument('--min-delta', type=float, default=0.5, help='ignore slowdowns smaller than this (ms)')
+    parser.add_argument('--metric', default='compute_ms', choices=METRICS)
+    parser.add_argument('--percentile', default='p50', choices=['p50', 'p95', 'p99'])
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_app(args.worker, args.samples, args.seed)))
+        return
+
+    results = run_suite(args.apps or discover_apps(), args.samples, args.seed)
+    print_results(results)
+
+    if args.save:
+        args.baseline.write_text(json.dumps(to_ratios(results), indent=2))
+        print(f'\nbaseline written to {args.baseline}')
+
+    if args.check:
+        regressions = check_regressions(results, json.loads(args.baseline.read_text()), args.threshold,
+                                        args.metric, args.percentile, args.min_delta)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) (slowdowns over {args.threshold:.0%}, failures):')
+            print('\n'.join(regressions))
+            sys.exit(1)
+        print(f'\nno regressions over {args.threshold:.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# Figure payload slimming (common/figure_payload.py): wire bytes and latency of the b_slider and c_multiple
+# figures as plain plotly JSON against slim_figure + gzip.
+#
+#   python benchmarks/bench_figure_payload.py
+#
+# The payload table encodes figures directly; the end-to-end table posts slider moves to 02_callbacks/b_slider
+# through the Flask test client, with the original figures swapped in for the baseline.
+import gzip
+import importlib.util
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import plotly.express as px
+from plotly.io.json import to_json_plotly
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from common.figure_payload import slim_figure
+
+
+def best_of(func, number: int = 20, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def load_app(path: Path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def indicator_scatter(countries: int):
+    # Shaped like c_multiple's update_graph output: one trace, float x / y, country names as hover
+    rng = np.random.default_rng(0)
+    fig = px.scatter(x=rng.lognormal(8, 1.5, countries), y=rng.uniform(40, 85, countries),
+                     hover_name=[f'Country {i}' for i in range(countries)])
+    return fig.to_plotly_json()
+
+
+def payload_rows(slider):
+    yield 'b_slider figure 2007', slider.build_figure(slider.df[slider.df.year == 2007]).to_plotly_json()
+    yield 'b_slider all years', [slider.build_figure(d).to_plotly_json() for _, d in slider.df.groupby('year')]
+    for countries in (250, 20_000):
+        yield f'c_multiple {countries:,} pts', indicator_scatter(countries)
+
+
+def print_payloads(slider):
+    print(f"{'figure':<22} {'json B':>10} {'gzip B':>9} {'slim B':>10} {'slim+gz B':>10} {'slim ms':>8} "
+          f"{'encode ms':>10} {'slim enc ms':>11}")
+    for name, figure in payload_rows(slider):
+        slim = slim_figure(figure) if isinstance(figure, dict) else [slim_figure(f) for f in figure]
+        before, after = to_json_plotly(figure).encode(), to_json_plotly(slim).encode()
+        slim_ms = best_of(lambda: slim_figure(figure) if isinstance(figure, dict) else
+                          [slim_figure(f) for f in figure], number=5) * 1e3
+        print(f"{name:<22} {len(before):>10,} {len(gzip.compress(before)):>9,} {len(after):>10,} "
+              f"{len(gzip.compress(after)):>10,} {slim_ms:>8.2f} "
+              f"{best_of(lambda: to_json_plotly(figure)) * 1e3:>10.2f} "
+              f"{best_of(lambda: to_json_plotly(slim)) * 1e3:>11.2f}")
+
+
+def print_end_to_end(slider):
+    client = slider.app.server.test_client()
+    years = sorted(slider.figures)
+    original = {year: slider.build_figure(d).to_plotly_json() for year, d in slider.df.groupby('year')}
+    slimmed = slider.figures
+
+    def body(year, initial):
+        return {'output': 'graph-with-slider.figure', 'outputs': {'id': 'graph-with-slider', 'property': 'figure'},
+                'inputs': [{'id': 'year-slider', 'property': 'value', 'value': year}],
+                'changedPropIds': [] if initial else ['year-slider.value']}
+
+    def run(initial, encoding):
+        sizes = []
+
+        def sweep():
+            for year in years:
+                r = client.post('/_dash-update-component', json=body(year, initial),
+                                headers={'Accept-Encoding': encoding})
+                sizes.append(len(r.data))
+        seconds = best_of(sweep, number=3) / len(years)
+        return np.mean(sizes), seconds
+
+    print(f"\n{'b_slider end to end':<22} {'mode':<10} {'bytes':>9} {'ms/req':>8}")
+    for initial, label in [(True, 'figure'), (False, 'patch')]:
+        for name, figures, encoding in [('baseline', original, 'identity'), ('slim+gzip', slimmed, 'gzip')]:
+            slider.figures = figures
+            size, seconds = run(initial, encoding)
+            print(f"{name:<22} {label:<10} {size:>9,.0f} {seconds * 1e3:>8.2f}")
+    slider.figures = slimmed
+
+
+def main():
+    slider = load_app(ROOT / '02_callbacks' / 'b_slider.py')
+    print_payloads(slider)
+    print_end_to_end(slider)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# Memory and process count: every example app in its own process against all of them in common/host.py.
+#
+#   python benchmarks/bench_host.py
+#
+# Each app is served with the launcher in a single process (--workers 0) and its RSS taken after its layout
+# and callback map have been requested; the host is started the same way and every prefix opened in turn.
+# Apps whose data cannot be loaded here (no network, no cached copy) are left out of both sides.
+import json
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import psutil
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from common.host import discover_apps
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def get(port: int, path: str) -> int:
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=120) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def start(module: str):
+    port = free_port()
+    process = subprocess.Popen([sys.executable, '-m', 'common.launcher', module, '--workers', '0',
+                                '--port', str(port)], cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return None, port
+        try:
+            if get(port, '/healthz') == 200:
+                return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    return None, port
+
+
+def rss_mb(process) -> float:
+    return psutil.Process(process.pid).memory_info().rss / 2 ** 20
+
+
+def main():
+    apps = discover_apps()
+
+    print(f"{'app':<28} {'own process MB':>15}")
+    separate = {}
+    for prefix, module in apps.items():
+        process, port = start(module)
+        if process is None:
+            print(f'{module:<28} {"failed to start":>15}')
+            continue
+        get(port, '/_dash-layout')
+        get(port, '/_dash-dependencies')
+        separate[prefix] = rss_mb(process)
+        process.terminate()
+        process.wait(30)
+        print(f'{module:<28} {separate[prefix]:>15.0f}')
+
+    process, port = start('common.host')
+    cold = rss_mb(process)
+    for prefix in separate:
+        get(port, f'{prefix}/_dash-layout')
+        get(port, f'{prefix}/_dash-dependencies')
+    host = rss_mb(process)
+    process.terminate()
+    process.wait(30)
+
+    print(json.dumps({'apps': len(separate), 'separate_processes_mb': round(sum(separate.values())),
+                      'host_before_first_request_mb': round(cold), 'host_all_loaded_mb': round(host)}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
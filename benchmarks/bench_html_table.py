@@ -0,0 +1,65 @@
+# Build time of the html.Table tree: the original per-cell generate_table (01_layout/c_table.py) against
+# the bulk builder in common/html_table.py, from 10 to 100k rows.
+#
+#   python benchmarks/bench_html_table.py
+import json
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from dash import html
+from plotly.utils import PlotlyJSONEncoder
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.html_table import generate_table
+
+ROWS = [10, 100, 1_000, 10_000, 100_000]
+LEGACY_LIMIT = 10_000  # the per-cell version takes minutes beyond this
+
+
+def legacy_generate_table(dataframe, max_rows=10):
+    return html.Table([
+        html.Thead(
+            html.Tr([html.Th(col) for col in dataframe.columns])
+        ),
+        html.Tbody([
+            html.Tr([
+                html.Td(dataframe.iloc[i][col]) for col in dataframe.columns
+            ]) for i in range(min(len(dataframe), max_rows))
+        ])
+    ])
+
+
+def build_frame(rows: int) -> pd.DataFrame:
+    # Same shape as usa-agricultural-exports-2011.csv: a text column and ten numeric ones
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.uniform(0, 1000, size=(rows, 10)).round(2), columns=[f'col {i}' for i in range(10)])
+    df.insert(0, 'state', [f'State {i}' for i in range(rows)])
+    return df
+
+
+def best_of(func, repeat: int = 3) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    small = build_frame(10)
+    same = (json.dumps(legacy_generate_table(small), cls=PlotlyJSONEncoder)
+            == json.dumps(generate_table(small), cls=PlotlyJSONEncoder))
+    print(f'output identical to the original for 10 rows: {same}\n')
+
+    print(f"{'rows':>8} {'legacy ms':>10} {'bulk ms':>9} {'chunked ms':>11} {'speedup':>8}")
+    for rows in ROWS:
+        df = build_frame(rows)
+        legacy = best_of(lambda: legacy_generate_table(df, max_rows=rows)) if rows <= LEGACY_LIMIT else None
+        bulk = best_of(lambda: generate_table(df, max_rows=None))
+        chunked = best_of(lambda: generate_table(df, max_rows=None, chunk_size=500, scroll_height='60vh'))
+        legacy_text = f'{legacy * 1e3:>10.1f}' if legacy else f"{'-':>10}"
+        speedup = f'{legacy / bulk:>7.1f}x' if legacy else f"{'-':>8}"
+        print(f'{rows:>8,} {legacy_text} {bulk * 1e3:>9.1f} {chunked * 1e3:>11.1f} {speedup}')
+
+
+if __name__ == '__main__':
+    main()
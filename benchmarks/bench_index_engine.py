@@ -0,0 +1,76 @@
+# Custom index queries: common/index_engine.py against the pandas way of writing it (per-row apply to
+# re-bucket, then a groupby of notional and notional x spread), on synthetic constituents.
+#
+#   python benchmarks/bench_index_engine.py [--sizes 1000 10000 100000 1000000] [--repeat 20]
+#
+# The query is the one the Custom tab opens with - every rating, 3 of the 12 buckets, GBP + EUR, both
+# sectors. Engine times are per query with the cache cleared (cold) and for the same query asked again with
+# the selections in another order (hit). The pandas baseline is checked to give the same spreads.
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.index_engine import IndexEngine
+from common.market_data import BUCKETS, RATINGS, bucket_years, generate_constituents, generate_spread_cube
+
+QUERY = dict(ratings=RATINGS, buckets=['5y', '10y', '30y'], currencies=['GBP', 'EUR'], sectors=['fin', 'nonfin'])
+SHUFFLED = dict(ratings=RATINGS[::-1], buckets=['30y', '5y', '10y', '5y'], currencies=['EUR', 'GBP'],
+                sectors=['nonfin', 'fin'])
+
+
+def pandas_index(df: pd.DataFrame, ratings, buckets, currencies, sectors) -> pd.DataFrame:
+    years = dict(zip(buckets, bucket_years(buckets)))
+
+    def nearest(maturity):
+        return min(buckets, key=lambda b: abs(years[b] - maturity))
+
+    chosen = df[df['rating'].isin(ratings) & df['currency'].isin(currencies) & df['sector'].isin(sectors)].copy()
+    chosen['bucket'] = chosen['maturity'].apply(nearest)
+    chosen['weighted'] = chosen['notional'] * chosen['spread']
+    sums = chosen.groupby(['rating', 'bucket'])[['weighted', 'notional']].sum()
+    return (sums['weighted'] / sums['notional']).unstack().reindex(index=ratings, columns=buckets)
+
+
+def per_query(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Custom index queries: vectorized engine against pandas apply')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    cube = generate_spread_cube(ratings=RATINGS, buckets=BUCKETS)
+    print(f"{'constituents':>13} {'build ms':>9} {'cold ms':>8} {'hit us':>7} {'pandas ms':>10} {'speed-up':>9}")
+    for n in args.sizes:
+        df = generate_constituents(cube, n)
+        start = time.perf_counter()
+        engine = IndexEngine(df, RATINGS, BUCKETS)
+        build = time.perf_counter() - start
+
+        def cold():
+            engine._cache.clear()
+            return engine.index(**QUERY)
+
+        cold_time = per_query(cold, args.repeat)
+        hit_time = per_query(lambda: engine.index(**SHUFFLED), args.repeat)
+        baseline_time = per_query(lambda: pandas_index(df, **QUERY), max(1, args.repeat // 10))
+
+        expected = pandas_index(df, **QUERY)
+        got = engine.index(**QUERY)['spread'].loc[RATINGS]
+        assert np.allclose(got.to_numpy(), expected.to_numpy(), equal_nan=True)
+        print(f'{n:>13,} {build * 1e3:>9.1f} {cold_time * 1e3:>8.2f} {hit_time * 1e6:>7.1f} '
+              f'{baseline_time * 1e3:>10.1f} {baseline_time / cold_time:>8.0f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# Cross-filter lookup for 02_callbacks/c_multiple.py: masking the long-format frame (the original
+# update_graph) against slicing the pre-built IndicatorCube.
+#
+#   python benchmarks/bench_indicator_cube.py
+#
+# Uses a synthetic frame shaped like country_indicators.csv, with ~10% of values missing.
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.indicator_cube import IndicatorCube
+
+SIZES = [(200, 30, 10), (250, 50, 40), (1_000, 200, 60)]  # countries, indicators, years
+
+
+def build_frame(countries: int, indicators: int, years: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    index = pd.MultiIndex.from_product([[f'Country {c}' for c in range(countries)],
+                                        [f'Indicator {i}' for i in range(indicators)],
+                                        range(1960, 1960 + years)],
+                                       names=['Country Name', 'Indicator Name', 'Year'])
+    df = index.to_frame(index=False)
+    df['Value'] = rng.uniform(0, 100, size=len(df))
+    return df[rng.uniform(size=len(df)) > 0.1].reset_index(drop=True)
+
+
+def masked(df, x_name, y_name, year):
+    dff = df[df['Year'] == year]
+    return (dff[dff['Indicator Name'] == x_name]['Value'],
+            dff[dff['Indicator Name'] == y_name]['Value'],
+            dff[dff['Indicator Name'] == y_name]['Country Name'])
+
+
+def best_of(func, number: int = 20, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main():
+    print(f"{'countries x ind x years':>24} {'rows':>10} {'build ms':>9} {'mask ms':>9} {'cube ms':>9} {'speedup':>8}")
+    for countries, indicators, years in SIZES:
+        df = build_frame(countries, indicators, years)
+        build = best_of(lambda: IndicatorCube(df), number=1, repeat=3)
+        cube = IndicatorCube(df)
+
+        args = ('Indicator 0', 'Indicator 1', 1960 + years - 1)
+        mask_time = best_of(lambda: masked(df, *args))
+        cube_time = best_of(lambda: cube.pair(args[2], *args[:2]))
+
+        shape = f'{countries}x{indicators}x{years}'
+        print(f"{shape:>24} {len(df):>10,} {build * 1e3:>9.1f} {mask_time * 1e3:>9.3f} {cube_time * 1e3:>9.3f} "
+              f"{mask_time / cube_time:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
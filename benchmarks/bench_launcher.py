@@ -0,0 +1,121 @@
+# Serving throughput: the dev server (app.run(debug=True)) against common/launcher.py with a few
+# worker / thread settings, under the same closed-loop load of callback requests.
+#
+#   python benchmarks/bench_launcher.py [--app 02_callbacks.b_slider] [--clients 16] [--seconds 10]
+#
+# Each server runs in its own process; every client thread sends b_slider slider moves (any year, full
+# figure responses) back to back and records the latency. Client and server share the machine, so on
+# few cores the absolute numbers are pessimistic - compare the rows.
+import argparse
+import http.client
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEV_SERVER = ('import sys; sys.path.insert(0, {root!r}); from common.launcher import load_app; '
+              'load_app({app!r}).run(debug=True, use_reloader=False, port={port})')
+CONFIGS = [('dev server, debug=True', None), ('launcher 1 worker x 8 threads', (1, 8)),
+           ('launcher 2 workers x 8 threads', (2, 8)), ('launcher 4 workers x 4 threads', (4, 4))]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start(app: str, config, port: int) -> subprocess.Popen:
+    if config is None:
+        command = [sys.executable, '-c', DEV_SERVER.format(root=str(ROOT), app=app, port=port)]
+    else:
+        workers, threads = config
+        command = [sys.executable, '-m', 'common.launcher', app, '--port', str(port),
+                   '--workers', str(workers), '--threads', str(threads)]
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            status, _ = request(port, 'GET', '/healthz')
+            if status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'{command} did not come up')
+
+
+def request(port: int, method: str, path: str, body: bytes = None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        connection.request(method, path, body, {'Content-Type': 'application/json'} if body else {})
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def update_body(year: int) -> bytes:
+    return json.dumps({'output': 'graph-with-slider.figure',
+                       'outputs': {'id': 'graph-with-slider', 'property': 'figure'},
+                       'inputs': [{'id': 'year-slider', 'property': 'value', 'value': year}],
+                       'changedPropIds': []}).encode()
+
+
+def load(port: int, clients: int, seconds: float):
+    bodies = [update_body(year) for year in range(1952, 2008, 5)]
+    latencies, errors = [], [0]
+    stop = time.monotonic() + seconds
+
+    def client(n):
+        i = n
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            try:
+                status, _ = request(port, 'POST', '/_dash-update-component', bodies[i % len(bodies)])
+            except OSError:
+                status = None
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors[0] += 1
+            i += 1
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return len(latencies) / seconds, np.array(latencies), errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--app', default='02_callbacks.b_slider')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"{'server':<32} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, config in CONFIGS:
+        port = free_port()
+        process = start(args.app, config, port)
+        try:
+            load(port, args.clients, 2)  # warm up
+            rate, latencies, errors = load(port, args.clients, args.seconds)
+        finally:
+            process.terminate()
+            process.wait(60)
+        p50, p95, p99 = np.percentile(latencies * 1e3, [50, 95, 99]) if len(latencies) else (np.nan,) * 3
+        print(f'{name:<32} {rate:>8.0f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {errors:>7}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+# Live updates for the 06_dash viewer: sessions pushed to over Server-Sent Events (common/push.py) against the
+# same sessions polling a Dash callback with dcc.Interval, at the same update rate.
+#
+#   python benchmarks/bench_live.py [--interval 0.5] [--seconds 10] [--poll 10 50 100] [--push 10 100 1000 2000]
+#
+# The server is 06_dash/runner.py under the launcher, one process (--workers 0, 8 threads), with its live feed
+# ticking at 10 Hz. Polling goes through an extra callback, registered by this script, returning the same
+# message the feed publishes - what an Interval-driven callback returning the open tab's live tables and chart
+# points would send, with the tick already computed once for everyone (the cheapest polling can be).
+# Each polling session posts every --interval seconds, like dcc.Interval, whether or not the tick changed;
+# each push session is an EventSource asking for one frame per --interval.
+#
+# Reported per mode: updates received per session per second, server CPU above the idle feed, CPU per update
+# and the sessions one worker process could hold at that rate before using a full core. Clients run in this
+# process on the same machine, so on few cores both modes are squeezed - compare the rows. The browser side
+# (parsing, re-rendering the tables) is the same per update in both modes and is not measured here.
+import argparse
+import http.client
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import psutil
+
+ROOT = Path(__file__).resolve().parents[1]
+TOPIC = 'GBP'
+
+SERVER = """
+import importlib, sys
+sys.path.insert(0, {root!r})
+from dash import Input, Output
+from common.launcher import serve
+
+runner = importlib.import_module('06_dash.runner')
+latest = {{}}
+publish = runner.live_hub.publish
+
+def keep(topic, message):
+    latest[topic] = message
+    publish(topic, message)
+
+runner.live_hub.publish = keep
+runner.live_hub.subscribers = lambda topic: 1  # the feed ticks every currency in both modes, idle included
+
+@runner.app.callback(Output('bench_live', 'data'), Input('bench_interval', 'n_intervals'))
+def poll(n_intervals):
+    return latest.get({topic!r})
+
+serve('06_dash/runner.py', port={port}, workers=0, threads=8)
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def request(port: int, method: str, path: str, body: bytes = None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        connection.request(method, path, body, {'Content-Type': 'application/json'} if body else {})
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def start(port: int, live_port: int) -> subprocess.Popen:
+    env = dict(os.environ, LIVE_PORT=str(live_port))
+    command = [sys.executable, '-c', SERVER.format(root=str(ROOT), topic=TOPIC, port=port)]
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            if request(port, 'GET', '/healthz')[0] == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('06_dash/runner.py did not come up')
+
+
+def server_cpu(process: psutil.Process, seconds: float) -> float:
+    """Share of a core the server used over the next seconds."""
+    before = process.cpu_times()
+    time.sleep(seconds)
+    after = process.cpu_times()
+    return (after.user + after.system - before.user - before.system) / seconds
+
+
+def poll_sessions(port: int, sessions: int, interval: float, seconds: float, process: psutil.Process):
+    body = json.dumps({'output': 'bench_live.data', 'outputs': {'id': 'bench_live', 'property': 'data'},
+                       'inputs': [{'id': 'bench_interval', 'property': 'n_intervals', 'value': 1}],
+                       'changedPropIds': ['bench_interval.n_intervals']}).encode()
+    received, stop = [0] * sessions, time.monotonic() + seconds + 1
+
+    def session(n):
+        due = time.monotonic() + interval * n / sessions
+        while time.monotonic() < stop:
+            time.sleep(max(0.0, due - time.monotonic()))
+            due += interval
+            try:
+                status, data = request(port, 'POST', '/_dash-update-component', body)
+            except OSError:
+                continue
+            if status == 200 and b'tables' in data:
+                received[n] += 1
+
+    threads = [threading.Thread(target=session, args=(n,), daemon=True) for n in range(sessions)]
+    for t in threads:
+        t.start()
+    time.sleep(1)  # let the schedule settle
+    start_count = sum(received)
+    cpu = server_cpu(process, seconds)
+    count = sum(received) - start_count
+    for t in threads:
+        t.join()
+    return count / sessions / seconds, cpu
+
+
+def push_sessions(live_port: int, sessions: int, interval: float, seconds: float, process: psutil.Process):
+    selector = selectors.DefaultSelector()
+    received = {}
+    for _ in range(sessions):
+        sock = socket.create_connection(('127.0.0.1', live_port))
+        sock.sendall(f'GET /{TOPIC}?interval={interval} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+        sock.setblocking(False)
+        selector.register(sock, selectors.EVENT_READ)
+        received[sock] = 0
+
+    counting = [False]
+    stop = threading.Event()
+
+    def read():
+        while not stop.is_set():
+            for key, _ in selector.select(0.2):
+                try:
+                    data = key.fileobj.recv(1 << 16)
+                except BlockingIOError:
+                    continue
+                if counting[0]:
+                    received[key.fileobj] += data.count(b'\ndata: ') + data.startswith(b'data: ')
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    time.sleep(1)  # connected, first frames in
+    counting[0] = True
+    cpu = server_cpu(process, seconds)
+    counting[0] = False
+    stop.set()
+    reader.join()
+    for sock in received:
+        selector.unregister(sock)
+        sock.close()
+    return sum(received.values()) / sessions / seconds, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Live viewer updates: push (SSE) against dcc.Interval polling')
+    parser.add_argument('--interval', type=float, default=0.5, help='seconds between updates to a session')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--poll', type=int, nargs='+', default=[10, 50, 100])
+    parser.add_argument('--push', type=int, nargs='+', default=[10, 100, 1000, 2000])
+    args = parser.parse_args()
+
+    print(f'{args.interval:g}s between updates ({1 / args.interval:g}/s per session), {args.seconds:g}s per row')
+    print(f"{'mode':<6} {'sessions':>9} {'updates/s':>10} {'server CPU':>11} {'idle CPU':>9} {'ms/update':>10} "
+          f"{'sessions/core':>14}")
+    for mode, counts in (('poll', args.poll), ('push', args.push)):
+        port, live_port = free_port(), free_port()
+        server = start(port, live_port)
+        try:
+            process = psutil.Process(server.pid)
+            if mode == 'poll':
+                poll_sessions(port, 1, args.interval, 1, process)  # warm up
+            idle = server_cpu(process, 3)
+            for sessions in counts:
+                if mode == 'poll':
+                    rate, cpu = poll_sessions(port, sessions, args.interval, args.seconds, process)
+                else:
+                    rate, cpu = push_sessions(live_port, sessions, args.interval, args.seconds, process)
+                per_update = max(cpu - idle, 0.0) / max(rate * sessions, 1e-9)
+                capacity = 1 / (per_update * (1 / args.interval)) if per_update else float('inf')
+                print(f'{mode:<6} {sessions:>9} {rate:>10.2f} {cpu:>11.0%} {idle:>9.0%} {per_update * 1e3:>10.3f} '
+                      f'{capacity:>14,.0f}')
+        finally:
+            server.terminate()
+            server.wait(60)
+
+
+if __name__ == '__main__':
+    main()
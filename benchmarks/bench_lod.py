@@ -0,0 +1,70 @@
+# Payload and build time of a bubble scatter as the number of points grows: px.scatter (every point)
+# against common/lod.py (scattergl, or a density image past GL_MAX_POINTS), at full extent and zoomed in.
+#
+#   python benchmarks/bench_lod.py [--sizes 10000 100000 1000000 5000000] [--svg-max 1000000]
+#
+# Points are synthetic, gapminder-like: log-normal gdpPercap and pop, lifeExp rising with log gdp, five
+# continents. The zoom is the box the middle 10% of each axis spans - what relayoutData would report.
+# Payload is the figure JSON as Dash would send it (plotly's encoder); px.scatter is skipped above --svg-max.
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common import lod
+
+SCATTER = dict(x='gdpPercap', y='lifeExp', size='pop', color='continent', hover_name='country', log_x=True,
+               size_max=55)
+
+
+def points(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    gdp = rng.lognormal(8.5, 1.2, n)
+    return pd.DataFrame({'gdpPercap': gdp,
+                         'lifeExp': np.clip(20 + 6 * np.log(gdp) + rng.normal(0, 6, n), 20, 90),
+                         'pop': rng.lognormal(15, 1.5, n),
+                         'continent': rng.choice(['Africa', 'Americas', 'Asia', 'Europe', 'Oceania'], n),
+                         'country': rng.integers(0, 200, n).astype(str)})
+
+
+def timed(build):
+    start = time.perf_counter()
+    fig = build()
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    payload = pio.to_json(fig, validate=False)
+    return fig.data[0].type, built, time.perf_counter() - start, len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scatter payload and build time, px.scatter against common/lod.py')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10_000, 100_000, 1_000_000, 5_000_000])
+    parser.add_argument('--svg-max', type=int, default=1_000_000, help='largest size to try px.scatter on')
+    args = parser.parse_args()
+
+    print(f"{'points':>10} {'figure':<26} {'build ms':>9} {'json ms':>8} {'payload KB':>11}")
+    for n in args.sizes:
+        df = points(n)
+        log_x = np.log10(df['gdpPercap'])
+        x_range = tuple(10 ** np.quantile(log_x, [0.45, 0.55]))
+        y_range = tuple(np.quantile(df['lifeExp'], [0.45, 0.55]))
+
+        rows = []
+        if n <= args.svg_max:
+            rows.append(('px.scatter', lambda: px.scatter(df, **SCATTER)))
+        rows.append(('lod, full extent', lambda: lod.lod_figure(df, **SCATTER)))
+        rows.append(('lod, zoomed', lambda: lod.lod_figure(df, **SCATTER, x_range=x_range, y_range=y_range)))
+        for name, build in rows:
+            kind, built, serialized, size = timed(build)
+            print(f'{n:>10,} {name + " - " + kind:<26} {built * 1e3:>9.0f} {serialized * 1e3:>8.0f} '
+                  f'{size / 1024:>11,.0f}')
+
+
+if __name__ == '__main__':
+    main()
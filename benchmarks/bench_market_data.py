@@ -0,0 +1,49 @@
+# Generation time of the synthetic spread cube (common/market_data.py) against the per-cell loop that
+# built dummy_df in 06_dash/runner.py.
+#
+#   python benchmarks/bench_market_data.py
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.market_data import BUCKETS, CURRENCIES, RATINGS, SECTORS, generate_spread_cube
+
+# dates, ratings - currencies, sectors and buckets stay at 3 x 2 x 12
+SIZES = [(1, 4), (250, 4), (2_500, 4), (2_500, 20), (10_000, 20)]
+
+
+def legacy_dummy_data(n_grids: int):
+    for _ in range(n_grids):
+        dummy_data = {}
+        for b in BUCKETS:
+            dummy_data[b] = {r: int(np.random.uniform(low=20, high=100, size=(1,))[0]) for r in RATINGS}
+        pd.DataFrame.from_records(dummy_data, index=RATINGS)
+
+
+def best_of(func, repeat: int = 3) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    print(f"{'dates x ratings':>16} {'cells':>12} {'cube ms':>9} {'loop ms':>9}")
+    for dates, n_ratings in SIZES:
+        ratings = (RATINGS + [f'R{i}' for i in range(n_ratings)])[:n_ratings]
+        cube_time = best_of(lambda: generate_spread_cube(dates=dates, ratings=ratings))
+        cells = generate_spread_cube(dates=dates, ratings=ratings).values.size
+
+        # The old loop built one 4 x 12 grid at a time - only time it where it finishes in reasonable time
+        n_grids = dates * len(CURRENCIES) * len(SECTORS) * n_ratings // len(RATINGS)
+        loop = f'{best_of(lambda: legacy_dummy_data(n_grids), repeat=1) * 1e3:>9.0f}' if n_grids <= 2_000 else f"{'-':>9}"
+        print(f'{f"{dates}x{n_ratings}":>16} {cells:>12,} {cube_time * 1e3:>9.1f} {loop}')
+
+    a = generate_spread_cube(dates=250, seed=7).values
+    b = generate_spread_cube(dates=250, seed=7).values
+    print(f'\nsame seed, same cube: {np.array_equal(a, b)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+# Cold start of every example app: what its import costs, how much of that is building figures, how long the
+# first page load takes - and a check that each app starts within a target.
+#
+#   python benchmarks/bench_startup.py [--target 3.0] [--apps 01_layout.a_basic 05_example.runner] [--top 5]
+#
+# Each app is started in a fresh interpreter (python -X importtime), so nothing is cached between them:
+#   import      seconds to import the app module (dash, pandas, plotly, data loads, module-level figures)
+#   figures     of which inside plotly.express calls / go.Figure construction
+#   layout      seconds for the first GET /_dash-layout (Dash's server setup + the layout, if deferred)
+#   cold start  import + layout - what a new worker or a restarted process costs before it can serve a page
+#   top imports the heaviest packages by their own import time (all their modules, wherever imported from)
+# Exits 1 when an app's cold start is over its target or the app fails to start at all.
+import argparse
+import inspect
+import json
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+TARGET = 3.0
+# Apps that do more at import on purpose (b_slider precomputes every year's figure) get more headroom
+TARGETS = {'02_callbacks.b_slider': 4.0}
+
+
+def _time_figures():
+    """Patches plotly.express and go.Figure to total the seconds spent building figures; returns the total."""
+    import plotly.express as px
+    from plotly.basedatatypes import BaseFigure
+
+    spent = [0.0]
+    depth = [0]
+
+    def timed(func):
+        def wrapper(*args, **kwargs):
+            depth[0] += 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                depth[0] -= 1
+                if depth[0] == 0:
+                    spent[0] += time.perf_counter() - start
+        return wrapper
+
+    for name, func in vars(px).items():
+        if not name.startswith('_') and inspect.isfunction(func):
+            setattr(px, name, timed(func))
+    BaseFigure.__init__ = timed(BaseFigure.__init__)
+    return spent
+
+
+def worker(module: str):
+    start = time.perf_counter()
+    sys.path.insert(0, str(ROOT))
+    spent = _time_figures()
+    setup = time.perf_counter() - start  # plotly.express imported here - counted back into import below
+
+    start = time.perf_counter()
+    import importlib
+    app = importlib.import_module(module).app
+    imported = time.perf_counter() - start + setup
+    at_import = spent[0]
+
+    start = time.perf_counter()
+    status = app.server.test_client().get('/_dash-layout').status_code
+    layout = time.perf_counter() - start
+
+    print(json.dumps({'import': imported, 'figures_import': at_import, 'layout': layout,
+                      'figures_layout': spent[0] - at_import, 'status': status}))
+
+
+def top_imports(importtime: str, n: int) -> list:
+    """Heaviest packages from -X importtime output, as (package, seconds) - own import time of every module,
+    summed by top-level package, so dash's cost is not hidden under the app module that imported it."""
+    totals = defaultdict(int)
+    for line in importtime.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+\d+ \|\s*(\S+)', line)
+        if match:
+            totals[match.group(2).split('.')[0]] += int(match.group(1))
+    return sorted(((name, us / 1e6) for name, us in totals.items()), key=lambda item: -item[1])[:n]
+
+
+def measure(module: str, top: int):
+    process = subprocess.run([sys.executable, '-X', 'importtime', __file__, '--worker', module],
+                             cwd=ROOT, capture_output=True, text=True, timeout=300)
+    if process.returncode != 0:
+        last = process.stderr.strip().splitlines()[-1:] or ['exited with ' + str(process.returncode)]
+        return None, last[0]
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    if result['status'] != 200:
+        return None, f"GET /_dash-layout returned {result['status']}"
+    result['cold_start'] = result['import'] + result['layout']
+    result['top'] = top_imports(process.stderr, top)
+    return result, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start report and regression check for the example apps')
+    parser.add_argument('--target', type=float, default=TARGET, help='seconds allowed for import + first layout')
+    parser.add_argument('--apps', nargs='*', help='dotted modules (default: every app)')
+    parser.add_argument('--top', type=int, default=4, help='heaviest imports to list per app')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker)
+        return
+
+    # Imported here, not at the top: the worker must not have dash loaded before it times the app's import
+    sys.path.append(str(ROOT))
+    from common.host import discover_apps
+
+    modules = args.apps or list(discover_apps().values())
+    print(f"{'app':<28} {'import':>7} {'figures':>8} {'layout':>7} {'figures':>8} {'cold start':>11} {'target':>7}"
+          f"   top imports")
+    breaches, failures = [], []
+    for module in modules:
+        result, error = measure(module, args.top)
+        if result is None:
+            failures.append(module)
+            print(f'{module:<28} failed - {error[:80]}')
+            continue
+        target = TARGETS.get(module, args.target)
+        over = result['cold_start'] > target
+        if over:
+            breaches.append(module)
+        top = ', '.join(f'{name} {seconds:.2f}' for name, seconds in result['top'])
+        print(f"{module:<28} {result['import']:>7.2f} {result['figures_import']:>8.2f} {result['layout']:>7.2f} "
+              f"{result['figures_layout']:>8.2f} {result['cold_start']:>11.2f} {target:>6.1f}{' !' if over else '  '}"
+              f" {top}")
+
+    if breaches:
+        print(f'\nOver target: {", ".join(breaches)}')
+    if failures:
+        print(f'\nFailed to start: {", ".join(failures)}')
+    if breaches or failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
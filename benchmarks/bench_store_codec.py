@@ -0,0 +1,60 @@
+# Size and encode / decode time of the frame codecs the result store's disk tier uses (common/store_codec.py),
+# against pickle, which the disk tier used before (and which runs code from whatever file it is handed).
+#
+#   python benchmarks/bench_store_codec.py
+#
+# Shapes: what generate_numbers (05_example/runner.py) puts in the store, scaled up, and a 06_dash viewer
+# table (a Rating column of strings plus float buckets).
+import pickle
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.store_codec import CODECS, frame_from_bytes, frame_to_bytes
+
+SHAPES = [(10, 10), (1_000, 1_000), (10_000, 100)]
+
+
+def build_frame(rows: int, cols: int) -> pd.DataFrame:
+    numbers = np.random.default_rng(0).uniform(low=-10, high=15, size=(rows, cols))
+    data = {str(x): numbers[x] for x in range(rows)}
+    return pd.DataFrame.from_dict(data, orient='index')
+
+
+def build_viewer_table() -> pd.DataFrame:
+    buckets = ['3y', '5y', '7y', '10y', '12y', '15y', '20y', '25y', '30y', '35y', '40y', '70y']
+    df = pd.DataFrame(np.random.default_rng(0).uniform(30, 300, size=(4, len(buckets))).round(), columns=buckets)
+    df.insert(0, 'Rating', ['AAA', 'AA', 'A', 'BBB'])
+    return df
+
+
+def best_of(func, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    frames = [(f'{rows}x{cols}', build_frame(rows, cols)) for rows, cols in SHAPES]
+    frames.append(('viewer table', build_viewer_table()))
+    print(f"{'frame':>12} {'codec':>7} {'bytes':>12} {'vs pickle':>10} {'encode ms':>10} {'decode ms':>10}")
+    for label, df in frames:
+        raw = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+        pickled = len(raw)
+        print(f"{label:>12} {'pickle':>7} {pickled:>12,} {1:>9.2f}x "
+              f"{best_of(lambda: pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)) * 1e3:>10.2f} "
+              f"{best_of(lambda: pickle.loads(raw)) * 1e3:>10.2f}")
+        for name in CODECS:
+            raw = frame_to_bytes(df, name)
+            if name != 'json':  # JSON keeps values, not label and column types
+                pd.testing.assert_frame_equal(frame_from_bytes(raw), df, check_index_type=False,
+                                              check_column_type=False)
+            print(f"{label:>12} {name:>7} {len(raw):>12,} {len(raw) / pickled:>9.2f}x "
+                  f"{best_of(lambda: frame_to_bytes(df, name)) * 1e3:>10.2f} "
+                  f"{best_of(lambda: frame_from_bytes(raw)) * 1e3:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# Bytes and server time of refreshing the viewer tables after a model re-run: full to_dict('records')
+# against the cell-level updates of common/table_diff.py.
+#
+#   python benchmarks/bench_table_diff.py [--runs 50] [--shape 4 13]
+#
+# Six tables (3 currencies x 2 sectors) in the viewer's layout - a Rating column plus one per bucket - are
+# refreshed --runs times. Each run moves a given share of the cells (the rest are unchanged, as when a re-run
+# only reprices a few buckets). Sizes are of the JSON Dash sends for the data property; the highlight rules
+# (style_data_conditional) come on top of either, so they are listed apart.
+# Client render time needs a browser and is not measured here; the DataTable re-renders the rows it is given,
+# so the cells in a Patch are an upper bound on what it redraws.
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from plotly.io.json import to_json_plotly
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.table_diff import highlight_styles, table_update
+
+TABLES = 6
+
+
+def grid(rng, n_ratings: int, n_buckets: int) -> pd.DataFrame:
+    df = pd.DataFrame(rng.integers(20, 400, size=(n_ratings, n_buckets)), columns=[f'{b}y' for b in range(n_buckets)])
+    df.insert(0, 'Rating', [f'R{i}' for i in range(n_ratings)])
+    return df
+
+
+def rerun(rng, df: pd.DataFrame, share: float) -> pd.DataFrame:
+    new = df.copy()
+    values = new.iloc[:, 1:].to_numpy(copy=True)
+    moved = rng.random(values.shape) < share
+    values[moved] += rng.integers(1, 5, size=int(moved.sum()))
+    new.iloc[:, 1:] = values
+    return new
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Viewer table refresh: full records against cell-level updates')
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--shape', type=int, nargs=2, default=[4, 13], help='ratings, buckets per table')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'cells changed':>14} {'full KB':>9} {'diff KB':>9} {'saved':>7} {'highlight KB':>13} {'full ms':>8} "
+          f"{'diff ms':>8}   updates")
+    for share in [0.0, 0.02, 0.1, 0.3, 0.6]:
+        tables = [grid(rng, *args.shape) for _ in range(TABLES)]
+        full_bytes = diff_bytes = highlight_bytes = 0
+        full_time = diff_time = 0.0
+        kinds = {'none': 0, 'patch': 0, 'full': 0}
+        for _ in range(args.runs):
+            for i, old in enumerate(tables):
+                new = rerun(rng, old, share)
+
+                start = time.perf_counter()
+                full_bytes += len(to_json_plotly(new.to_dict('records')))
+                full_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                update, changed = table_update(old, new)
+                payload = to_json_plotly(update) if changed else ''
+                highlight = to_json_plotly(highlight_styles(changed))
+                diff_time += time.perf_counter() - start
+                diff_bytes += len(payload)
+                highlight_bytes += len(highlight) if changed else 0
+                kinds['none' if not changed else 'full' if isinstance(update, list) else 'patch'] += 1
+                tables[i] = new
+
+        n = args.runs * TABLES
+        print(f'{share:>14.0%} {full_bytes / n / 1024:>9.2f} {diff_bytes / n / 1024:>9.2f} '
+              f'{1 - diff_bytes / full_bytes:>7.0%} {highlight_bytes / n / 1024:>13.2f} '
+              f'{full_time / n * 1e3:>8.2f} {diff_time / n * 1e3:>8.2f}   '
+              + ', '.join(f'{k} {v}' for k, v in kinds.items() if v))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+# Clientside callbacks (common/clientside.py): checks that the JavaScript registered for each callback gives
+# the same outputs as the Python function, over a grid of inputs. Needs node on the PATH.
+#
+#   python benchmarks/check_clientside.py          exit status 1 on any mismatch
+#
+# Outputs are compared the way the browser sees them: after a JSON round trip, numbers to 1e-12 relative
+# (the browser parses every number as a double, so big Python ints lose the same digits either way).
+# Inputs the Python function raises on are skipped - those callbacks error on the server path.
+import importlib.util
+import inspect
+import itertools
+import json
+import math
+import subprocess
+import sys
+from pathlib import Path
+
+from dash.exceptions import PreventUpdate
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from common import clientside
+
+APPS = ['02_callbacks/a_basic.py', '02_callbacks/d_multiple2.py', '02_callbacks/f_state.py', '06_dash/runner.py']
+SAMPLES = [None, 0, 1, 5, 12, -3, 2.5, '', 'abc', 'Montréal', True, False, [1, 2], []]
+
+NODE_RUNNER = """
+globalThis.window = {dash_clientside: {no_update: {__no_update__: true}, PreventUpdate: {__prevent__: true}}};
+const cases = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const out = cases.map(([source, args]) => {
+    const func = eval('(' + source + ')');
+    try { return {value: func(...args)}; }
+    catch (e) { return e === window.dash_clientside.PreventUpdate ? {prevent: true} : {error: String(e)}; }
+});
+process.stdout.write(JSON.stringify(out));
+"""
+
+
+def load_module(path: Path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_python(func, args):
+    try:
+        value = func(*args)
+    except PreventUpdate:
+        return {'prevent': True}
+    except Exception:
+        return None
+    if isinstance(value, tuple):
+        value = list(value)
+    try:
+        return {'value': json.loads(json.dumps(value, default=lambda v: {'__no_update__': True}
+                                                  if type(v).__name__ == 'NoUpdate' else _raise(v)))}
+    except (TypeError, ValueError):
+        return None  # not JSON serializable (complex, ...) - the server callback would fail too
+
+
+def _raise(value):
+    raise TypeError(type(value).__name__)
+
+
+def same(a, b) -> bool:
+    if isinstance(a, bool) or isinstance(b, bool):
+        return a is b
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b or math.isclose(a, b, rel_tol=1e-12) or (math.isnan(a) and math.isnan(b))
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    return a == b
+
+
+def main():
+    for app in APPS:
+        load_module(ROOT / app)
+
+    cases, expected = [], []
+    for func, source, _ in clientside.registered:
+        if source is None:
+            print(f'{func.__name__:<28} server (not translatable)')
+            continue
+        arity = len(inspect.signature(func).parameters)
+        for args in itertools.product(SAMPLES, repeat=arity):
+            result = run_python(func, args)
+            if result is not None:
+                cases.append([source, list(args)])
+                expected.append((func.__name__, args, result))
+
+    output = subprocess.run(['node', '-e', NODE_RUNNER], input=json.dumps(cases), capture_output=True,
+                            text=True, check=True).stdout
+    actual = json.loads(output)
+
+    checked, failures = {}, []
+    for (name, args, want), got in zip(expected, actual):
+        checked[name] = checked.get(name, 0) + 1
+        if not same(json.loads(json.dumps(got)), want):
+            failures.append((name, args, want, got))
+
+    for name, count in checked.items():
+        bad = sum(1 for f in failures if f[0] == name)
+        print(f"{name:<28} {count:>5} cases  {'OK' if not bad else f'{bad} MISMATCHED'}")
+    for name, args, want, got in failures[:20]:
+        print(f'  {name}{args}: python {want} javascript {got}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
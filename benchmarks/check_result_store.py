@@ -0,0 +1,121 @@
+# Result store across processes (common/result_store.py): a key put by one process must resolve in another,
+# as it does when the launcher's workers take consecutive requests of one session.
+#
+#   python benchmarks/check_result_store.py          exit status 1 on any failure
+#
+# 1. a second ResultStore on the same spill directory, in this process, reads a key the first one put
+# 2. a separate interpreter with the default store_from_env() reads a key put with store_from_env() here
+# 3. 05_example under the launcher with 2 workers: new numbers, then bar chart clicks, none of which may be
+#    refused because the frame was put by the other worker
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from common.result_store import ResultStore, store_from_env
+
+READER = """
+import sys
+sys.path.insert(0, {root!r})
+from common.result_store import store_from_env
+df = store_from_env().get({key!r})
+print('missing' if df is None else df.to_json())
+"""
+CLICKS = 20
+
+
+def frame() -> pd.DataFrame:
+    return pd.DataFrame(np.random.default_rng(0).uniform(size=(10, 10)), index=[str(i) for i in range(10)])
+
+
+def second_instance() -> bool:
+    with tempfile.TemporaryDirectory() as spill_dir:
+        df = frame()
+        key = ResultStore(spill_dir=spill_dir).put(df)
+        return df.equals(ResultStore(spill_dir=spill_dir).get(key))
+
+
+def second_process() -> bool:
+    df = frame()
+    key = store_from_env().put(df)
+    output = subprocess.run([sys.executable, '-c', READER.format(root=str(ROOT), key=key)], capture_output=True,
+                            text=True, check=True).stdout.strip()
+    return output == df.to_json()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def post(port: int, body: dict):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        connection.request('POST', '/_dash-update-component', json.dumps(body), {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def launcher_workers() -> bool:
+    port = free_port()
+    process = subprocess.Popen([sys.executable, '-m', 'common.launcher', '05_example/runner.py', '--port', str(port),
+                                '--workers', '2', '--threads', '2'], cwd=ROOT, env=os.environ,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+                connection.request('GET', '/healthz')
+                if connection.getresponse().status == 200:
+                    break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError('05_example did not come up')
+                time.sleep(0.2)
+
+        status, data = post(port, {'output': 'df_data.data', 'outputs': {'id': 'df_data', 'property': 'data'},
+                                   'inputs': [{'id': 'run-button', 'property': 'value', 'value': 1}],
+                                   'changedPropIds': ['run-button.value']})
+        key = json.loads(data)['response']['df_data']['data']
+        refused = 0
+        for row in range(CLICKS):
+            cell = {'row': row % 10, 'column': 0, 'column_id': '0'}
+            status, _ = post(port, {'output': 'bar_chart.figure',
+                                    'outputs': {'id': 'bar_chart', 'property': 'figure'},
+                                    'inputs': [{'id': 'table-average', 'property': 'active_cell', 'value': cell},
+                                               {'id': 'df_data', 'property': 'data', 'value': key}],
+                                    'changedPropIds': ['table-average.active_cell']})
+            refused += status != 200
+        print(f'  {refused} of {CLICKS} bar chart updates refused')
+        return refused == 0
+    finally:
+        process.terminate()
+        process.wait(60)
+
+
+def main():
+    failed = False
+    for name, check in [('second store instance', second_instance), ('second process', second_process),
+                        ('launcher, 2 workers', launcher_workers)]:
+        ok = check()
+        failed |= not ok
+        print(f"{name:<28} {'OK' if ok else 'FAILED'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
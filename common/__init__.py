@@ -0,0 +1,5 @@
+# Shared helpers used by the example apps.
+#
+# The apps live in numbered folders and are normally started as scripts
+# (python 05_example/runner.py), so each app that uses these helpers puts the
+# repository root on sys.path before importing from here.
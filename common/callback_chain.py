@@ -0,0 +1,144 @@
+from dash import Input, Output, State, ctx, no_update
+from dash._no_update import NoUpdate
+from dash.exceptions import PreventUpdate
+
+
+# CALLBACK CHAIN RESOLVER
+# ======================================================================================================================
+# A chain of callbacks wired through intermediate props (A's output is B's input, B's output is C's input)
+# costs one browser round trip per link: the client only learns it has to call B once A's response arrives.
+#
+# CallbackChain collects callbacks with the same decorator signature as app.callback. register(app) finds the
+# groups connected by intermediate props and registers each group as ONE Dash callback that:
+#   - takes every input of its members (an intermediate prop stays an input too, since the user may also
+#     change it - Dash allows a callback to have the same prop as input and output)
+#   - runs the members in dependency order, starting from the ones whose inputs were triggered, feeding each
+#     output straight into the members downstream of it
+#   - returns every output at once, no_update for the ones not recomputed
+# so a click is one request however deep the chain is. Callbacks not linked to any other, using
+# pattern-matching ids, or linked in a cycle are registered unchanged.
+class _Member:
+    def __init__(self, func, dependencies):
+        self.func = func
+        self.dependencies = dependencies
+
+        flat = [d for dep in dependencies for d in (dep if isinstance(dep, (list, tuple)) else [dep])]
+        self.outputs = [d for d in flat if isinstance(d, Output)]
+        self.inputs = [d for d in flat if isinstance(d, Input)]
+        self.states = [d for d in flat if isinstance(d, State)]
+        # A single Output passed on its own returns a bare value; a list or several Outputs return a sequence
+        self.single_output = isinstance(dependencies[0], Output) and len(self.outputs) == 1
+
+        self.output_keys = [str(d) for d in self.outputs]
+        self.input_keys = [str(d) for d in self.inputs]
+        self.arg_keys = self.input_keys + [str(d) for d in self.states]
+
+    @property
+    def mergeable(self):
+        return not any(isinstance(d.component_id, dict) for d in self.outputs + self.inputs + self.states)
+
+
+class CallbackChain:
+    def __init__(self):
+        self.members = []
+
+    def callback(self, *dependencies):
+        """Same arguments as app.callback; the function is registered later by register(app)."""
+        def decorator(func):
+            self.members.append(_Member(func, dependencies))
+            return func
+        return decorator
+
+    def groups(self) -> list:
+        """The members split into groups linked by intermediate props, each in execution order."""
+        mergeable = [m for m in self.members if m.mergeable]
+        groups = [[m] for m in self.members if not m.mergeable]
+
+        # Union-find over 'A's output is B's input'
+        parent = list(range(len(mergeable)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        producer = {key: i for i, m in enumerate(mergeable) for key in m.output_keys}
+        for j, m in enumerate(mergeable):
+            for key in m.input_keys:
+                if key in producer:
+                    parent[find(producer[key])] = find(j)
+
+        components = {}
+        for i, m in enumerate(mergeable):
+            components.setdefault(find(i), []).append(m)
+        for members in components.values():
+            ordered = _topological(members)
+            if ordered is None:
+                groups.extend([m] for m in members)
+            else:
+                groups.append(ordered)
+        return groups
+
+    def register(self, app, merge: bool = True):
+        """Registers every collected callback on app; merge=False registers them one by one, as app.callback would."""
+        for group in self.groups() if merge else [[m] for m in self.members]:
+            if len(group) == 1:
+                app.callback(*group[0].dependencies)(group[0].func)
+            else:
+                _register_group(app, group)
+
+
+def _topological(members: list):
+    """Members ordered so producers run before consumers, or None if they form a cycle."""
+    producers = {key: m for m in members for key in m.output_keys}
+    upstream = {id(m): {id(producers[k]) for k in m.input_keys if k in producers and producers[k] is not m}
+                for m in members}
+    ordered, done = [], set()
+    while len(ordered) < len(members):
+        ready = [m for m in members if id(m) not in done and upstream[id(m)] <= done]
+        if not ready:
+            return None
+        ordered.extend(ready)
+        done.update(id(m) for m in ready)
+    return ordered
+
+
+def _unique(dependencies):
+    seen = {}
+    for d in dependencies:
+        seen.setdefault(str(d), d)
+    return seen
+
+
+def _register_group(app, group: list):
+    outputs = _unique(d for m in group for d in m.outputs)
+    inputs = _unique(d for m in group for d in m.inputs)
+    states = {k: d for k, d in _unique(d for m in group for d in m.states).items() if k not in inputs}
+    arg_keys = list(inputs) + list(states)
+
+    def resolve(*args):
+        values = dict(zip(arg_keys, args))
+        # Initial call - nothing triggered, so everything runs
+        dirty = set(ctx.triggered_prop_ids) or None
+        results = {}
+        for member in group:
+            if dirty is not None and dirty.isdisjoint(member.input_keys):
+                continue
+            try:
+                value = member.func(*(values[k] for k in member.arg_keys))
+            except PreventUpdate:
+                continue
+            for key, v in zip(member.output_keys, [value] if member.single_output else value):
+                if isinstance(v, NoUpdate):
+                    continue
+                values[key] = results[key] = v
+                if dirty is not None:
+                    dirty.add(key)
+
+        if not results:
+            raise PreventUpdate
+        return [results.get(key, no_update) for key in outputs]
+
+    resolve.__name__ = '__'.join(m.func.__name__ for m in group)
+    app.callback(list(outputs.values()), list(inputs.values()), list(states.values()))(resolve)
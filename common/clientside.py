@@ -0,0 +1,338 @@
+import ast
+import inspect
+import json
+import os
+import string
+import textwrap
+
+import dash
+
+
+# CLIENTSIDE CALLBACKS
+# ======================================================================================================================
+# Tiny pure callbacks (echo a value, toggle a flag, format a string) cost a full HTTP request and a server
+# worker slot per change. @clientside_callback registers them as JavaScript that runs in the browser instead:
+#
+#   @clientside_callback(Output('out', 'children'), Input('in', 'value'))
+#   def update(value):
+#       return f'Output: {value}'
+#
+# The JavaScript is either written next to the Python (js='function(value) {...}') or translated from the
+# function itself when it sticks to a small subset of Python:
+#   - arguments, local assignments, if / elif / else, return, raise PreventUpdate, no_update
+#   - str / int / float / bool / None constants, f-strings and '...'.format(...) with plain {} fields
+#   - + - * / // % **, comparisons, is (not) None, and / or / not, x if c else y, tuples as multiple outputs
+#   - str(), len(), abs(), min(), max()
+# Where JavaScript differs, small helpers in the generated function keep Python's behaviour: truthiness, the
+# sign of %, str() of None / True / False / lists / dicts / floats ('2.0', '1e-05'), == and != on lists and
+# dicts, ordering (lexicographic lists, TypeError across types), min / max of one list or of several values,
+# len() of a dict. The browser cannot tell 2.0 from 2, so whether a value is a float is decided when
+# translating: a float constant, / or a float operand makes one. A number that may be either (x / 2 if c
+# else n) raises ClientsideUnsupported. Anything else (globals, loops, method calls...) raises it too, and
+# the callback is registered on the server unchanged, as it is for every callback when DASH_CLIENTSIDE=0.
+#
+# benchmarks/check_clientside.py runs both versions of every registered callback over a grid of inputs
+# under node and checks they agree.
+ENABLED = os.environ.get('DASH_CLIENTSIDE', '1') != '0'
+
+# Every callback that went through the decorator: (function, javascript or None, dependencies)
+registered = []
+
+
+class ClientsideUnsupported(Exception):
+    pass
+
+
+_HELPERS = {
+    'truthy': "function truthy(v) { return !(v === null || v === undefined || v === false || v === 0 || v === '' "
+              "|| (Array.isArray(v) ? v.length === 0 : typeof v === 'object' && Object.keys(v).length === 0)); }",
+    'str': "function str(v) { if (v === null || v === undefined) return 'None'; if (v === true) return 'True'; "
+           "if (v === false) return 'False'; "
+           "if (typeof v === 'number') return Number.isInteger(v) && Math.abs(v) < 1e21 ? String(v) : pyfloat(v); "
+           "if (Array.isArray(v)) return '[' + v.map(repr).join(', ') + ']'; "
+           "if (typeof v === 'object') return '{' + Object.keys(v).map(function (k) { "
+           "return repr(k) + ': ' + repr(v[k]); }).join(', ') + '}'; return String(v); }",
+    'repr': "function repr(v) { if (typeof v !== 'string') return str(v); "
+            "var q = v.indexOf(\"'\") >= 0 && v.indexOf('\"') < 0 ? '\"' : \"'\"; "
+            "var s = v.replace(/\\\\/g, '\\\\\\\\').replace(/\\n/g, '\\\\n').replace(/\\t/g, '\\\\t')"
+            ".replace(/\\r/g, '\\\\r'); "
+            "return q + (q === \"'\" ? s.replace(/'/g, \"\\\\'\") : s) + q; }",
+    'pyfloat': "function pyfloat(v) { if (Number.isNaN(v)) return 'nan'; "
+               "if (!Number.isFinite(v)) return v > 0 ? 'inf' : '-inf'; if (Object.is(v, -0)) return '-0.0'; "
+               "var a = Math.abs(v); if (a !== 0 && (a >= 1e16 || a < 1e-4)) return v.toExponential()"
+               ".replace(/e([+-])(\\d)$/, function (m, sign, d) { return 'e' + sign + '0' + d; }); "
+               "return Number.isInteger(v) ? String(v) + '.0' : String(v); }",
+    'strfloat': "function strfloat(v) { return typeof v === 'number' ? pyfloat(v) : str(v); }",
+    'mod': "function mod(a, b) { return ((a % b) + b) % b; }",
+    'eq': "function eq(a, b) { if (a === undefined) a = null; if (b === undefined) b = null; "
+          "if ((typeof a === 'boolean' && typeof b === 'number') || (typeof a === 'number' && typeof b === 'boolean')) "
+          "return Number(a) === Number(b); "
+          "if (Array.isArray(a) || Array.isArray(b)) return Array.isArray(a) && Array.isArray(b) "
+          "&& a.length === b.length && a.every(function (x, i) { return eq(x, b[i]); }); "
+          "if (a !== null && b !== null && typeof a === 'object' && typeof b === 'object') { "
+          "var keys = Object.keys(a); return keys.length === Object.keys(b).length && keys.every(function (k) { "
+          "return Object.prototype.hasOwnProperty.call(b, k) && eq(a[k], b[k]); }); } return a === b; }",
+    'order': "function order(a, b) { "
+             "if (Array.isArray(a) && Array.isArray(b)) { for (var i = 0; i < Math.min(a.length, b.length); i++) { "
+             "if (!eq(a[i], b[i])) return order(a[i], b[i]); } "
+             "return a.length < b.length ? -1 : a.length > b.length ? 1 : 0; } "
+             "var ta = typeof a === 'boolean' ? 'number' : typeof a, tb = typeof b === 'boolean' ? 'number' : typeof b; "
+             "if (ta === tb && (ta === 'number' || ta === 'string')) { "
+             "if (ta === 'number' && (Number.isNaN(a) || Number.isNaN(b))) return NaN; "
+             "return a < b ? -1 : a > b ? 1 : 0; } "
+             "throw new TypeError('ordering not supported between these types'); }",
+    'minmax': "function minmax(args, sign) { var xs = args.length === 1 ? args[0] : Array.prototype.slice.call(args); "
+              "if (typeof xs === 'string') xs = Array.from(xs); "
+              "else if (xs !== null && typeof xs === 'object' && !Array.isArray(xs)) xs = Object.keys(xs); "
+              "if (!Array.isArray(xs)) throw new TypeError('object is not iterable'); "
+              "if (!xs.length) throw new Error('arg is an empty sequence'); var best = xs[0]; "
+              "for (var i = 1; i < xs.length; i++) { if (order(xs[i], best) * sign > 0) best = xs[i]; } return best; }",
+    'pymin': "function pymin() { return minmax(arguments, -1); }",
+    'pymax': "function pymax() { return minmax(arguments, 1); }",
+    'len': "function len(v) { if (typeof v === 'string') return Array.from(v).length; "
+           "if (Array.isArray(v)) return v.length; if (v !== null && typeof v === 'object') return Object.keys(v).length; "
+           "throw new TypeError('object has no len()'); }",
+}
+# Helpers the helpers call
+_HELPER_NEEDS = {'str': ['pyfloat', 'repr'], 'repr': ['str'], 'strfloat': ['str', 'pyfloat'], 'order': ['eq'],
+                 'minmax': ['order'], 'pymin': ['minmax'], 'pymax': ['minmax']}
+_BINARY = {ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/', ast.Pow: '**'}
+_ORDER = {ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>='}
+
+
+class _Translator:
+    def __init__(self, args):
+        self.names = set(args)
+        self.locals = set()
+        self.floats = {}  # local -> whether it holds a float
+        self.helpers = set()
+
+    def fail(self, node, what):
+        raise ClientsideUnsupported(f'line {getattr(node, "lineno", "?")}: {what}')
+
+    def helper(self, name, *args):
+        pending = [name]
+        while pending:
+            helper = pending.pop()
+            if helper not in self.helpers:
+                self.helpers.add(helper)
+                pending.extend(_HELPER_NEEDS.get(helper, []))
+        return f"{name}({', '.join(args)})" if args else name
+
+    def to_str(self, node):
+        return self.helper('strfloat' if self.is_float(node) else 'str', self.expr(node))
+
+    # Floats: Python prints 2.0 where the browser only has 2, so float-ness is tracked through the expressions
+    def is_float(self, node) -> bool:
+        """True if node is a float whenever it is a number; fails when that depends on the inputs."""
+        if isinstance(node, ast.Constant):
+            return isinstance(node.value, float)
+        if isinstance(node, ast.Name):
+            return self.floats.get(node.id, False)
+        if isinstance(node, ast.BinOp):
+            return isinstance(node.op, ast.Div) or self.is_float(node.left) or self.is_float(node.right)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            return self.is_float(node.operand)
+        if isinstance(node, ast.IfExp):
+            return self.same_kind(node, [node.body, node.orelse])
+        if isinstance(node, ast.BoolOp):
+            return self.same_kind(node, node.values)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id not in self.names:
+            if node.func.id == 'abs' and len(node.args) == 1:
+                return self.is_float(node.args[0])
+            if node.func.id in ('min', 'max') and len(node.args) > 1:
+                return self.same_kind(node, node.args)
+        return False
+
+    def same_kind(self, node, values) -> bool:
+        floats = [self.is_float(v) for v in values]
+        if any(floats) and not all(f or not self.maybe_number(v) for f, v in zip(floats, values)):
+            self.fail(node, 'a number that is a float or not depending on the inputs')
+        return any(floats)
+
+    def maybe_number(self, node) -> bool:
+        if isinstance(node, ast.Constant):
+            return isinstance(node.value, (int, float)) and not isinstance(node.value, bool)
+        return not isinstance(node, (ast.JoinedStr, ast.Compare)) and not (
+            isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not))
+
+    def truthy(self, node):
+        if isinstance(node, ast.Compare) or (isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not)):
+            return self.expr(node)  # already a JS boolean
+        return self.helper('truthy', self.expr(node))
+
+    # Statements
+    def block(self, statements, indent):
+        lines = []
+        for node in statements:
+            lines.extend(self.statement(node, indent))
+        return lines
+
+    def statement(self, node, indent):
+        pad = '    ' * indent
+        if isinstance(node, ast.Return):
+            return [f'{pad}return {self.expr(node.value) if node.value else "null"};']
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name = node.targets[0].id
+            value = self.expr(node.value)
+            is_float = self.is_float(node.value)
+            if self.floats.get(name, is_float) != is_float and self.maybe_number(node.value):
+                self.fail(node, f"'{name}' assigned both floats and other numbers")
+            self.floats[name] = self.floats.get(name, False) or is_float
+            self.names.add(name)
+            self.locals.add(name)
+            return [f'{pad}{name} = {value};']
+        if isinstance(node, ast.If):
+            lines = [f'{pad}if ({self.truthy(node.test)}) {{'] + self.block(node.body, indent + 1)
+            if node.orelse:
+                lines += [f'{pad}}} else {{'] + self.block(node.orelse, indent + 1)
+            return lines + [f'{pad}}}']
+        if isinstance(node, ast.Raise) and isinstance(node.exc, (ast.Name, ast.Call)):
+            exc = node.exc.func if isinstance(node.exc, ast.Call) else node.exc
+            if isinstance(exc, ast.Name) and exc.id == 'PreventUpdate':
+                return [f'{pad}throw window.dash_clientside.PreventUpdate;']
+        if isinstance(node, ast.Pass):
+            return []
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            return []  # docstring
+        self.fail(node, f'{type(node).__name__} statement')
+
+    # Expressions
+    def expr(self, node):
+        if isinstance(node, ast.Constant):
+            if node.value is None or isinstance(node.value, (bool, int, float, str)):
+                return json.dumps(node.value)
+            self.fail(node, f'{type(node.value).__name__} constant')
+        if isinstance(node, ast.Name):
+            if node.id == 'no_update':
+                return 'window.dash_clientside.no_update'
+            if node.id not in self.names:
+                self.fail(node, f"name '{node.id}' is not an argument or local")
+            return node.id
+        if isinstance(node, ast.Tuple):
+            return f"[{', '.join(self.expr(e) for e in node.elts)}]"
+        if isinstance(node, ast.BinOp):
+            left, right = self.expr(node.left), self.expr(node.right)
+            if isinstance(node.op, ast.Mod):
+                return self.helper('mod', left, right)
+            if isinstance(node.op, ast.FloorDiv):
+                return f'Math.floor({left} / {right})'
+            if type(node.op) not in _BINARY:
+                self.fail(node, f'operator {type(node.op).__name__}')
+            return f'({left} {_BINARY[type(node.op)]} {right})'
+        if isinstance(node, ast.UnaryOp):
+            if isinstance(node.op, ast.Not):
+                return f'!{self.truthy(node.operand)}'
+            if isinstance(node.op, (ast.USub, ast.UAdd)):
+                return f"({'-' if isinstance(node.op, ast.USub) else '+'}{self.expr(node.operand)})"
+            self.fail(node, f'operator {type(node.op).__name__}')
+        if isinstance(node, ast.BoolOp):
+            # Python returns the deciding operand, not a boolean - evaluate each operand once
+            result = self.expr(node.values[-1])
+            for value in reversed(node.values[:-1]):
+                v = self.expr(value)
+                keep = '' if isinstance(node.op, ast.Or) else '!'
+                result = f'((_v) => {keep}{self.helper("truthy")}(_v) ? _v : {result})({v})'
+            return result
+        if isinstance(node, ast.Compare) and len(node.ops) == 1:
+            op, right = node.ops[0], node.comparators[0]
+            if isinstance(op, (ast.Is, ast.IsNot)):
+                if not (isinstance(right, ast.Constant) and right.value is None):
+                    self.fail(node, "'is' other than 'is None'")
+                return f"({self.expr(node.left)} {'==' if isinstance(op, ast.Is) else '!='} null)"
+            left, right = self.expr(node.left), self.expr(right)
+            if isinstance(op, (ast.Eq, ast.NotEq)):
+                return f"{'' if isinstance(op, ast.Eq) else '!'}{self.helper('eq', left, right)}"
+            if type(op) not in _ORDER:
+                self.fail(node, f'comparison {type(op).__name__}')
+            return f"({self.helper('order', left, right)} {_ORDER[type(op)]} 0)"
+        if isinstance(node, ast.IfExp):
+            return f'({self.truthy(node.test)} ? {self.expr(node.body)} : {self.expr(node.orelse)})'
+        if isinstance(node, ast.JoinedStr):
+            parts = []
+            for value in node.values:
+                if isinstance(value, ast.Constant):
+                    parts.append(json.dumps(value.value))
+                elif value.conversion in (-1, ord('s')) and value.format_spec is None:
+                    parts.append(self.to_str(value.value))
+                else:
+                    self.fail(value, 'f-string conversion or format spec')
+            return f"({' + '.join(parts) or json.dumps('')})"
+        if isinstance(node, ast.Call) and not node.keywords:
+            return self.call(node)
+        self.fail(node, f'{type(node).__name__} expression')
+
+    def call(self, node):
+        func, args = node.func, [self.expr(a) for a in node.args]
+        if isinstance(func, ast.Attribute) and func.attr == 'format' and isinstance(func.value, ast.Constant) \
+                and isinstance(func.value.value, str):
+            parts, fields = [], iter(node.args)
+            for literal, field, spec, conversion in string.Formatter().parse(func.value.value):
+                if literal:
+                    parts.append(json.dumps(literal))
+                if field is None:
+                    continue
+                if field != '' or spec or conversion:
+                    self.fail(node, 'format fields other than {}')
+                parts.append(self.to_str(next(fields)))
+            return f"({' + '.join(parts) or json.dumps('')})"
+        if isinstance(func, ast.Name) and func.id not in self.names:
+            if func.id == 'str' and len(args) == 1:
+                return self.to_str(node.args[0])
+            if func.id == 'len' and len(args) == 1:
+                return self.helper('len', args[0])
+            if func.id == 'abs' and len(args) == 1:
+                return f'Math.abs({args[0]})'
+            if func.id in ('min', 'max') and args:
+                self.is_float(node)  # fails on a mix of floats and other numbers
+                return self.helper(f'py{func.id}', *args)
+        self.fail(node, 'call')
+
+
+def to_javascript(func) -> str:
+    """Translates func into a dash clientside function, or raises ClientsideUnsupported."""
+    try:
+        tree = ast.parse(textwrap.dedent(inspect.getsource(func)))
+    except (OSError, TypeError) as e:
+        raise ClientsideUnsupported(f'no source for {func.__name__}: {e}')
+    definition = tree.body[0]
+    if not isinstance(definition, ast.FunctionDef):
+        raise ClientsideUnsupported(f'{func.__name__} is not a plain function')
+    arguments = definition.args
+    if arguments.vararg or arguments.kwarg or arguments.kwonlyargs or arguments.defaults or arguments.posonlyargs:
+        raise ClientsideUnsupported(f'{func.__name__} takes more than plain positional arguments')
+
+    args = [a.arg for a in arguments.args]
+    translator = _Translator(args)
+    body = translator.block(definition.body, 1)
+    if not isinstance(definition.body[-1], (ast.Return, ast.Raise)):
+        body.append('    return null;')
+
+    header = [f'    {_HELPERS[name]}' for name in sorted(translator.helpers)]
+    if translator.locals:
+        header.append(f"    let {', '.join(sorted(translator.locals))};")
+    return '\n'.join([f"function({', '.join(args)}) {{"] + header + body + ['}'])
+
+
+def clientside_callback(*dependencies, app=None, js: str = None, enabled: bool = None):
+    """
+    Drop-in for @app.callback (or the global @callback when app is None) that runs the function in the browser.
+    js - hand written JavaScript to use instead of translating the function
+    enabled - False registers on the server; defaults to DASH_CLIENTSIDE
+    """
+    def decorator(func):
+        source = None
+        if ENABLED if enabled is None else enabled:
+            try:
+                source = js or to_javascript(func)
+            except ClientsideUnsupported:
+                pass  # stays a server callback
+
+        if source is None:
+            (app.callback if app else dash.callback)(*dependencies)(func)
+        else:
+            (app.clientside_callback if app else dash.clientside_callback)(source, *dependencies)
+        func.clientside_js = source
+        registered.append((func, source, dependencies))
+        return func
+    return decorator
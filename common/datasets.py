@@ -0,0 +1,351 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # without Arrow the cache falls back to pickle (no memory mapping)
+    feather = None
+
+
+# DATASET REGISTRY
+# ======================================================================================================================
+# The apps used to pd.read_csv(<url>) at import time - seconds per start, once per worker, and a crash
+# without network. They now call load(<name>), which resolves in this order:
+#
+#   1. frames already loaded in this process (shared between apps hosted together)
+#   2. the local binary cache   - Feather (memory mapped) with a sha256 checksum in a sidecar file
+#   3. a vendored copy          - data/<name>.csv(.gz) in the repo, for air-gapped hosts
+#   4. the source url           - downloaded once and written to the cache
+#   5. a fallback builder       - an offline stand-in, so every app starts without network: plotly's bundled
+#                                 gapminder where it is the same data, a seeded stand-in with the same columns
+#                                 otherwise. Fallbacks are cached as such: starts within FALLBACK_RETRY seconds
+#                                 use them without waiting on the network, later ones try 3 and 4 again, and
+#                                 `fetch` replaces them whenever it succeeds.
+#
+# Each dataset resolves under its own lock, so a slow download holds up only the callers of that dataset.
+#
+# python -m common.datasets fetch   populates the cache, `vendor` writes data/ for offline hosts and
+# `bench` prints cold / warm load times.
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.environ.get('DATASET_CACHE_DIR', ROOT / '.cache' / 'datasets'))
+VENDOR_DIR = Path(os.environ.get('DATASET_VENDOR_DIR', ROOT / 'data'))
+OFFLINE = os.environ.get('DATASET_OFFLINE', '0') == '1'
+VERIFY = os.environ.get('DATASET_VERIFY', '1') == '1'
+DOWNLOAD_TIMEOUT = 30
+FALLBACK_RETRY = float(os.environ.get('DATASET_FALLBACK_RETRY_HOURS', 24)) * 3600
+
+
+def _gapminder_from_plotly() -> pd.DataFrame:
+    import plotly.express as px
+    return px.data.gapminder()[['country', 'year', 'pop', 'continent', 'lifeExp', 'gdpPercap']]
+
+
+def _gdp_life_exp_from_plotly() -> pd.DataFrame:
+    df = _gapminder_from_plotly()
+    df = df[df['year'] == 2007].reset_index(drop=True)
+    return df.rename(columns={'gdpPercap': 'gdp per capita', 'lifeExp': 'life expectancy', 'pop': 'population'})
+
+
+def _country_indicators_from_plotly() -> pd.DataFrame:
+    # The World Bank indicators gapminder has, in the long layout of country_indicators.csv
+    indicators = {'lifeExp': 'Life expectancy at birth, total (years)',
+                  'gdpPercap': 'GDP per capita (constant 2005 US$)',
+                  'pop': 'Population, total'}
+    df = _gapminder_from_plotly().melt(id_vars=['country', 'year'], value_vars=list(indicators),
+                                       var_name='Indicator Name', value_name='Value')
+    df['Indicator Name'] = df['Indicator Name'].map(indicators)
+    return df.rename(columns={'country': 'Country Name', 'year': 'Year'})[
+        ['Country Name', 'Indicator Name', 'Year', 'Value']]
+
+
+US_STATES = ['Alabama', 'Alaska', 'Arizona', 'Arkansas', 'California', 'Colorado', 'Connecticut', 'Delaware',
+             'Florida', 'Georgia', 'Hawaii', 'Idaho', 'Illinois', 'Indiana', 'Iowa', 'Kansas', 'Kentucky',
+             'Louisiana', 'Maine', 'Maryland', 'Massachusetts', 'Michigan', 'Minnesota', 'Mississippi', 'Missouri',
+             'Montana', 'Nebraska', 'Nevada', 'New Hampshire', 'New Jersey', 'New Mexico', 'New York',
+             'North Carolina', 'North Dakota', 'Ohio', 'Oklahoma', 'Oregon', 'Pennsylvania', 'Rhode Island',
+             'South Carolina', 'South Dakota', 'Tennessee', 'Texas', 'Utah', 'Vermont', 'Virginia', 'Washington',
+             'West Virginia', 'Wisconsin', 'Wyoming']
+
+
+def _agricultural_exports_stand_in() -> pd.DataFrame:
+    # Same columns as the USDA file, seeded made-up figures ($m) - the layout renders, the numbers are not real
+    rng = np.random.default_rng(2011)
+    n = len(US_STATES)
+    parts = {col: rng.lognormal(3, 1.5, n).round(2) for col in
+             ['beef', 'pork', 'poultry', 'dairy', 'fruits fresh', 'fruits proc', 'veggies fresh', 'veggies proc',
+              'corn', 'wheat', 'cotton']}
+    df = pd.DataFrame({'Unnamed: 0': np.arange(n), 'state': US_STATES})
+    df['total exports'] = (sum(parts.values()) * 1.5).round(2)
+    for col in ['beef', 'pork', 'poultry', 'dairy', 'fruits fresh', 'fruits proc']:
+        df[col] = parts[col]
+    df['total fruits'] = (parts['fruits fresh'] + parts['fruits proc']).round(2)
+    df['veggies fresh'], df['veggies proc'] = parts['veggies fresh'], parts['veggies proc']
+    df['total veggies'] = (parts['veggies fresh'] + parts['veggies proc']).round(2)
+    for col in ['corn', 'wheat', 'cotton']:
+        df[col] = parts[col]
+    return df
+
+
+def _solar() -> pd.DataFrame:
+    # The whole of plotly/datasets solar.csv - eight rows
+    return pd.DataFrame([['California', 289, 4395, 15.3, 10826], ['Arizona', 48, 1078, 22.5, 2550],
+                         ['Nevada', 11, 547, 49.7, 1078], ['New Mexico', 33, 281, 8.5, 563],
+                         ['Colorado', 20, 204, 10.2, 388], ['Texas', 12, 187, 15.6, 264],
+                         ['North Carolina', 148, 474, 3.2, 510], ['New York', 13, 14, 1.1, 19]],
+                        columns=['State', 'Number of Solar Plants', 'Installed Capacity (MW)',
+                                 'Average MW Per Plant', 'Generation (GWh)'])
+
+
+DATASETS = {
+    'usa_agricultural_exports_2011': {
+        'url': 'https://gist.githubusercontent.com/chriddyp/c78bf172206ce24f77d6363a2d754b59/raw/'
+               'c353e8ef842413cae56ae3920b8fd78468aa4cb2/usa-agricultural-exports-2011.csv',
+        'fallback': _agricultural_exports_stand_in,
+    },
+    'gdp_life_exp_2007': {
+        'url': 'https://gist.githubusercontent.com/chriddyp/5d1ea79569ed194d432e56108a04d188/raw/'
+               'a9f9e8076b837d541398e999dcbac2b2826a81f8/gdp-life-exp-2007.csv',
+        'fallback': _gdp_life_exp_from_plotly,
+    },
+    'gapminder_five_year': {
+        'url': 'https://raw.githubusercontent.com/plotly/datasets/master/gapminderDataFiveYear.csv',
+        'dtypes': {'year': 'int64', 'pop': 'float64', 'lifeExp': 'float64', 'gdpPercap': 'float64'},
+        'fallback': _gapminder_from_plotly,
+    },
+    'country_indicators': {
+        'url': 'https://plotly.github.io/datasets/country_indicators.csv',
+        'dtypes': {'Year': 'int64', 'Value': 'float64'},
+        'fallback': _country_indicators_from_plotly,
+    },
+    'solar': {
+        'url': 'https://raw.githubusercontent.com/plotly/datasets/master/solar.csv',
+        'fallback': _solar,
+    },
+}
+
+_loaded = {}
+_versions = {}
+_locks = {}  # name -> lock held while the dataset resolves
+_lock = threading.Lock()
+
+
+def register(name: str, url: str = None, dtypes: dict = None, fallback=None):
+    DATASETS[name] = {'url': url, 'dtypes': dtypes or {}, 'fallback': fallback}
+
+
+def load(name: str) -> pd.DataFrame:
+    """
+    Load a registered dataset. The returned frame is shared by every caller in the process - do not mutate it.
+    """
+    with _lock:
+        lock = _locks.setdefault(name, threading.Lock())
+    with lock:
+        if name not in _loaded:
+            _loaded[name] = _resolve(name)
+        return _loaded[name]
+
+
+def version(name: str) -> str:
+    """
+    Identifies the data load(name) returned: the checksum of its cache file. Results cached
+    across processes (common/memoize.py) include it, so a re-fetched dataset does not serve stale ones.
+    """
+    load(name)
+    return _versions[name]
+
+
+# Resolution
+# ----------------------------------------------------------------------------------------------------------------------
+def _resolve(name: str) -> pd.DataFrame:
+    spec = DATASETS[name]
+
+    df = _read_cache(name)
+    if df is not None:
+        meta = _cached_meta(name)
+        if meta['source'] != 'fallback' or time.time() - meta.get('written', 0) < FALLBACK_RETRY:
+            _versions[name] = meta['sha256']
+            return df
+
+    for source, reader in [('vendored', _read_vendored), ('url', _download), ('fallback', _build_fallback)]:
+        df = reader(name, spec)
+        if df is not None:
+            df = _apply_dtypes(df, spec)
+            _write_cache(name, df, source)
+            _versions[name] = _cached_meta(name)['sha256']
+            # Hand back the memory mapped copy so cold and warm starts behave the same
+            return _read_cache(name, verify=False) if feather is not None else df
+
+    raise RuntimeError(f"Dataset '{name}' is not cached, has no vendored copy in {VENDOR_DIR} and could not be "
+                       f"downloaded. Run `python -m common.datasets fetch {name}` on a machine with network access.")
+
+
+def _read_vendored(name: str, spec: dict):
+    for suffix in ('.csv', '.csv.gz'):
+        path = VENDOR_DIR / f'{name}{suffix}'
+        if path.exists():
+            return pd.read_csv(path)
+    return None
+
+
+def _download(name: str, spec: dict):
+    if OFFLINE or not spec.get('url'):
+        return None
+    try:
+        with urllib.request.urlopen(spec['url'], timeout=DOWNLOAD_TIMEOUT) as response:
+            return pd.read_csv(io.BytesIO(response.read()))
+    except OSError:
+        return None
+
+
+def _build_fallback(name: str, spec: dict):
+    fallback = spec.get('fallback')
+    return fallback() if fallback else None
+
+
+def _apply_dtypes(df: pd.DataFrame, spec: dict) -> pd.DataFrame:
+    dtypes = {col: dtype for col, dtype in (spec.get('dtypes') or {}).items() if col in df.columns}
+    return df.astype(dtypes) if dtypes else df
+
+
+# Binary cache
+# ----------------------------------------------------------------------------------------------------------------------
+def _cache_path(name: str) -> Path:
+    return CACHE_DIR / (f'{name}.feather' if feather is not None else f'{name}.pkl')
+
+
+def _meta_path(name: str) -> Path:
+    return CACHE_DIR / f'{name}.meta.json'
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_cache(name: str, df: pd.DataFrame, source: str):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _cache_path(name)
+    tmp = path.with_suffix(path.suffix + f'.{os.getpid()}.tmp')
+    if feather is not None:
+        # Uncompressed so the file can be memory mapped and read without copying
+        feather.write_feather(df.reset_index(drop=True), tmp, compression='uncompressed')
+    else:
+        df.to_pickle(tmp)
+    meta = {'name': name, 'source': source, 'url': DATASETS[name].get('url'), 'rows': len(df),
+            'columns': {col: str(dtype) for col, dtype in df.dtypes.items()},
+            'sha256': _sha256(tmp), 'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'written': time.time()}
+    meta_tmp = _meta_path(name).with_suffix(f'.{os.getpid()}.tmp')
+    meta_tmp.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp, path)
+    os.replace(meta_tmp, _meta_path(name))
+
+
+def _cached_meta(name: str) -> dict:
+    return json.loads(_meta_path(name).read_text())
+
+
+def _read_cache(name: str, verify: bool = None):
+    path, meta_path = _cache_path(name), _meta_path(name)
+    if not path.exists() or not meta_path.exists():
+        return None
+
+    verify = VERIFY if verify is None else verify
+    if verify and json.loads(meta_path.read_text()).get('sha256') != _sha256(path):
+        # Corrupt or partially written - rebuild it
+        return None
+
+    if feather is not None:
+        return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+    return pd.read_pickle(path)
+
+
+def clear_cache(name: str = None):
+    for key in [name] if name else list(DATASETS):
+        _cache_path(key).unlink(missing_ok=True)
+        _meta_path(key).unlink(missing_ok=True)
+        _loaded.pop(key, None)
+        _versions.pop(key, None)
+
+
+# COMMAND LINE
+# ======================================================================================================================
+def _fetch(names) -> bool:
+    """Downloads each dataset again; the cached copy is only replaced once the new one is in hand."""
+    ok = True
+    for name in names:
+        spec = DATASETS[name]
+        df = _download(name, spec)
+        if df is None:
+            state = 'kept the cached copy' if _cache_path(name).exists() else 'not cached'
+            print(f"{name:<32} download failed ({'offline' if OFFLINE else spec.get('url')}) - {state}")
+            ok = False
+            continue
+        _write_cache(name, _apply_dtypes(df, spec), 'url')
+        _loaded.pop(name, None)
+        meta = _cached_meta(name)
+        print(f"{name:<32} {len(df):>8,} rows  from {meta['source']:<9} sha256 {meta['sha256'][:12]}")
+    return ok
+
+
+def _vendor(names):
+    VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        path = VENDOR_DIR / f'{name}.csv.gz'
+        load(name).to_csv(path, index=False)
+        print(f'{name:<32} -> {path}')
+
+
+def _bench(names):
+    # In a scratch cache directory, so the real cache is left as it is
+    global CACHE_DIR
+    real_cache = CACHE_DIR
+    print(f"{'dataset':<32} {'cold ms':>9} {'warm ms':>9}")
+    with tempfile.TemporaryDirectory() as scratch:
+        CACHE_DIR = Path(scratch)
+        try:
+            for name in names:
+                start = time.perf_counter()
+                _resolve(name)
+                cold = time.perf_counter() - start
+
+                start = time.perf_counter()
+                _resolve(name)
+                warm = time.perf_counter() - start
+                print(f'{name:<32} {cold * 1e3:>9.1f} {warm * 1e3:>9.1f}')
+        finally:
+            CACHE_DIR = real_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the local dataset cache used by the apps.')
+    parser.add_argument('command', choices=['fetch', 'vendor', 'bench', 'list'])
+    parser.add_argument('names', nargs='*', help='datasets to act on (default: all)')
+    args = parser.parse_args()
+    names = args.names or list(DATASETS)
+
+    if args.command == 'list':
+        for name in names:
+            state = f"cached ({_cached_meta(name)['source']})" if _meta_path(name).exists() else 'not cached'
+            print(f"{name:<32} {state:<19} {DATASETS[name].get('url')}")
+    elif args.command == 'fetch':
+        raise SystemExit(0 if _fetch(names) else 1)
+    else:
+        {'vendor': _vendor, 'bench': _bench}[args.command](names)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import functools
+import threading
+
+from dash import html
+
+
+# DEFERRED LAYOUT
+# ======================================================================================================================
+# deferred_layout(app, build_layout)
+#
+# Sets app.layout to build_layout, to be built once, on the first request, and reused - instead of at import.
+# The figures and frames the layout needs then stay out of the import, so a process starts serving sooner.
+# Under common/launcher.py the preload warm-up makes that first request before forking, so workers still share
+# the built layout.
+#
+# Dash calls a function layout as soon as it is assigned, to keep as the validation layout for callbacks;
+# that call gets an empty placeholder, which the first build replaces. Dash validates the built layout itself
+# when it sets up its server.
+def deferred_layout(app, build):
+    lock = threading.Lock()
+    built = []
+    assigning = [True]
+    placeholder = html.Div()
+
+    @functools.wraps(build)
+    def layout():
+        if assigning:
+            return placeholder
+        if not built:
+            with lock:
+                if not built:
+                    value = build()
+                    if app.validation_layout is placeholder:
+                        app.validation_layout = value
+                    built.append(value)
+        return built[0]
+
+    try:
+        app.layout = layout
+    finally:
+        assigning.clear()
+    return layout
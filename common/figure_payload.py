@@ -0,0 +1,143 @@
+import base64
+import gzip
+
+import flask
+import numpy as np
+from _plotly_utils.utils import plotlyjsShortTypes
+
+try:
+    import brotli
+except ImportError:  # optional - gzip only
+    brotli = None
+
+
+# FIGURE PAYLOAD SLIMMING
+# ======================================================================================================================
+# Figures go over the wire as JSON. Two stages make them smaller:
+#
+# slim_figure(fig) - run on a figure before returning it from a callback (or once, on precomputed figures)
+#   - float arrays are rounded to `digits` significant digits. Values that are integral after rounding go
+#     out as the smallest int type that holds them (population as i4 instead of f8).
+#   - numeric arrays of at least min_length items are sent as base64 typed arrays ({'dtype', 'bdata'}),
+#     which plotly.js decodes directly. Shorter ones stay as JSON lists, where base64 would not pay off.
+#   - float32=True halves float arrays again, at the cost of hover labels showing float32 noise.
+#   Rounded float64 mantissas end in long runs of zero bits, which is what makes the compressed size drop.
+#
+# install_compression(app) - gzip / brotli (if installed) on Dash's JSON responses above a size threshold.
+# Dash's own compress=True needs flask-compress; this needs nothing beyond the standard library.
+DIGITS = 6
+MIN_LENGTH = 8
+COMPRESS_THRESHOLD = 1024
+COMPRESS_MIMETYPES = ('application/json',)
+
+_DTYPES = {short: np.dtype(name) for name, short in plotlyjsShortTypes.items()}
+_INT_TYPES = [np.dtype(t) for t in ('int8', 'uint8', 'int16', 'uint16', 'int32', 'uint32')]
+
+
+def round_significant(values: np.ndarray, digits: int = DIGITS) -> np.ndarray:
+    """Rounds every element to `digits` significant digits; 0, nan and inf pass through."""
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values) & (values != 0)
+    magnitude = np.zeros(values.shape, dtype=np.int64)
+    magnitude[finite] = np.floor(np.log10(np.abs(values[finite])))
+    decimals = digits - 1 - magnitude
+
+    # Dividing by an exact power of ten gives the double closest to the decimal, so the result prints short
+    out = values.copy()
+    up = finite & (decimals >= 0)
+    down = finite & (decimals < 0)
+    scale = 10.0 ** decimals[up]
+    out[up] = np.round(values[up] * scale) / scale
+    scale = 10.0 ** -decimals[down]
+    out[down] = np.round(values[down] / scale) * scale
+    return out
+
+
+def _as_array(value):
+    """The numeric array behind value, or None if value is not a numeric array."""
+    if isinstance(value, np.ndarray):
+        return value if value.dtype.kind in 'fiu' and value.size else None
+    if isinstance(value, dict) and 'bdata' in value and value.get('dtype') in _DTYPES:
+        array = np.frombuffer(base64.b64decode(value['bdata']), dtype=_DTYPES[value['dtype']])
+        if 'shape' in value:
+            array = array.reshape([int(n) for n in str(value['shape']).split(',')])
+        return array
+    if isinstance(value, (list, tuple)) and value and \
+            all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value):
+        return np.asarray(value, dtype=np.float64)
+    return None
+
+
+def _typed_array(array: np.ndarray) -> dict:
+    """The plotly.js typed array spec for array, with ints narrowed to the smallest type that holds them."""
+    if array.dtype.kind in 'iu':
+        low, high = array.min(), array.max()
+        array = array.astype(next(t for t in _INT_TYPES if np.iinfo(t).min <= low and high <= np.iinfo(t).max))
+    spec = {'dtype': plotlyjsShortTypes[str(array.dtype)],
+            'bdata': base64.b64encode(np.ascontiguousarray(array)).decode('ascii')}
+    if array.ndim > 1:
+        spec['shape'] = ', '.join(map(str, array.shape))
+    return spec
+
+
+def _slim_array(array: np.ndarray, digits: int, min_length: int, float32: bool):
+    if array.dtype.kind == 'f':
+        array = round_significant(array, digits)
+        finite = np.isfinite(array)
+        if finite.all() and np.array_equal(array, np.round(array)) and np.abs(array).max() < 2 ** 31:
+            array = array.astype(np.int64)
+        elif float32:
+            array = array.astype(np.float32)
+    elif np.abs(array).max() >= 2 ** 31:
+        return array.tolist()  # plotly.js has no 64-bit int arrays
+
+    if array.size >= min_length:
+        return _typed_array(array)
+    return array.tolist()
+
+
+def slim_figure(figure, digits: int = DIGITS, min_length: int = MIN_LENGTH, float32: bool = False):
+    """
+    figure - a go.Figure or its to_plotly_json() dict
+    Returns a new figure dict; the input is not modified.
+    """
+    if hasattr(figure, 'to_plotly_json'):
+        figure = figure.to_plotly_json()
+
+    def walk(value):
+        array = _as_array(value)
+        if array is not None:
+            return _slim_array(array, digits, min_length, float32)
+        if isinstance(value, dict):
+            # The layout template is theme settings (colorscales etc.) - leave it exactly as plotly wrote it
+            return {k: v if k == 'template' else walk(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [walk(v) for v in value]
+        return value
+
+    return walk(figure)
+
+
+def install_compression(app, threshold: int = COMPRESS_THRESHOLD, level: int = 6,
+                        mimetypes: tuple = COMPRESS_MIMETYPES):
+    """Compresses app's responses of the given mimetypes that are larger than threshold bytes."""
+
+    @app.server.after_request
+    def _compress(response):
+        if response.direct_passthrough or response.status_code != 200 or 'Content-Encoding' in response.headers \
+                or response.mimetype not in mimetypes:
+            return response
+
+        accepted = flask.request.headers.get('Accept-Encoding', '')
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < threshold:
+            return response
+
+        if brotli is not None and 'br' in accepted:
+            response.set_data(brotli.compress(data, quality=4))
+            response.headers['Content-Encoding'] = 'br'
+        elif 'gzip' in accepted:
+            response.set_data(gzip.compress(data, compresslevel=level, mtime=0))
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
@@ -0,0 +1,26 @@
+import hashlib
+import os
+import time
+
+from common.market_data import generate_spread_cube
+
+
+# FVA MODEL (STAND-IN)
+# ======================================================================================================================
+# Placeholder for the per-currency FVA model run behind 'Run Model' in 06_dash. It produces the
+# (rating x bucket) spread grids for the financial and non-financial sectors and takes a configurable
+# amount of time (FVA_MODEL_SECONDS) so the job machinery can be exercised realistically.
+MODEL_SECONDS = float(os.environ.get('FVA_MODEL_SECONDS', 5))
+
+
+def _seed(*parts) -> int:
+    return int.from_bytes(hashlib.blake2b('|'.join(map(str, parts)).encode(), digest_size=8).digest(), 'little')
+
+
+def run_fva_model(currency: str, cob: str, ratings: list, buckets: list) -> dict:
+    """Returns {'fin': DataFrame, 'nonfin': DataFrame} in the viewer table layout (Rating + one column per bucket)."""
+    time.sleep(MODEL_SECONDS)
+
+    cube = generate_spread_cube(dates=[cob], currencies=[currency], sectors=['fin', 'nonfin'],
+                                ratings=ratings, buckets=buckets, seed=_seed(currency, cob))
+    return {sector: cube.grid(sector=sector) for sector in cube.sectors}
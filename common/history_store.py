@@ -0,0 +1,164 @@
+import fcntl
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# COB HISTORY STORE
+# ======================================================================================================================
+# Append-only history of fixed-shape grids, one per close of business (CoB) date, on disk:
+#
+#   meta.json    labels of every axis but the date - e.g. currencies, sectors, ratings, buckets - and the dtype
+#   values.bin   the grids back to back, C order: record i is the grid of the i-th date
+#   dates.bin    the dates, int64 days since epoch, strictly increasing
+#
+# values.bin is read through np.memmap: a CoB lookup is a dict hit plus an index into the mapping, a date
+# range is a slice of it - neither copies anything. Every process mapping the file shares the same page cache
+# pages, and a store opened before the launcher forks hands its mapping to the workers as it is.
+#
+# append() only ever adds to the end of both files: the grid first, then its date, so a reader never sees a
+# date without its grid (the record count is the length of dates.bin). Appends from different processes are
+# serialized with a lock file. Readers notice appends by the size of dates.bin and remap.
+class HistoryStore:
+    def __init__(self, path, axes: dict = None, dtype=np.float64):
+        """
+        path - directory of the store, created if needed
+        axes - {axis name: labels} for a new store, e.g. {'currency': [...], 'sector': [...], ...};
+               for an existing store, None or the axes it was created with - ValueError otherwise
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta_path = self.path / 'meta.json'
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if axes is not None and {name: list(labels) for name, labels in axes.items()} != meta['axes']:
+                raise ValueError(f'{self.path} holds a history of other axes: {meta["axes"]}')
+        elif axes is None:
+            raise ValueError(f'{self.path} is not a history store - pass axes to create one')
+        else:
+            meta = {'axes': {name: list(labels) for name, labels in axes.items()}, 'dtype': np.dtype(dtype).str}
+            tmp = meta_path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(meta))
+            os.replace(tmp, meta_path)
+
+        self.axes = meta['axes']
+        self.dtype = np.dtype(meta['dtype'])
+        self.shape = tuple(len(labels) for labels in self.axes.values())
+        self._labels = {name: {label: i for i, label in enumerate(labels)} for name, labels in self.axes.items()}
+        self._record_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self._values_path = self.path / 'values.bin'
+        self._dates_path = self.path / 'dates.bin'
+        for p in (self._values_path, self._dates_path):
+            p.touch()
+
+        self._lock = threading.Lock()
+        self._count = -1
+        self._values = np.empty((0,) + self.shape, self.dtype)
+        self._dates = np.empty(0, 'datetime64[D]')
+        self._index = {}
+
+    def __len__(self) -> int:
+        self._refresh()
+        return self._count
+
+    # Reading
+    # ------------------------------------------------------------------------------------------------------------------
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        self._refresh()
+        return pd.DatetimeIndex(self._dates)
+
+    def index(self, date) -> int:
+        """Record number of a CoB; KeyError if it is not in the history."""
+        self._refresh()
+        return self._index[pd.Timestamp(date).date()]
+
+    def get(self, date) -> np.ndarray:
+        """The grid of one CoB, a read-only view into the mapping; None if the date is not in the history."""
+        try:
+            return self._values[self.index(date)]
+        except KeyError:
+            return None
+
+    def asof(self, date):
+        """(date, grid) of the latest CoB on or before date, or (None, None) if there is none."""
+        self._refresh()
+        i = np.searchsorted(self._dates, np.datetime64(pd.Timestamp(date).date(), 'D'), side='right') - 1
+        if i < 0:
+            return None, None
+        return pd.Timestamp(self._dates[i]), self._values[i]
+
+    def range(self, start=None, end=None):
+        """(dates, values) for CoBs in [start, end]; values is a (date, ...) view of the mapping, not a copy."""
+        self._refresh()
+        i = 0 if start is None else np.searchsorted(self._dates, np.datetime64(pd.Timestamp(start).date(), 'D'))
+        j = self._count if end is None else np.searchsorted(self._dates, np.datetime64(pd.Timestamp(end).date(), 'D'),
+                                                             side='right')
+        return pd.DatetimeIndex(self._dates[i:j]), self._values[i:j]
+
+    def locate(self, **labels) -> tuple:
+        """Index into a grid from axis labels, e.g. locate(currency='GBP', sector='fin') -> (0, 0)."""
+        return tuple(self._labels[name][labels[name]] if name in labels else slice(None) for name in self.axes)
+
+    # Writing
+    # ------------------------------------------------------------------------------------------------------------------
+    def append(self, date, values: np.ndarray):
+        """Adds the grid of a CoB after the last one. History is never rewritten: an earlier date is refused."""
+        self.append_many([date], np.asarray(values)[None])
+
+    def append_many(self, dates, values: np.ndarray):
+        """Adds (date, ...) grids in one locked write, e.g. a backfill; dates must be increasing and after the last."""
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        days = np.array([np.datetime64(pd.Timestamp(d).date(), 'D') for d in dates], dtype='datetime64[D]')
+        if values.shape != (len(days),) + self.shape:
+            raise ValueError(f'Grids of shape {values.shape[1:]} do not fit a history of {self.shape}')
+        if len(days) > 1 and not (np.diff(days) > np.timedelta64(0, 'D')).all():
+            raise ValueError('CoB dates must be strictly increasing')
+        if not len(days):
+            return
+
+        with open(self.path / 'append.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            count = self._dates_path.stat().st_size // 8
+            if count:
+                last = np.fromfile(self._dates_path, dtype='datetime64[D]', offset=(count - 1) * 8)[0]
+                if days[0] <= last:
+                    raise ValueError(f'CoB {days[0]} is not after the last one in the history ({last})')
+            with open(self._values_path, 'r+b') as f:
+                # Drop grids left by an append that died before writing their dates
+                f.truncate(count * self._record_bytes)
+                f.seek(0, os.SEEK_END)
+                f.write(values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self._dates_path, 'r+b') as f:
+                f.truncate(count * 8)  # and a date cut short
+                f.seek(0, os.SEEK_END)
+                f.write(days.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    # Internals
+    # ------------------------------------------------------------------------------------------------------------------
+    def _refresh(self):
+        count = self._dates_path.stat().st_size // 8
+        if count == self._count:
+            return
+        with self._lock:
+            if count == self._count:
+                return
+            dates = np.fromfile(self._dates_path, dtype='datetime64[D]', count=count)
+            if count:
+                values = np.memmap(self._values_path, dtype=self.dtype, mode='r', shape=(count,) + self.shape)
+            else:
+                values = np.empty((0,) + self.shape, self.dtype)
+            # Earlier views stay valid - they keep their own mapping alive
+            start = max(self._count, 0)
+            index = dict(self._index)
+            index.update((day, i) for i, day in enumerate(dates[start:].tolist(), start))
+            self._values, self._dates, self._index = values, dates, index
+            self._count = count
@@ -0,0 +1,140 @@
+import html
+import importlib
+import os
+import threading
+import time
+import traceback
+from pathlib import Path
+
+import flask
+from dash import Dash, html as dash_html
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
+
+from common.launcher import warm
+
+
+# MULTI-APP HOST
+# ======================================================================================================================
+# Every example app in one server, each under its own URL prefix:
+#
+#   /01_layout/a_basic/   /02_callbacks/b_slider/   ...   /04_datatable/a_basic/   /05_example/   /06_dash/
+#
+#   python -m common.launcher common.host --workers 1 --threads 16
+#
+# pandas, plotly and dash are imported once for all of them, and datasets are shared through the process-wide
+# registry in common/datasets.py - every app asking for 'gapminder_five_year' gets the same frame.
+#
+# An app's module is imported on the first request under its prefix, so apps nobody opens cost nothing.
+# Each app keeps its own Dash instance, callback map and layout, so callback ids cannot clash between apps.
+# Imports run one at a time: the prefix reaches Dash through DASH_REQUESTS_PATHNAME_PREFIX, and callbacks
+# registered with the global @callback are bound to the app just imported (warm() runs Dash's server setup)
+# before the next one is imported.
+#
+# A module that fails to import is not retried: its requests get a 503 with the traceback until the host is
+# restarted, rather than every request paying for (and serializing behind) another failed import.
+ROOT = Path(__file__).resolve().parents[1]
+APP_DIRS = ['01_layout', '02_callbacks', '04_datatable', '05_example', '06_dash']
+
+_import_lock = threading.Lock()
+
+
+def discover_apps() -> dict:
+    """URL prefix -> dotted module for every app; folders holding a single runner.py mount at the folder."""
+    apps = {}
+    for folder in APP_DIRS:
+        for path in sorted((ROOT / folder).glob('*.py')):
+            if path.name == '__init__.py':
+                continue
+            prefix = f'/{folder}' if path.stem == 'runner' else f'/{folder}/{path.stem}'
+            apps[prefix] = f'{folder}.{path.stem}'
+    return apps
+
+
+def _absorb_callbacks():
+    """
+    Dash hands callbacks registered with the global @callback to the next app that sets up its server. After a
+    failed import, a throwaway app takes whatever the module registered, so the next app imported does not.
+    """
+    sink = Dash(__name__)
+    sink.layout = dash_html.Div()
+    warm(sink)
+
+
+class LazyApp:
+    """WSGI app that imports its Dash module on the first request."""
+
+    def __init__(self, prefix: str, module: str):
+        self.prefix = prefix
+        self.module = module
+        self.app = None
+        self.error = None
+        self.load_seconds = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self.app is not None:
+                return self.app
+            if self.error is not None:
+                raise RuntimeError(f'{self.module} failed to load')
+            with _import_lock:
+                start = time.perf_counter()
+                previous = os.environ.get('DASH_REQUESTS_PATHNAME_PREFIX')
+                os.environ['DASH_REQUESTS_PATHNAME_PREFIX'] = self.prefix + '/'
+                try:
+                    app = importlib.import_module(self.module).app
+                    warm(app)
+                except Exception:
+                    self.error = traceback.format_exc()
+                    _absorb_callbacks()
+                    raise
+                finally:
+                    if previous is None:
+                        os.environ.pop('DASH_REQUESTS_PATHNAME_PREFIX', None)
+                    else:
+                        os.environ['DASH_REQUESTS_PATHNAME_PREFIX'] = previous
+            self.app, self.error = app, None
+            self.load_seconds = time.perf_counter() - start
+            return app
+
+    def __call__(self, environ, start_response):
+        if self.app is None:
+            try:
+                self.load()
+            except Exception:
+                start_response('503 Service Unavailable', [('Content-Type', 'text/plain; charset=utf-8')])
+                return [f'{self.module} failed to load:\n\n{self.error}'.encode()]
+        return self.app.server(environ, start_response)
+
+
+class Host:
+    """The combined server; .server is a Flask app, so it is served like any Dash app's server."""
+
+    def __init__(self, apps: dict = None):
+        self.apps = {prefix: LazyApp(prefix, module) for prefix, module in (apps or discover_apps()).items()}
+        self.server = flask.Flask(__name__)
+        self.server.add_url_rule('/', 'index', self.index)
+        self.server.wsgi_app = DispatcherMiddleware(self.server.wsgi_app, self.apps)
+
+    def index(self):
+        rows = []
+        for prefix, lazy in self.apps.items():
+            if lazy.app is not None:
+                state = f'loaded in {lazy.load_seconds:.2f}s'
+            else:
+                state = 'failed' if lazy.error else 'not loaded'
+            rows.append(f'<li><a href="{prefix}/">{html.escape(lazy.module)}</a> - {state}</li>')
+        return f"<h3>Dash apps</h3><ul>{''.join(rows)}</ul>"
+
+    def preload(self):
+        """Imports every app now rather than on first request (e.g. before the launcher forks)."""
+        for lazy in self.apps.values():
+            try:
+                lazy.load()
+            except Exception:
+                pass  # reported on the index page and on requests to the app
+
+
+app = Host()
+if os.environ.get('HOST_PRELOAD') == '1':
+    app.preload()
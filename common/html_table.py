@@ -0,0 +1,56 @@
+from dash import html
+import pandas as pd
+
+
+# HTML TABLE BUILDER
+# ======================================================================================================================
+# Builds the same html.Table tree as the original generate_table (01_layout/c_table.py), but pulls the
+# values out of the frame in one bulk conversion instead of dataframe.iloc[i][col] per cell.
+#
+# dataframe.to_numpy() upcasts to the frame's common dtype, exactly like the row Series that iloc[i]
+# returned, so cell values (e.g. ints shown as floats in an all-numeric frame) are unchanged.
+def generate_table(dataframe: pd.DataFrame, max_rows: int = 10, chunk_size: int = None,
+                   scroll_height: str = None):
+    """
+    max_rows      - rows to render, None for all of them
+    chunk_size    - split the body into one html.Tbody per chunk; with scroll_height the browser skips
+                    layout / paint of chunks that are off screen (content-visibility: auto)
+    scroll_height - wrap the table in a scroll container of that height with a sticky header
+    """
+    rows = dataframe if max_rows is None else dataframe.iloc[:max_rows]
+    columns = list(dataframe.columns)
+
+    header_style = {'position': 'sticky', 'top': 0} if scroll_height else None
+    head = html.Thead(html.Tr([html.Th(col, style=header_style) if header_style else html.Th(col)
+                               for col in columns]))
+
+    if chunk_size is None:
+        body = [html.Tbody(_rows(_values(rows)))]
+    else:
+        body = list(iter_table_chunks(rows, chunk_size, lazy=bool(scroll_height)))
+
+    table = html.Table([head] + body)
+    if not scroll_height:
+        return table
+    return html.Div(table, style={'maxHeight': scroll_height, 'overflowY': 'auto'})
+
+
+def iter_table_chunks(dataframe: pd.DataFrame, chunk_size: int, lazy: bool = False):
+    """Yields one html.Tbody per chunk_size rows, converting each chunk in bulk."""
+    # Rough row height so the scrollbar is right before the skipped chunks are laid out
+    style = {'contentVisibility': 'auto', 'containIntrinsicSize': f'auto {chunk_size * 24}px'} if lazy else None
+    for start in range(0, len(dataframe), chunk_size):
+        values = _values(dataframe.iloc[start:start + chunk_size])
+        yield html.Tbody(_rows(values), style=style) if style else html.Tbody(_rows(values))
+
+
+def _values(dataframe: pd.DataFrame) -> list:
+    values = dataframe.to_numpy()
+    if values.dtype.kind in 'mM':
+        # tolist() would turn datetime64 into raw ints - keep Timestamps like iloc does
+        values = dataframe.to_numpy(dtype=object)
+    return values.tolist()
+
+
+def _rows(values: list) -> list:
+    return [html.Tr([html.Td(value) for value in row]) for row in values]
@@ -0,0 +1,117 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from common.market_data import bucket_years
+
+
+# CUSTOM INDEX ENGINE
+# ======================================================================================================================
+# User-defined indices over a set of constituents (bonds with currency, sector, rating, maturity, spread and
+# notional): pick ratings, currencies, sectors and the buckets to report, get the notional weighted spread
+# of every (rating x bucket) cell plus an 'Index' row over all the chosen ratings.
+#
+# Re-bucketing: each constituent goes to the nearest chosen bucket by maturity (the edges are the midpoints
+# between bucket tenors), so the same bonds can be reported on 3y / 10y / 30y or on all twelve buckets.
+# Currencies are pooled - a GBP + EUR index averages both sets of bonds by notional.
+#
+# The categorical columns are factorized once when the engine is built, into one (rating, currency, sector)
+# group code per constituent; a query is then one lookup of those codes in a small table of chosen groups,
+# one searchsorted for the buckets and np.bincount over the flat (rating, bucket) cell number for notional
+# and notional x spread - no groupby, no per-row Python. Results are kept in an LRU
+# keyed by the normalized query (selections deduplicated and put in a fixed order), so the same index asked
+# with its checkboxes ticked in a different order is not computed again.
+class IndexEngine:
+    def __init__(self, constituents: pd.DataFrame, ratings: list, buckets: list, cache_size: int = 64):
+        """ratings / buckets - every rating and bucket that can be asked for, in display order"""
+        self.ratings = list(ratings)
+        self.buckets = list(buckets)
+        self.cache_size = cache_size
+        self.size = len(constituents)
+
+        rating = pd.Categorical(constituents['rating'], categories=self.ratings).codes.astype(np.int64)
+        currency, self.currencies = pd.factorize(constituents['currency'], sort=True)
+        sector, self.sectors = pd.factorize(constituents['sector'], sort=True)
+        # One code per (rating, currency, sector) - a query turns it into its rating row with one lookup
+        self._shape = (len(self.ratings), len(self.currencies), len(self.sectors))
+        self._group = np.where(rating >= 0, np.ravel_multi_index((np.maximum(rating, 0), currency, sector),
+                                                                  self._shape), -1)
+        self._maturity = constituents['maturity'].to_numpy(dtype=np.float64)
+        self._notional = constituents['notional'].to_numpy(dtype=np.float64)
+        self._weighted = self._notional * constituents['spread'].to_numpy(dtype=np.float64)
+
+        self._years = dict(zip(self.buckets, bucket_years(self.buckets)))
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def normalize(self, ratings=None, buckets=None, currencies=None, sectors=None) -> tuple:
+        """The query key: known values only, without duplicates, in display / tenor / sorted order. None = all."""
+        def pick(selected, known):
+            if selected is None:
+                return tuple(known)
+            selected = set(selected)
+            return tuple(value for value in known if value in selected)
+
+        return (pick(ratings, self.ratings),
+                tuple(sorted(pick(buckets, self.buckets), key=self._years.get)),
+                pick(currencies, self.currencies.tolist()),
+                pick(sectors, self.sectors.tolist()))
+
+    def index(self, ratings=None, buckets=None, currencies=None, sectors=None) -> dict:
+        """
+        {'spread': DataFrame, 'notional': DataFrame, 'count': DataFrame} - rows the chosen ratings then
+        'Index', columns the chosen buckets; spread is NaN where a cell has no constituents.
+        """
+        key = self.normalize(ratings, buckets, currencies, sectors)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+        result = self._aggregate(*key)
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _aggregate(self, ratings: tuple, buckets: tuple, currencies: tuple, sectors: tuple) -> dict:
+        n_ratings, n_buckets = len(ratings), len(buckets)
+        rows = list(ratings) + ['Index']
+        if not n_ratings or not n_buckets or not currencies or not sectors:
+            empty = pd.DataFrame(np.nan, index=rows, columns=list(buckets))
+            return {'spread': empty, 'notional': empty.fillna(0), 'count': empty.fillna(0).astype(int)}
+
+        # Row of the result for every (rating, currency, sector) group, -1 if the query leaves it out - plus a
+        # last entry for constituents with a rating outside the engine's list
+        slots = np.full(self._shape, -1)
+        chosen = np.ix_([self.ratings.index(r) for r in ratings], self.currencies.get_indexer(list(currencies)),
+                        self.sectors.get_indexer(list(sectors)))
+        slots[chosen] = np.arange(n_ratings)[:, None, None]
+        slot = np.append(slots.ravel(), -1)[self._group]
+        mask = slot >= 0
+
+        years = np.array([self._years[b] for b in buckets])
+        bucket = np.searchsorted((years[1:] + years[:-1]) / 2, self._maturity[mask])
+        cell = slot[mask] * n_buckets + bucket
+
+        size = n_ratings * n_buckets
+        notional = np.bincount(cell, weights=self._notional[mask], minlength=size).reshape(n_ratings, n_buckets)
+        weighted = np.bincount(cell, weights=self._weighted[mask], minlength=size).reshape(n_ratings, n_buckets)
+        count = np.bincount(cell, minlength=size).reshape(n_ratings, n_buckets)
+
+        notional = np.vstack([notional, notional.sum(axis=0)])
+        weighted = np.vstack([weighted, weighted.sum(axis=0)])
+        count = np.vstack([count, count.sum(axis=0)])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            spread = np.where(notional > 0, weighted / notional, np.nan)
+
+        def frame(values):
+            return pd.DataFrame(values, index=rows, columns=list(buckets))
+
+        return {'spread': frame(spread), 'notional': frame(notional), 'count': frame(count)}
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+
+# DENSE INDICATOR CUBE
+# ======================================================================================================================
+# Long-format data (one row per year / indicator / country) is pivoted once into a dense
+# (Year x Indicator x Country) array. A callback then slices two aligned country vectors instead of
+# masking the whole frame, and a country missing either indicator is NaN rather than silently shifting
+# the pairing.
+class IndicatorCube:
+    def __init__(self, df: pd.DataFrame, year: str = 'Year', indicator: str = 'Indicator Name',
+                 country: str = 'Country Name', value: str = 'Value'):
+        year_codes, self.years = pd.factorize(df[year], sort=True)
+        indicator_codes, self.indicators = pd.factorize(df[indicator], sort=True)
+        country_codes, self.countries = pd.factorize(df[country], sort=True)
+
+        self.values = np.full((len(self.years), len(self.indicators), len(self.countries)), np.nan)
+        self.values[year_codes, indicator_codes, country_codes] = df[value].to_numpy(dtype=float)
+
+        self._year_index = {y: i for i, y in enumerate(self.years.tolist())}
+        self._indicator_index = {name: i for i, name in enumerate(self.indicators.tolist())}
+
+    def slice(self, year, indicator: str) -> np.ndarray:
+        """Values of one indicator for every country in a year (NaN where missing, all NaN for an unknown
+        year or indicator - e.g. a cleared dropdown)."""
+        y, i = self._year_index.get(year), self._indicator_index.get(indicator)
+        if y is None or i is None:
+            return np.full(len(self.countries), np.nan)
+        return self.values[y, i]
+
+    def pair(self, year, x_indicator: str, y_indicator: str):
+        """
+        Aligned x / y vectors for the countries that report both indicators in a year.
+        Returns (x, y, countries).
+        """
+        x = self.slice(year, x_indicator)
+        y = self.slice(year, y_indicator)
+        mask = ~(np.isnan(x) | np.isnan(y))
+        return x[mask], y[mask], self.countries[mask]
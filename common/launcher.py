@@ -0,0 +1,244 @@
+import argparse
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import flask
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+
+# PRODUCTION LAUNCHER
+# ======================================================================================================================
+# Serves any of the example apps with a pre-fork pool of worker processes, each handling requests on a fixed
+# pool of threads - instead of app.run_server(debug=True), the single dev server with the reloader and debug
+# tooling on.
+#
+#   python -m common.launcher 02_callbacks.b_slider --workers 4 --threads 8 --port 8050
+#   python -m common.launcher 06_dash/runner.py
+#
+# - The app module is imported once in the master (--preload, the default), so the frames it loads at import
+#   (datasets, dummy_df, precomputed figures...) are built once and shared copy-on-write by every worker.
+#   The layout and callback map are warmed up and gc.freeze() keeps the collector from touching those pages.
+# - GET /healthz answers {'status': 'ok', 'app', 'pid', 'uptime'} from whichever worker takes it
+# - SIGHUP is a graceful reload: a new set of workers starts, then the old ones stop accepting and finish
+#   their in-flight requests. With --preload the workers fork from the already imported app, so a code change
+#   needs --no-preload (each worker then imports the app itself) or a restart - as with gunicorn.
+# - SIGTERM / Ctrl-C drains every worker (up to --graceful-timeout seconds) and exits
+# - A worker that dies is replaced
+# - WEB_WORKER in the environment is the worker's slot, 0 to workers - 1 (a replacement takes the slot of the
+#   worker it replaces), and 'master' in the master. designated_worker() is True in slot 0 only, so what must
+#   run once per deployment - the 06_dash push hub and live feed - starts after the fork, in one worker, and
+#   never in the master while it preloads and warms the app (threads and their locks do not survive a fork).
+# /metrics (common/metrics.py) and the in-process caches are per worker.
+#
+# Measured with benchmarks/bench_launcher.py: b_slider full-figure updates from 16 closed-loop clients,
+# 15 s, on a 1 vCPU container shared with the load generator:
+#   dev server, app.run(debug=True)     294 req/s   p50 54 ms   p95  66 ms
+#   launcher, 1 worker x 8 threads      348 req/s   p50 45 ms   p95  63 ms
+#   launcher, 2 workers x 8 threads     342 req/s   p50 44 ms   p95  84 ms
+#   launcher, 4 workers x 4 threads     317 req/s   p50 45 ms   p95  99 ms
+# With one core the gain (+18%) only comes from dropping the debug tooling and thread-per-request; extra
+# workers just contend for the core. They pay off in proportion to cores: workers = cores, threads 4-8.
+# Preloading is what keeps that affordable - 2 workers of b_slider hold 5-7 MB unique memory each, against
+# 122 MB each with --no-preload.
+ROOT = Path(__file__).resolve().parents[1]
+HEALTH_PATH = '/healthz'
+GRACEFUL_TIMEOUT = 30
+WORKER_ENV = 'WEB_WORKER'
+
+_started = time.time()
+
+
+def load_app(path: str):
+    """The Dash app of '02_callbacks.b_slider' or '02_callbacks/b_slider.py', with /healthz added."""
+    name = path[:-3].replace('/', '.').replace('\\', '.') if path.endswith('.py') else path
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    app = importlib.import_module(name).app
+
+    def health():
+        return flask.jsonify(status='ok', app=name, pid=os.getpid(), uptime=round(time.time() - _started, 1))
+
+    app.server.add_url_rule(HEALTH_PATH, 'healthz', health)
+    return app
+
+
+def designated_worker() -> bool:
+    """True in the launcher's worker 0, and in a process serving the app without the launcher (app.run_server)."""
+    return os.environ.get(WORKER_ENV, '0') == '0'
+
+
+def warm(app):
+    """Builds what Dash otherwise builds on the first request, so it happens once, before forking."""
+    client = app.server.test_client()
+    for path in ('/', '/_dash-layout', '/_dash-dependencies'):
+        client.get(path)
+
+
+class _Handler(WSGIRequestHandler):
+    # One request per connection: a kept-alive connection would hold a pool thread while idle
+    protocol_version = 'HTTP/1.0'
+
+
+class _QuietHandler(_Handler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """werkzeug's server on an inherited listening socket, handling connections on a fixed thread pool."""
+    multithread = True
+
+    def __init__(self, wsgi_app, fd: int, threads: int, access_log: bool = False):
+        super().__init__('', 0, wsgi_app, handler=_Handler if access_log else _QuietHandler, fd=fd)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='request')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def _worker(listener: socket.socket, path: str, app, threads: int, access_log: bool, slot: int = 0):
+    global _started
+    _started = time.time()
+    os.environ[WORKER_ENV] = str(slot)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # the master turns Ctrl-C into SIGTERM
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    if app is None:
+        app = load_app(path)
+
+    server = PooledWSGIServer(app.server, listener.fileno(), threads, access_log)
+    # shutdown() waits for serve_forever to return, so it has to run off the main thread
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    server.serve_forever(poll_interval=0.5)
+    server.pool.shutdown(wait=True)
+    server.server_close()
+
+
+def serve(path: str, host: str = '127.0.0.1', port: int = 8050, workers: int = 2, threads: int = 8,
+          preload: bool = True, access_log: bool = False, graceful_timeout: float = GRACEFUL_TIMEOUT):
+    listener = socket.create_server((host, port), backlog=2048)
+    listener.setblocking(False)  # workers race to accept - the losers must not block
+    listener.set_inheritable(True)
+    # Where the app is served, for what runs alongside it - the push hub (common/push.py) binds the same host
+    os.environ['HOST'], os.environ['PORT'] = host, str(port)
+    os.environ[WORKER_ENV] = 'master'
+
+    app = None
+    if preload:
+        app = load_app(path)
+        warm(app)
+        gc.collect()
+        gc.freeze()
+
+    print(f'Serving {path} on http://{host}:{port} - {workers} worker(s) x {threads} thread(s), pid {os.getpid()}',
+          flush=True)
+    if workers < 1 or not hasattr(os, 'fork'):
+        _worker(listener, path, app, threads, access_log)
+        return
+
+    children = {}  # pid -> (generation, started, slot)
+    state = {'generation': 0, 'stop': False, 'reload': False}
+
+    def spawn(slot):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _worker(listener, path, app, threads, access_log, slot)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = (state['generation'], time.monotonic(), slot)
+
+    signal.signal(signal.SIGTERM, lambda *_: state.update(stop=True))
+    signal.signal(signal.SIGINT, lambda *_: state.update(stop=True))
+    signal.signal(signal.SIGHUP, lambda *_: state.update(reload=True))
+
+    for slot in range(workers):
+        spawn(slot)
+
+    while not state['stop']:
+        time.sleep(0.2)
+        if state['reload']:
+            state['reload'] = False
+            old = list(children)
+            state['generation'] += 1
+            for slot in range(workers):
+                spawn(slot)
+            for pid in old:
+                _signal(pid, signal.SIGTERM)
+            print(f"Reloaded - generation {state['generation']}", flush=True)
+
+        for pid, generation, started, slot in _reap(children):
+            if generation == state['generation'] and not state['stop']:
+                if time.monotonic() - started < 1:
+                    time.sleep(1)  # crashing on start - don't spin
+                spawn(slot)
+
+    for pid in list(children):
+        _signal(pid, signal.SIGTERM)
+    deadline = time.monotonic() + graceful_timeout
+    while children and time.monotonic() < deadline:
+        list(_reap(children))
+        time.sleep(0.1)
+    for pid in list(children):
+        _signal(pid, signal.SIGKILL)
+    listener.close()
+
+
+def _signal(pid: int, sig):
+    try:
+        os.kill(pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def _reap(children: dict):
+    """Yields (pid, generation, started, slot) for every child that has exited."""
+    while children:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        if pid in children:
+            yield (pid, *children.pop(pid))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a Dash app with a pool of worker processes')
+    parser.add_argument('app', help="dotted module or path, e.g. 02_callbacks.b_slider or 06_dash/runner.py")
+    parser.add_argument('--host', default=os.environ.get('HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8050)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_WORKERS', 2)))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WEB_THREADS', 8)))
+    parser.add_argument('--no-preload', dest='preload', action='store_false',
+                        help='import the app in each worker instead of once in the master')
+    parser.add_argument('--access-log', action='store_true')
+    parser.add_argument('--graceful-timeout', type=float, default=GRACEFUL_TIMEOUT)
+    args = parser.parse_args()
+    serve(args.app, args.host, args.port, args.workers, args.threads, args.preload, args.access_log,
+          args.graceful_timeout)
+
+
+if __name__ == '__main__':
+    main()
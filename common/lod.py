@@ -0,0 +1,146 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+
+
+# LEVEL OF DETAIL FOR LARGE SCATTERS
+# ======================================================================================================================
+# A bubble chart of every point is fine for a few thousand points. Past that the browser stalls drawing them
+# and the JSON grows with the data (px.scatter moves to WebGL by itself above 1000 points, but still sends
+# every one: 38 MB for a million). lod_figure(df, ...) picks the rendering by how many points are in view:
+#
+#   up to SVG_MAX_POINTS     the app's own px.scatter figure (lod_figure is not called - see needs_lod)
+#   up to GL_MAX_POINTS      scattergl traces, one per colour, bubble sizes as px computes them
+#   more                     a density image: points counted into a BINS grid with np.bincount and sent as
+#                            one heatmap - the payload depends on BINS, never on the number of points
+#
+# Zooming re-aggregates: relayout_ranges(relayoutData) gives the range the user zoomed to, and lod_figure
+# with x_range / y_range bins (or plots) only the points in it, at the full BINS resolution. Zoomed far
+# enough in, the points in view drop under GL_MAX_POINTS and come back as markers.
+# A relayout event carries only the axes it changed, so panning one axis resets the other to its full range.
+SVG_MAX_POINTS = int(os.environ.get('LOD_SVG_MAX_POINTS', 5_000))
+GL_MAX_POINTS = int(os.environ.get('LOD_GL_MAX_POINTS', 50_000))
+BINS = (200, 150)
+
+
+def needs_lod(n_points: int) -> bool:
+    return n_points > SVG_MAX_POINTS
+
+
+def relayout_ranges(relayout_data, log_x: bool = False, log_y: bool = False):
+    """
+    (x_range, y_range) in data units from a dcc.Graph relayoutData event, None for an axis reset to autorange
+    or not in the event. Returns None for events that do not change the view (autosize, dragmode...).
+    """
+    if not relayout_data:
+        return None
+    x_range = _axis_range(relayout_data, 'xaxis', log_x)
+    y_range = _axis_range(relayout_data, 'yaxis', log_y)
+    if x_range is None and y_range is None:
+        return None
+    return (None if x_range == 'auto' else x_range), (None if y_range == 'auto' else y_range)
+
+
+def _axis_range(relayout_data: dict, axis: str, log: bool):
+    if relayout_data.get(f'{axis}.autorange'):
+        return 'auto'
+    if f'{axis}.range[0]' in relayout_data:
+        low, high = relayout_data[f'{axis}.range[0]'], relayout_data[f'{axis}.range[1]']
+    elif f'{axis}.range' in relayout_data:
+        low, high = relayout_data[f'{axis}.range']
+    else:
+        return None
+    low, high = sorted((float(low), float(high)))
+    # plotly reports ranges of log axes as exponents
+    return (10 ** low, 10 ** high) if log else (low, high)
+
+
+def lod_figure(df: pd.DataFrame, x: str, y: str, color: str = None, size: str = None, hover_name: str = None,
+               log_x: bool = False, size_max: float = 20, x_range=None, y_range=None, bins=BINS) -> go.Figure:
+    xs = df[x].to_numpy(dtype=np.float64)
+    ys = df[y].to_numpy(dtype=np.float64)
+    visible = np.isfinite(xs) & np.isfinite(ys)
+    if log_x:
+        visible &= xs > 0
+    if x_range is not None:
+        visible &= (xs >= x_range[0]) & (xs <= x_range[1])
+    if y_range is not None:
+        visible &= (ys >= y_range[0]) & (ys <= y_range[1])
+    n_visible = int(visible.sum())
+
+    if n_visible <= GL_MAX_POINTS:
+        fig = _gl_figure(df[visible], x, y, color, size, hover_name, size_max)
+    else:
+        fig = _density_figure(xs[visible], ys[visible], log_x, x_range, y_range, bins)
+        fig.update_layout(title_text=f'{n_visible:,} points in view - density')
+
+    # uirevision keeps the user's zoom across updates; the ranges are set explicitly, since the data sent is
+    # only what is in them
+    fig.update_layout(uirevision='lod', xaxis_title=x, yaxis_title=y, legend_title_text=color)
+    fig.update_xaxes(type='log' if log_x else 'linear')
+    if x_range is not None:
+        fig.update_xaxes(range=list(np.log10(x_range)) if log_x else list(x_range))
+    if y_range is not None:
+        fig.update_yaxes(range=list(y_range))
+    return fig
+
+
+def _gl_figure(df, x, y, color, size, hover_name, size_max) -> go.Figure:
+    marker = {}
+    if size:
+        # Bubble area proportional to size, largest bubble size_max pixels across - px.scatter's scaling
+        sizes = df[size].to_numpy(dtype=np.float64)
+        peak = np.nanmax(sizes) if len(sizes) else 1
+        marker = {'sizemode': 'area', 'sizeref': 2.0 * peak / size_max ** 2 if peak > 0 else 1}
+
+    groups = df.groupby(color, sort=False) if color else [(None, df)]
+    traces = []
+    for name, group in groups:
+        trace_marker = dict(marker, size=group[size].to_numpy()) if size else marker
+        traces.append(go.Scattergl(x=group[x].to_numpy(), y=group[y].to_numpy(), mode='markers', name=name,
+                                   marker=trace_marker, showlegend=color is not None,
+                                   hovertext=group[hover_name].to_numpy() if hover_name else None))
+    return go.Figure(traces)
+
+
+def _extent(values: np.ndarray, value_range, log: bool):
+    """(low, high) to bin over - value_range or the data's extent - as exponents on log axes."""
+    if value_range is not None:
+        low, high = value_range
+    elif len(values):
+        low, high = values.min(), values.max()
+    else:
+        low, high = (1, 10) if log else (0, 1)
+    if log:
+        low, high = np.log10(low), np.log10(high)
+    if high <= low:
+        low, high = low - 0.5, high + 0.5
+    return low, high
+
+
+def _bin_index(values: np.ndarray, low: float, high: float, n: int, log: bool) -> np.ndarray:
+    scaled = np.log10(values) if log else values
+    index = ((scaled - low) * (n / (high - low))).astype(np.int64)
+    return np.clip(index, 0, n - 1)
+
+
+def _density_figure(xs, ys, log_x, x_range, y_range, bins) -> go.Figure:
+    nx, ny = bins
+    x_low, x_high = _extent(xs, x_range, log_x)
+    y_low, y_high = _extent(ys, y_range, False)
+
+    # One pass: flat bin number per point, counted with bincount - no sort, no per-point Python
+    flat = _bin_index(ys, y_low, y_high, ny, False) * nx + _bin_index(xs, x_low, x_high, nx, log_x)
+    counts = np.bincount(flat, minlength=nx * ny).reshape(ny, nx).astype(np.float32)
+    counts[counts == 0] = np.nan  # empty bins stay transparent
+
+    x_centres = x_low + (np.arange(nx) + 0.5) * (x_high - x_low) / nx
+    y_centres = y_low + (np.arange(ny) + 0.5) * (y_high - y_low) / ny
+    if log_x:
+        x_centres = 10 ** x_centres
+
+    return go.Figure(go.Heatmap(x=x_centres.astype(np.float32), y=y_centres.astype(np.float32), z=counts,
+                                name='density', colorscale='Viridis', colorbar={'title': {'text': 'points'}},
+                                hovertemplate='%{z:,.0f} points<extra></extra>'))
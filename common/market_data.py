@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+
+# SYNTHETIC MARKET DATA
+# ======================================================================================================================
+# Seeded (date x currency x sector x rating x bucket) credit spread cube, in bp, drawn in one vectorized
+# call. Used for the viewer tables in 06_dash and for benchmarks / load tests, so every number comes from
+# reproducible data: the same arguments always give the same cube.
+#
+# Shape of the curves:
+#   spread = rating level x currency x sector x term structure x market factor x cell noise
+# - the term structure rises steeply at the short end and flattens out (1 - exp(-t / tau))
+# - the market factor is a mean reverting AR(1) per (date, currency) on both the level and the slope
+RATINGS = ['AAA', 'AA', 'A', 'BBB']
+BUCKETS = ['3y', '5y', '7y', '10y', '12y', '15y', '20y', '25y', '30y', '35y', '40y', '70y']
+CURRENCIES = ['GBP', 'EUR', 'USD']
+SECTORS = ['fin', 'nonfin']
+
+RATING_LEVEL = {'AAA': 35., 'AA': 55., 'A': 85., 'BBB': 140., 'BB': 260., 'B': 420.}
+CURRENCY_MULTIPLIER = {'GBP': 1.0, 'EUR': 0.85, 'USD': 1.1}
+SECTOR_MULTIPLIER = {'fin': 1.1, 'nonfin': 1.0}
+
+
+class SpreadCube:
+    def __init__(self, values: np.ndarray, dates, currencies, sectors, ratings, buckets):
+        self.values = values
+        self.dates = pd.DatetimeIndex(dates)
+        self.currencies = list(currencies)
+        self.sectors = list(sectors)
+        self.ratings = list(ratings)
+        self.buckets = list(buckets)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def grid(self, date=None, currency: str = None, sector: str = None, decimals: int = 0) -> pd.DataFrame:
+        """One (rating x bucket) grid in the viewer table layout: a Rating column then one column per bucket."""
+        d = 0 if date is None else self.dates.get_loc(pd.Timestamp(date))
+        c = 0 if currency is None else self.currencies.index(currency)
+        s = 0 if sector is None else self.sectors.index(sector)
+
+        values = self.values[d, c, s].round(decimals)
+        df = pd.DataFrame(values.astype(int) if decimals == 0 else values, columns=self.buckets)
+        df.insert(0, 'Rating', self.ratings)
+        return df
+
+    def to_long(self) -> pd.DataFrame:
+        """One row per cell - date, currency, sector, rating, bucket, spread."""
+        index = pd.MultiIndex.from_product([self.dates, self.currencies, self.sectors, self.ratings, self.buckets],
+                                           names=['date', 'currency', 'sector', 'rating', 'bucket'])
+        return pd.DataFrame({'spread': self.values.ravel()}, index=index).reset_index()
+
+
+def bucket_years(buckets) -> np.ndarray:
+    return np.array([float(b.rstrip('y')) for b in buckets])
+
+
+def generate_spread_cube(dates=None, currencies=CURRENCIES, sectors=SECTORS, ratings=RATINGS, buckets=BUCKETS,
+                         seed: int = 0, noise: float = 0.03, dtype=np.float64) -> SpreadCube:
+    """
+    dates - anything pd.DatetimeIndex accepts, or an int for that many business days ending today
+    """
+    if dates is None or isinstance(dates, int):
+        dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=dates or 1)
+    dates = pd.DatetimeIndex(dates)
+    n_dates, n_ccy = len(dates), len(currencies)
+
+    rng = np.random.default_rng(seed)
+    # One draw for everything: two factor shocks per (date, currency) and the per-cell noise
+    shape = (n_dates, n_ccy, len(sectors), len(ratings), len(buckets))
+    draws = rng.standard_normal(size=2 * n_dates * n_ccy + int(np.prod(shape)))
+    factor_shocks = draws[:2 * n_dates * n_ccy].reshape(2, n_dates, n_ccy)
+    cell_noise = draws[2 * n_dates * n_ccy:].reshape(shape)
+
+    # AR(1) market factors - the recursion only runs over dates, on (currency,) sized vectors
+    phi, vol = 0.98, np.array([0.02, 0.01])[:, None]
+    factors = np.empty_like(factor_shocks)
+    factors[:, 0] = factor_shocks[:, 0] * vol / np.sqrt(1 - phi ** 2)
+    for t in range(1, n_dates):
+        factors[:, t] = phi * factors[:, t - 1] + vol * factor_shocks[:, t]
+    level_factor, slope_factor = factors
+
+    years = bucket_years(buckets)
+    tau = 8.0
+    term = 1 - np.exp(-years / tau)                                                  # (bucket,)
+    slope = 0.8 * np.exp(slope_factor)[:, :, None, None, None]                        # (date, ccy, 1, 1, 1)
+    curve = 0.5 + slope * term                                                        # (date, ccy, 1, 1, bucket)
+
+    level = (np.array([RATING_LEVEL.get(r, 100.) for r in ratings])[None, None, None, :, None]
+             * np.array([CURRENCY_MULTIPLIER.get(c, 1.) for c in currencies])[None, :, None, None, None]
+             * np.array([SECTOR_MULTIPLIER.get(s, 1.) for s in sectors])[None, None, :, None, None]
+             * np.exp(level_factor)[:, :, None, None, None])
+
+    values = (level * curve * np.exp(noise * cell_noise)).astype(dtype, copy=False)
+    return SpreadCube(values, dates, currencies, sectors, ratings, buckets)
+
+
+def generate_constituents(cube: SpreadCube, n: int, date=None, seed: int = 0, noise: float = 0.1,
+                          max_years: float = None) -> pd.DataFrame:
+    """
+    n synthetic bonds priced off one date of the cube: currency, sector and rating drawn uniformly, maturity
+    uniform up to the longest bucket, spread read off the (currency, sector, rating) curve at the maturity
+    (linear between buckets) times log-normal noise, notional log-normal (mm).
+    """
+    d = 0 if date is None else cube.dates.get_loc(pd.Timestamp(date))
+    rng = np.random.default_rng(seed)
+    years = bucket_years(cube.buckets)
+    max_years = max_years or years[-1]
+
+    currency = rng.integers(0, len(cube.currencies), n)
+    sector = rng.integers(0, len(cube.sectors), n)
+    rating = rng.integers(0, len(cube.ratings), n)
+    maturity = rng.uniform(1.0, max_years, n)
+
+    # Curve of every bond at once: the two buckets around its maturity, interpolated
+    upper = np.clip(np.searchsorted(years, maturity), 1, len(years) - 1)
+    lower = upper - 1
+    t = np.clip((maturity - years[lower]) / (years[upper] - years[lower]), 0, 1)
+    grid = cube.values[d]
+    spread = ((grid[currency, sector, rating, lower] * (1 - t) + grid[currency, sector, rating, upper] * t)
+              * np.exp(noise * rng.standard_normal(n)))
+
+    return pd.DataFrame({'currency': np.array(cube.currencies)[currency],
+                         'sector': np.array(cube.sectors)[sector],
+                         'rating': np.array(cube.ratings)[rating],
+                         'maturity': maturity.round(2),
+                         'spread': spread.round(1),
+                         'notional': rng.lognormal(5, 1, n).round(1)})
@@ -0,0 +1,232 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from dash import ctx
+from dash.exceptions import MissingCallbackContextException
+
+
+# MEMOIZED CALLBACKS
+# ======================================================================================================================
+# @memoized_callback caches a pure callback's return value by its arguments. It goes under the Dash decorator:
+#
+#   @app.callback(Output('graph', 'figure'), Input('year', 'value'))
+#   @memoized_callback(maxsize=64, shared=True)
+#   def update_graph(year): ...
+#
+# Two tiers:
+#   - in-process: an LRU of maxsize entries, each kept ttl seconds (None = until evicted)
+#   - shared (optional): a diskcache (SQLite) directory every worker process opens, so a result computed by
+#     one worker is a hit in the others. shared=True uses CALLBACK_CACHE_DIR (default .cache/callbacks).
+#     Shared entries outlive the process, so they expire after SHARED_TTL seconds unless ttl says otherwise
+# Arguments are normalized to canonical JSON before hashing, so dicts (active_cell) and lists key fine and
+# {'row': 1, 'column': 2} == {'column': 2, 'row': 1}.
+#
+# Stampede guard: concurrent calls with the same key compute once - threads in a process wait on the first
+# one, and with a shared tier other processes wait on a lock entry in the cache (as common/model_jobs does).
+# Exceptions (PreventUpdate included) are never cached.
+#
+# Shared entries must not outlive what they were computed from:
+#   - the cache is named after the callback's file and a digest of that file's source, so editing the script
+#     (the callback, a helper it calls, a module constant) retires every entry it wrote
+#   - version=... is part of every key, for inputs the arguments do not show: the data the callback reads
+#     (common.datasets.version(name)) and settings of the helpers it calls. A callable is called per request.
+#
+# Callbacks that read ctx (e.g. return a Patch only when triggered) pass vary_on_trigger=True so the
+# triggering props are part of the key. Hit / miss counters: func.cache_info(), and /metrics via
+# common/metrics.py.
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.environ.get('CALLBACK_CACHE_DIR', ROOT / '.cache' / 'callbacks'))
+LOCK_TIMEOUT = 60
+SHARED_TTL = float(os.environ.get('CALLBACK_CACHE_TTL', 24 * 3600))
+POLL_SECONDS = 0.05
+
+_MISSING = object()
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+# Every MemoCache created, for reporting
+caches = []
+
+
+def shared_cache(directory=None):
+    """One diskcache.Cache per directory per process."""
+    import diskcache  # only needed with a shared tier
+
+    directory = str(directory or CACHE_DIR)
+    with _shared_lock:
+        if directory not in _shared_caches:
+            _shared_caches[directory] = diskcache.Cache(directory)
+        return _shared_caches[directory]
+
+
+def normalize_key(*args, **kwargs) -> str:
+    """A stable digest of JSON-like arguments - equal dicts give equal keys whatever their order."""
+    text = json.dumps([args, kwargs], sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+class MemoCache:
+    def __init__(self, name: str, maxsize: int = 128, ttl: float = None, shared=None,
+                 lock_timeout: float = LOCK_TIMEOUT):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        if shared is None or shared is False:
+            self.shared = None
+        elif hasattr(shared, 'add'):
+            self.shared = shared
+        else:
+            self.shared = shared_cache(None if shared is True else shared)
+        self.lock_timeout = lock_timeout
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires, value)
+        self._inflight = {}            # key -> threading.Event set when the computing call finishes
+        self.counts = {'hit': 0, 'shared_hit': 0, 'miss': 0, 'wait': 0}
+        caches.append(self)
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _local_get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires, value = entry
+        if expires is not None and expires < time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _local_put(self, key, value):
+        self._entries[key] = (None if self.ttl is None else time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: str, compute):
+        while True:
+            with self._lock:
+                value = self._local_get(key)
+                if value is not _MISSING:
+                    self.counts['hit'] += 1
+                    return value
+                event = self._inflight.get(key)
+                leader = event is None
+                if leader:
+                    event = self._inflight[key] = threading.Event()
+                else:
+                    self.counts['wait'] += 1
+            if not leader:
+                # If the leader failed nothing was cached - the loop makes one of the waiters the next leader
+                event.wait(self.lock_timeout)
+                continue
+
+            try:
+                value = self._shared_get_or_compute(key, compute)
+                with self._lock:
+                    self._local_put(key, value)
+                return value
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                event.set()
+
+    def _shared_get_or_compute(self, key: str, compute):
+        if self.shared is None:
+            self._count('miss')
+            return compute()
+
+        shared_key = f'memo:{self.name}:{key}'
+        value = self.shared.get(shared_key, _MISSING)
+        if value is not _MISSING:
+            self._count('shared_hit')
+            return value
+
+        # Another process computing the same key holds the lock entry - wait for its result
+        lock_key = f'{shared_key}:lock'
+        deadline = time.monotonic() + self.lock_timeout
+        owned = self.shared.add(lock_key, os.getpid(), expire=self.lock_timeout)
+        while not owned and time.monotonic() < deadline:
+            time.sleep(POLL_SECONDS)
+            value = self.shared.get(shared_key, _MISSING)
+            if value is not _MISSING:
+                self._count('shared_hit')
+                return value
+            owned = self.shared.add(lock_key, os.getpid(), expire=self.lock_timeout)
+
+        try:
+            self._count('miss')
+            value = compute()
+            try:
+                self.shared.set(shared_key, value, expire=self.ttl)
+            except (pickle.PicklingError, TypeError, AttributeError):
+                pass  # not picklable - in-process tier only
+            return value
+        finally:
+            if owned:
+                self.shared.delete(lock_key)
+
+    def info(self) -> dict:
+        with self._lock:
+            return {**self.counts, 'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.shared is not None:
+            prefix = f'memo:{self.name}:'
+            for key in list(self.shared.iterkeys()):
+                if isinstance(key, str) and key.startswith(prefix):
+                    self.shared.delete(key)
+
+
+def _source_digest(func) -> str:
+    """Digest of the source file func is defined in - its bytecode and constants if the file cannot be read."""
+    try:
+        source = Path(inspect.getsourcefile(func)).read_bytes()
+    except (OSError, TypeError):
+        source = func.__code__.co_code + repr(func.__code__.co_consts).encode()
+    return hashlib.blake2b(source, digest_size=4).hexdigest()
+
+
+def memoized_callback(maxsize: int = 128, ttl: float = None, shared=None, vary_on_trigger: bool = False,
+                      lock_timeout: float = LOCK_TIMEOUT, version=None):
+    """
+    shared - None for in-process only, True for the default shared directory, a directory, or a diskcache.Cache
+    ttl - seconds an entry is kept; None keeps it until evicted, or SHARED_TTL with a shared tier
+    version - JSON-like value, or a callable returning one, added to every key (data version, helper settings)
+    """
+    def decorator(func):
+        # Scripts all run as __main__, so name by file; the source digest retires shared entries on code changes
+        path = Path(func.__code__.co_filename)
+        cache = MemoCache(f'{path.parent.name}/{path.stem}.{func.__qualname__}.{_source_digest(func)}',
+                          maxsize=maxsize, ttl=SHARED_TTL if ttl is None and shared else ttl, shared=shared,
+                          lock_timeout=lock_timeout)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trigger = None
+            if vary_on_trigger:
+                try:
+                    trigger = sorted(ctx.triggered_prop_ids)
+                except MissingCallbackContextException:
+                    pass  # called directly, outside a request
+            key = normalize_key(version() if callable(version) else version, trigger, *args, **kwargs)
+            return cache.get_or_compute(key, lambda: func(*args, **kwargs))
+
+        wrapper.cache = cache
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
@@ -0,0 +1,185 @@
+import bisect
+import cProfile
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+import flask
+import plotly.io.json as plotly_json
+
+from common import memoize
+
+
+# CALLBACK METRICS
+# ======================================================================================================================
+# install_metrics(app) hooks the Flask server behind a Dash app and records, for every
+# /_dash-update-component request:
+#   - the callback (its output id) and the ids of its inputs
+#   - compute time and JSON serialization time, separately
+#   - request and response bytes
+# and serves them as Prometheus text on /metrics.
+#
+# Serialization is timed by wrapping plotly's to_json_plotly, which dash uses to encode responses; compute
+# is the rest of the request. Per request this costs two perf_counter calls and a few dict / list updates
+# under a lock, so it can stay on under load.
+#
+# With profile_dir set, a sampled fraction of requests runs under cProfile and the slowest few profiles per
+# callback are kept as <callback>.<ms>ms.prof (open with snakeviz or pstats).
+SECONDS_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+UPDATE_PATH = '_dash-update-component'
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class CallbackMetrics:
+    def __init__(self, profile_dir: str = None, profile_sample_rate: float = 0.01, profiles_per_callback: int = 5):
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.profile_sample_rate = profile_sample_rate
+        self.profiles_per_callback = profiles_per_callback
+        if self.profile_dir:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._series = {}    # (callback, inputs) -> dict of histograms
+        self._requests = {}  # (callback, status) -> count
+        self._slowest = {}   # callback -> sorted [(seconds, path)]
+
+    def record(self, callback: str, inputs: str, status: int, compute: float, serialize: float,
+               request_bytes: int, response_bytes: int):
+        with self._lock:
+            series = self._series.get((callback, inputs))
+            if series is None:
+                series = self._series[(callback, inputs)] = {
+                    'compute': Histogram(SECONDS_BUCKETS), 'serialize': Histogram(SECONDS_BUCKETS),
+                    'request_bytes': Histogram(BYTES_BUCKETS), 'response_bytes': Histogram(BYTES_BUCKETS)}
+            series['compute'].observe(compute)
+            series['serialize'].observe(serialize)
+            series['request_bytes'].observe(request_bytes)
+            series['response_bytes'].observe(response_bytes)
+            self._requests[(callback, status)] = self._requests.get((callback, status), 0) + 1
+
+    def keep_profile(self, callback: str, seconds: float, profiler: cProfile.Profile):
+        """Dump the profile if it is among the slowest seen for this callback."""
+        with self._lock:
+            slowest = self._slowest.setdefault(callback, [])
+            if len(slowest) >= self.profiles_per_callback and seconds <= slowest[0][0]:
+                return
+            safe = ''.join(c if c.isalnum() or c in '-_' else '_' for c in callback.strip('.'))[:80]
+            path = self.profile_dir / f'{safe}.{seconds * 1e3:.0f}ms.{os.getpid()}.prof'
+            bisect.insort(slowest, (seconds, str(path)))
+            dropped = slowest.pop(0) if len(slowest) > self.profiles_per_callback else None
+        profiler.dump_stats(path)
+        if dropped:
+            Path(dropped[1]).unlink(missing_ok=True)
+
+    def prometheus(self) -> str:
+        lines = ['# HELP dash_callback_requests_total Callback requests by HTTP status.',
+                 '# TYPE dash_callback_requests_total counter']
+        with self._lock:
+            for (callback, status), count in sorted(self._requests.items()):
+                lines.append(f'dash_callback_requests_total{{callback="{_escape(callback)}",status="{status}"}} {count}')
+
+            for metric, help_text in [('compute', 'Time in the callback and dash dispatch, excluding JSON encoding.'),
+                                      ('serialize', 'Time encoding the callback response as JSON.'),
+                                      ('request_bytes', 'Size of the callback request body.'),
+                                      ('response_bytes', 'Size of the callback response body.')]:
+                name = f'dash_callback_{metric}_seconds' if metric in ('compute', 'serialize') else f'dash_callback_{metric}'
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (callback, inputs), series in sorted(self._series.items()):
+                    labels = f'callback="{_escape(callback)}",inputs="{_escape(inputs)}"'
+                    lines.extend(series[metric].lines(name, labels))
+
+        lines += ['# HELP dash_memoized_calls_total Memoized callback lookups by outcome.',
+                  '# TYPE dash_memoized_calls_total counter']
+        for cache in memoize.caches:
+            info = cache.info()
+            for outcome in cache.counts:
+                lines.append(f'dash_memoized_calls_total{{function="{_escape(cache.name)}",outcome="{outcome}"}} '
+                             f'{info[outcome]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Serialization timing - one wrapper for the whole process, accumulating into the current request
+_to_json_plotly = plotly_json.to_json_plotly
+
+
+def _timed_to_json_plotly(*args, **kwargs):
+    if not flask.has_request_context():
+        return _to_json_plotly(*args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return _to_json_plotly(*args, **kwargs)
+    finally:
+        flask.g.dash_metrics_serialize = flask.g.get('dash_metrics_serialize', 0.0) + time.perf_counter() - start
+
+
+def install_metrics(app, path: str = '/metrics', profile_dir: str = None, profile_sample_rate: float = 0.01):
+    """Instrument app's Flask server and serve the metrics on path. Returns the CallbackMetrics."""
+    metrics = CallbackMetrics(profile_dir=profile_dir or os.environ.get('DASH_PROFILE_DIR'),
+                              profile_sample_rate=profile_sample_rate)
+    plotly_json.to_json_plotly = _timed_to_json_plotly
+    server = app.server
+    update_path = app.config.routes_pathname_prefix + UPDATE_PATH
+
+    @server.before_request
+    def _start_timer():
+        if flask.request.path != update_path:
+            return
+        flask.g.dash_metrics_start = time.perf_counter()
+        flask.g.dash_metrics_serialize = 0.0
+        if metrics.profile_dir and random.random() < metrics.profile_sample_rate:
+            flask.g.dash_metrics_profiler = cProfile.Profile()
+            flask.g.dash_metrics_profiler.enable()
+
+    @server.after_request
+    def _record(response):
+        start = flask.g.get('dash_metrics_start')
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        profiler = flask.g.get('dash_metrics_profiler')
+        if profiler:
+            profiler.disable()
+
+        body = flask.request.get_json(silent=True) or {}
+        callback = body.get('output', 'unknown')
+        inputs = ','.join(f"{i.get('id')}.{i.get('property')}" for i in body.get('inputs', []) if isinstance(i, dict))
+        serialize = flask.g.get('dash_metrics_serialize', 0.0)
+        response_bytes = response.calculate_content_length() or 0
+        metrics.record(callback, inputs, response.status_code, max(total - serialize, 0.0), serialize,
+                       flask.request.content_length or 0, response_bytes)
+        if profiler:
+            metrics.keep_profile(callback, total, profiler)
+        return response
+
+    @server.route(path)
+    def _metrics():
+        return flask.Response(metrics.prometheus(), mimetype='text/plain; version=0.0.4')
+
+    return metrics
@@ -0,0 +1,123 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import psutil
+
+
+# MODEL JOBS
+# ======================================================================================================================
+# Runs one model computation per currency concurrently on a process pool. Meant to be called from a Dash
+# background callback (DiskcacheManager), so the web worker is never blocked and Dash cancels the job -
+# pool processes included - when a newer run of the same callback starts.
+#
+# Results live in the diskcache shared by every process, keyed by (cob, currency):
+#   - a finished result is reused instead of recomputed (identical runs for the same CoB are deduplicated)
+#   - a currency already being computed by another live job is waited on rather than started twice
+#   - each result is stored with a version stamp (result_version), so caches built from it can key on it
+RESULT_TTL = 24 * 3600
+POLL_SECONDS = 0.25
+
+
+def result_key(cob: str, currency: str) -> str:
+    return f'fva-result:{cob}:{currency}'
+
+
+def _running_key(cob: str, currency: str) -> str:
+    return f'fva-running:{cob}:{currency}'
+
+
+def _version_key(cob: str, currency: str) -> str:
+    return f'fva-version:{cob}:{currency}'
+
+
+def get_result(cache, cob: str, currency: str):
+    return cache.get(result_key(cob, currency))
+
+
+def result_version(cache, cob: str, currency: str):
+    """Stamp of the stored result of (cob, currency), None if there is none - without loading the result."""
+    return cache.get(_version_key(cob, currency))
+
+
+def _set_result(cache, cob: str, currency: str, result):
+    # One transaction, so a reader never sees a new result with the old stamp; both expire together
+    with cache.transact():
+        cache.set(result_key(cob, currency), result, expire=RESULT_TTL)
+        cache.set(_version_key(cob, currency), time.time(), expire=RESULT_TTL)
+
+
+def run_currencies(cache, model, cob: str, currencies: list, args: tuple = (), progress=None,
+                   timeout: float = 3600) -> dict:
+    """
+    Computes model(currency, cob, *args) for every currency that has no cached result yet.
+
+    progress(status) is called whenever a currency starts or finishes, where status maps
+    currency -> {'state': 'cached' | 'running' | 'waiting' | 'done', 'seconds': float}.
+    Returns the final status.
+    """
+    status, started = {}, {}
+    pending, waiting = {}, set()
+
+    def report():
+        if progress:
+            progress({ccy: dict(s) for ccy, s in status.items()})
+
+    def claim(ccy):
+        # cache.add is atomic across processes - only one job gets to compute a (cob, currency)
+        key = _running_key(cob, ccy)
+        if cache.add(key, os.getpid(), expire=timeout):
+            return True
+        owner = cache.get(key)
+        if owner is not None and not psutil.pid_exists(owner):
+            # The job that claimed it was cancelled or died - take over
+            cache.delete(key)
+            return cache.add(key, os.getpid(), expire=timeout)
+        return False
+
+    with ProcessPoolExecutor(max_workers=max(1, len(currencies))) as pool:
+        def submit(ccy):
+            started[ccy] = time.perf_counter()
+            pending[pool.submit(model, ccy, cob, *args)] = ccy
+            status[ccy] = {'state': 'running', 'seconds': 0.0}
+
+        for ccy in currencies:
+            if get_result(cache, cob, ccy) is not None:
+                status[ccy] = {'state': 'cached', 'seconds': 0.0}
+            elif claim(ccy):
+                submit(ccy)
+            else:
+                waiting.add(ccy)
+                started[ccy] = time.perf_counter()
+                status[ccy] = {'state': 'waiting', 'seconds': 0.0}
+        report()
+
+        while pending or waiting:
+            if pending:
+                done, _ = wait(pending, timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+            else:
+                done = set()
+                time.sleep(POLL_SECONDS)
+            changed = bool(done)
+            for future in done:
+                ccy = pending.pop(future)
+                try:
+                    _set_result(cache, cob, ccy, future.result())
+                finally:
+                    cache.delete(_running_key(cob, ccy))
+                status[ccy] = {'state': 'done', 'seconds': time.perf_counter() - started[ccy]}
+
+            for ccy in list(waiting):
+                if get_result(cache, cob, ccy) is not None:
+                    status[ccy] = {'state': 'done', 'seconds': time.perf_counter() - started[ccy]}
+                elif claim(ccy):
+                    submit(ccy)
+                else:
+                    continue
+                waiting.discard(ccy)
+                changed = True
+
+            if changed:
+                report()
+
+    return status
@@ -0,0 +1,344 @@
+import os
+import selectors
+import socket
+import threading
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from plotly.io.json import to_json_plotly
+
+
+# PUSH CHANNEL
+# ======================================================================================================================
+# Live updates pushed to the browser as Server-Sent Events (an EventSource on the page) instead of every client
+# polling with dcc.Interval - a poll is a full Dash callback request per client per tick, a push is a write of
+# bytes already encoded once for everyone:
+#
+#   hub = PushHub(port=8051)
+#   hub.start()                               # in the process that computes the updates
+#   hub.publish('GBP', {'tables': ...})       # from the feed, at whatever rate it ticks
+#
+#   new EventSource('http://host:8051/GBP?interval=0.5')
+#
+# One thread runs a selectors loop over every session, so a session costs a socket and a few attributes, not
+# a thread or a worker slot. What a topic carries is a latest value, not a log:
+# - publish() encodes the message once and keeps it as the topic's latest frame, with a version number
+# - coalescing: a session is sent the latest frame when it is due - at most one every `interval` seconds,
+#   asked by the client, never below min_interval - so ticks arriving faster than a client renders are
+#   skipped, not queued. Skipped frames are counted in stats['coalesced'].
+# - backpressure: sends never block. A session holds at most the one frame being written; while the socket
+#   is full newer ticks just replace the latest frame, and the session gets that one when it drains. The
+#   socket send buffer is kept small so a slow client cannot soak up minutes of frames in the kernel. A
+#   session that has not taken a byte for stall_timeout seconds is dropped (the EventSource reconnects).
+# - a comment line every `heartbeat` seconds keeps idle connections open through proxies and finds dead ones
+#
+# The hub listens on its own port, next to the Dash server: the WSGI servers here hand a request to a pool
+# thread until it returns, so a long-lived stream would hold a thread per client. Under the launcher
+# (common/launcher.py) call start() in the designated worker only (launcher.designated_worker()), never before
+# the fork: that process binds the port and serves every session. While another process holds the port -
+# the worker a reload is replacing - start() returns False and tries again after BIND_RETRY seconds.
+# The hub binds the host the Dash server is on (HOST, which the launcher sets from --host), or LIVE_HOST, so
+# a page reaching Dash at some hostname reaches the hub there too. Only those pages may read the stream: a
+# browser request's Origin must be the app's (PORT on the hostname the hub was reached at) or one of
+# `origins`, and is echoed back as the only allowed origin. A connection that has not sent its request
+# within HEADER_TIMEOUT seconds is closed.
+#
+# Measured with benchmarks/bench_live.py, the 06_dash viewer at 2 updates/s per session, 1 vCPU shared with
+# the clients: polling an Interval callback costs the server 1.2-1.6 ms per update (~400 sessions per core),
+# a pushed frame 0.016-0.03 ms from 100 sessions up (~30,000 per core; 2000 sessions used 8% of the core).
+LIVE_PORT = int(os.environ.get('LIVE_PORT', 8051))
+MIN_INTERVAL = 0.1
+STALL_TIMEOUT = 10.0
+HEARTBEAT = 15.0
+SEND_BUFFER = 64 * 1024
+MAX_REQUEST = 8192
+HEADER_TIMEOUT = 5.0
+BIND_RETRY = 2.0
+
+_HEADERS = (b'HTTP/1.1 200 OK\r\n'
+            b'Content-Type: text/event-stream\r\n'
+            b'Cache-Control: no-cache\r\n'
+            b'Connection: keep-alive\r\n')
+_HEADERS_END = b'\r\nretry: 2000\n\n'
+_NOT_FOUND = b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n'
+_FORBIDDEN = b'HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\nConnection: close\r\n\r\n'
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+class _Session:
+    __slots__ = ('sock', 'topic', 'interval', 'request', 'buffer', 'version', 'due', 'opened', 'last_write',
+                 'blocked_since', 'writing')
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.topic = None  # None until the request is read
+        self.interval = 0.0
+        self.request = b''
+        self.buffer = b''
+        self.version = 0
+        self.due = 0.0
+        self.opened = self.last_write = time.monotonic()
+        self.blocked_since = None
+        self.writing = False
+
+
+class PushHub:
+    def __init__(self, host: str = None, port: int = LIVE_PORT, topics=None, min_interval: float = 0.5,
+                 stall_timeout: float = STALL_TIMEOUT, heartbeat: float = HEARTBEAT, origins=None,
+                 header_timeout: float = HEADER_TIMEOUT):
+        """
+        host - None for LIVE_HOST, else the Dash server's HOST, read when the hub starts
+        topics - the topics a client may subscribe to, None for any
+        min_interval - default seconds between frames to a session; a client may ask for more, or for less
+                       down to MIN_INTERVAL, with ?interval= on the URL
+        origins - page origins allowed to read the stream, e.g. ['https://viewer.example.com'];
+                  None for the Dash app's own (its PORT, on the hostname the hub was reached at)
+        """
+        self.host = host
+        self.port = port
+        self.topics = set(topics) if topics is not None else None
+        self.origins = set(origins) if origins is not None else None
+        self.header_timeout = header_timeout
+        self.min_interval = min_interval
+        self.stall_timeout = stall_timeout
+        self.heartbeat = heartbeat
+        self.stats = {'sessions': 0, 'accepted': 0, 'published': 0, 'frames': 0, 'coalesced': 0, 'bytes': 0,
+                      'dropped': 0}
+
+        self._latest = {}        # topic -> (version, frame)
+        self._dirty = set()      # topics published since the loop last looked
+        self._lock = threading.Lock()
+        self._subscribers = {}   # topic -> set of sessions
+        self._pending = set()    # sessions whose request has not been read yet
+        self._waiting = set()    # sessions with a newer frame, not due yet
+        self._selector = None
+        self._wake = None
+        self._pid = None         # process that started the hub
+        self._retry_at = 0.0     # monotonic time start() may try to bind again after the port was taken
+
+    # Starting and publishing
+    # ------------------------------------------------------------------------------------------------------------------
+    def start(self) -> bool:
+        """Binds the port and starts the loop thread. False if already started, or while the port is taken."""
+        if self._pid is not None or time.monotonic() < self._retry_at:
+            return False
+        if self.host is None:
+            self.host = os.environ.get('LIVE_HOST', os.environ.get('HOST', '127.0.0.1'))
+        try:
+            listener = socket.create_server((self.host, self.port), backlog=1024)
+        except OSError:
+            self._retry_at = time.monotonic() + BIND_RETRY
+            return False  # another process serves the port
+        self._pid = os.getpid()
+        listener.setblocking(False)
+
+        self._selector = selectors.DefaultSelector()
+        self._wake, wake_reader = socket.socketpair()
+        self._wake.setblocking(False)
+        wake_reader.setblocking(False)
+        self._selector.register(listener, selectors.EVENT_READ, 'accept')
+        self._selector.register(wake_reader, selectors.EVENT_READ, 'wake')
+        threading.Thread(target=self._run, name='push-hub', daemon=True).start()
+        return True
+
+    def publish(self, topic: str, message):
+        """Encodes message once as the topic's latest frame; sessions get it, or a later one, when they are due."""
+        frame = b'data: ' + to_json_plotly(message).encode() + b'\n\n'
+        with self._lock:
+            version = self._latest.get(topic, (0, b''))[0] + 1
+            self._latest[topic] = (version, frame)
+            self._dirty.add(topic)
+            self.stats['published'] += 1
+        if self._wake is not None:
+            try:
+                self._wake.send(b'\0')
+            except (BlockingIOError, OSError):
+                pass  # the loop already has a wake-up pending
+
+    def subscribers(self, topic: str) -> int:
+        """Sessions on a topic - a feed can skip computing topics nobody watches."""
+        return len(self._subscribers.get(topic, ()))
+
+    # Event loop
+    # ------------------------------------------------------------------------------------------------------------------
+    def _run(self):
+        next_sweep = 0.0
+        while True:
+            now = time.monotonic()
+            due = min((s.due for s in self._waiting), default=now + 1.0)
+            for key, events in self._selector.select(max(0.0, min(due, next_sweep) - now)):
+                if key.data == 'accept':
+                    self._accept(key.fileobj)
+                elif key.data == 'wake':
+                    try:
+                        while key.fileobj.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    session = key.data
+                    if events & selectors.EVENT_READ:
+                        self._read(session)
+                    if events & selectors.EVENT_WRITE and session.sock.fileno() >= 0:
+                        self._flush(session, time.monotonic())
+
+            now = time.monotonic()
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+            for topic in dirty:
+                for session in list(self._subscribers.get(topic, ())):
+                    self._pump(session, now)
+            for session in [s for s in self._waiting if s.due <= now]:
+                self._waiting.discard(session)
+                self._pump(session, now)
+            if now >= next_sweep:
+                self._sweep(now)
+                next_sweep = now + 1.0
+
+    def _accept(self, listener):
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except (BlockingIOError, OSError):
+                return
+            sock.setblocking(False)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            session = _Session(sock)
+            self._selector.register(sock, selectors.EVENT_READ, session)
+            self._pending.add(session)
+            self.stats['accepted'] += 1
+
+    def _read(self, session: _Session):
+        try:
+            data = session.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self._close(session)
+            return
+        if session.topic is not None:
+            return  # nothing more is expected from an EventSource
+        session.request += data
+        if b'\r\n\r\n' not in session.request:
+            if len(session.request) > MAX_REQUEST:
+                self._close(session)
+            return
+
+        # GET /<topic>?interval=<seconds> HTTP/1.1
+        lines = session.request.split(b'\r\n\r\n', 1)[0].decode('latin-1').split('\r\n')
+        headers = {name.strip().lower(): value.strip()
+                   for name, _, value in (line.partition(':') for line in lines[1:])}
+        parts = lines[0].split()
+        url = urlsplit(parts[1]) if len(parts) == 3 and parts[0] == 'GET' else None
+        topic = unquote(url.path.strip('/')) if url else None
+        origin = headers.get('origin')
+        if not topic or (self.topics is not None and topic not in self.topics):
+            self._refuse(session, _NOT_FOUND)
+            return
+        if origin is not None and not self._allowed(origin, headers.get('host', '')):
+            self._refuse(session, _FORBIDDEN)
+            return
+        try:
+            interval = float(parse_qs(url.query).get('interval', [self.min_interval])[0])
+        except ValueError:
+            interval = self.min_interval
+        session.topic, session.request = topic, b''
+        session.interval = max(MIN_INTERVAL, interval)
+        self._pending.discard(session)
+        self._subscribers.setdefault(topic, set()).add(session)
+        self.stats['sessions'] += 1
+
+        # Non-browser clients send no Origin and need no CORS header
+        allow = f'Access-Control-Allow-Origin: {origin}\r\nVary: Origin\r\n'.encode('latin-1') if origin else b''
+        session.buffer = _HEADERS + allow + _HEADERS_END
+        self._flush(session, time.monotonic())
+
+    def _allowed(self, origin: str, host: str) -> bool:
+        """Whether a page of this origin may read the stream - by default, a page of the Dash app."""
+        if self.origins is not None:
+            return origin in self.origins
+        page, hub = urlsplit(origin), urlsplit(f'//{host}')
+        try:
+            port = page.port or _DEFAULT_PORTS.get(page.scheme)
+        except ValueError:
+            return False
+        return (page.scheme in _DEFAULT_PORTS and page.hostname is not None and page.hostname == hub.hostname
+                and port == int(os.environ.get('PORT', 8050)))
+
+    def _refuse(self, session: _Session, response: bytes):
+        try:
+            session.sock.send(response)
+        except OSError:
+            pass
+        self._close(session)
+
+    def _pump(self, session: _Session, now: float):
+        """Hands the session the topic's latest frame if it has not had it, is due and is not still writing."""
+        if session.buffer or session.sock.fileno() < 0:
+            return  # _flush pumps again once the socket drains
+        version, frame = self._latest.get(session.topic, (0, b''))
+        if version <= session.version:
+            return
+        if now < session.due:
+            self._waiting.add(session)
+            return
+        if session.version:
+            self.stats['coalesced'] += version - session.version - 1
+        session.buffer, session.version, session.due = frame, version, now + session.interval
+        self.stats['frames'] += 1
+        self._flush(session, now)
+
+    def _flush(self, session: _Session, now: float):
+        try:
+            sent = session.sock.send(session.buffer)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._close(session)
+            return
+        self.stats['bytes'] += sent
+        if sent:
+            session.last_write = now
+        session.buffer = session.buffer[sent:]
+
+        if session.buffer:
+            if session.blocked_since is None:
+                session.blocked_since = now
+            if not session.writing:
+                self._selector.modify(session.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, session)
+                session.writing = True
+            return
+        session.blocked_since = None
+        if session.writing:
+            self._selector.modify(session.sock, selectors.EVENT_READ, session)
+            session.writing = False
+        if session.topic is not None:
+            self._pump(session, now)
+
+    def _sweep(self, now: float):
+        """Drops stalled sessions and ones that never sent their request, and sends heartbeats to idle ones."""
+        for session in [s for s in self._pending if now - s.opened > self.header_timeout]:
+            self.stats['dropped'] += 1
+            self._close(session)
+        for topic_sessions in list(self._subscribers.values()):
+            for session in list(topic_sessions):
+                if session.blocked_since is not None and now - session.blocked_since > self.stall_timeout:
+                    self.stats['dropped'] += 1
+                    self._close(session)
+                elif not session.buffer and now - session.last_write > self.heartbeat:
+                    session.buffer = b': \n\n'
+                    self._flush(session, now)
+
+    def _close(self, session: _Session):
+        if session.sock.fileno() < 0:
+            return
+        if session.topic is not None:
+            self._subscribers.get(session.topic, set()).discard(session)
+            self.stats['sessions'] -= 1
+        self._pending.discard(session)
+        self._waiting.discard(session)
+        self._selector.unregister(session.sock)
+        session.sock.close()
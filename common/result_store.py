@@ -0,0 +1,245 @@
+import math
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common.store_codec import frame_from_bytes, frame_to_bytes
+
+
+# SERVER-SIDE RESULT STORE
+# ======================================================================================================================
+# Callbacks put large results (DataFrames, arrays) here and return only the key to the browser, so a
+# dcc.Store carries a few bytes instead of the whole frame. Downstream callbacks resolve the key back
+# to the in-memory object.
+#
+# Two tiers:
+#   - memory: per-process LRU bounded by an estimate of the bytes held, with a TTL per entry. Pinned entries
+#     (ttl=None) count towards the bound but are never evicted.
+#   - disk (optional): a directory shared by every worker process. Entries are written through on put,
+#     so a key created by one worker resolves in any other, and memory evictions can be reloaded. Only
+#     DataFrames go to disk, encoded with common/store_codec.py rather than pickled: reading a file back
+#     cannot run code, whoever wrote it.
+#
+# store_from_env() spills to RESULT_STORE_DIR, by default .cache/results next to .cache/callbacks and
+# .cache/jobs, so the launcher's workers share it. Without a spill directory (RESULT_STORE_DIR='') the
+# store is process-local: only run a single worker process in that case.
+ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = ROOT / '.cache' / 'results'
+
+
+def estimate_size(obj) -> int:
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    return sys.getsizeof(obj)
+
+
+class ResultStore:
+    def __init__(self, max_bytes: int = 256 * 2**20, ttl: float = 3600, spill_dir: str = None,
+                 max_disk_bytes: int = None, sweep_interval: float = 60):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.time()
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.max_disk_bytes = max_disk_bytes
+        if self.spill_dir:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries = OrderedDict()  # key -> (obj, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # Public API
+    # ------------------------------------------------------------------------------------------------------------------
+    def put(self, obj, key: str = None, ttl: float = -1) -> str:
+        """
+        Store an object and return its key. ttl=None pins the entry, the default (-1) uses the store ttl.
+        """
+        key = key or uuid.uuid4().hex
+        if not _is_safe_key(key):
+            raise ValueError(f'Invalid result store key: {key!r}')
+        ttl = self.ttl if ttl == -1 else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+
+        if self.spill_dir:
+            if not isinstance(obj, pd.DataFrame):
+                raise TypeError(f'The disk tier holds DataFrames only, not {type(obj).__name__}')
+            self._write(key, obj, expires_at)
+        self._remember(key, obj, expires_at)
+
+        if time.time() - self._last_sweep > self.sweep_interval:
+            self._last_sweep = time.time()
+            self.sweep()
+        return key
+
+    def get(self, key: str, default=None):
+        if not key or not _is_safe_key(key):
+            return default
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                obj, size, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return obj
+                self._drop(key)
+
+        loaded = self._read(key) if self.spill_dir else None
+        if loaded is None:
+            with self._lock:
+                self.misses += 1
+            return default
+
+        obj, expires_at = loaded
+        with self._lock:
+            self.hits += 1
+        self._remember(key, obj, expires_at)
+        return obj
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, default=_MISSING) is not _MISSING
+
+    def delete(self, key: str):
+        with self._lock:
+            self._drop(key)
+        if self.spill_dir:
+            self._path(key).unlink(missing_ok=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def sweep(self):
+        """Remove expired entries from both tiers and trim the disk tier to max_disk_bytes."""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (_, _, exp) in self._entries.items() if exp is not None and exp <= now]:
+                self._drop(key)
+
+        if not self.spill_dir:
+            return
+
+        files = []
+        for path in self.spill_dir.glob('*.frame'):
+            try:
+                stat = path.stat()
+                with open(path, 'rb') as f:
+                    expires_at = _read_expiry(f)
+            except FileNotFoundError:  # removed by another worker
+                continue
+            if expires_at is not None and expires_at <= now:
+                path.unlink(missing_ok=True)
+            else:
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        if self.max_disk_bytes is not None:
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_disk_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    # Memory tier
+    # ------------------------------------------------------------------------------------------------------------------
+    def _remember(self, key, obj, expires_at):
+        size = estimate_size(obj)
+        with self._lock:
+            self._drop(key)
+            if size > self.max_bytes:
+                # Too big for the memory tier - only reachable through the disk tier
+                return
+            self._entries[key] = (obj, size, expires_at)
+            self._bytes += size
+            if self._bytes > self.max_bytes:
+                # Least recently used first; pinned entries (ttl=None) are never evicted
+                for old in [k for k, (_, _, exp) in self._entries.items() if exp is not None and k != key]:
+                    if self._bytes <= self.max_bytes:
+                        break
+                    self._drop(old)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    # Disk tier
+    # ------------------------------------------------------------------------------------------------------------------
+    # One file per key: an 8 byte expiry timestamp (NaN when pinned) followed by the encoded frame.
+    # Files are written to a temp name and renamed, so readers in other processes never see a partial file.
+    def _path(self, key: str) -> Path:
+        if not _is_safe_key(key):
+            raise ValueError(f'Invalid result store key: {key!r}')
+        return self.spill_dir / f'{key}.frame'
+
+    def _write(self, key, obj, expires_at):
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.spill_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(struct.pack('<d', math.nan if expires_at is None else expires_at))
+            f.write(frame_to_bytes(obj))
+        os.replace(tmp, path)
+
+    def _read(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at = _read_expiry(f)
+                if expires_at is not None and expires_at <= time.time():
+                    obj = _MISSING
+                else:
+                    obj = frame_from_bytes(f.read())
+        except FileNotFoundError:
+            return None
+
+        if obj is _MISSING:
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)  # keeps the disk tier LRU across workers
+        except FileNotFoundError:
+            pass
+        return obj, expires_at
+
+
+_MISSING = object()
+
+
+def _is_safe_key(key: str) -> bool:
+    return bool(key) and all(c.isalnum() or c in '-_' for c in key)
+
+
+def _read_expiry(f):
+    expires_at = struct.unpack('<d', f.read(8))[0]
+    return None if math.isnan(expires_at) else expires_at
+
+
+# Default store for the apps, shared by every worker process through RESULTS_DIR unless RESULT_STORE_DIR says otherwise
+def store_from_env() -> ResultStore:
+    return ResultStore(max_bytes=int(os.environ.get('RESULT_STORE_MAX_MB', 256)) * 2**20,
+                       ttl=float(os.environ.get('RESULT_STORE_TTL', 3600)),
+                       spill_dir=os.environ.get('RESULT_STORE_DIR', RESULTS_DIR) or None,
+                       max_disk_bytes=int(os.environ.get('RESULT_STORE_MAX_DISK_MB', 4096)) * 2**20)
@@ -0,0 +1,153 @@
+import io
+import json
+import zlib
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow is optional - the npy codec covers the same ground
+    pa = None
+
+
+# CODECS
+# ======================================================================================================================
+# A codec turns a DataFrame into bytes and back again, without pickle: decoding reads buffers and JSON, so a
+# file or payload from elsewhere cannot run code. The result store's disk tier (common/result_store.py) keeps
+# its frames this way.
+#
+# frame_to_bytes prefixes the payload with b'<name>:' so frame_from_bytes can tell the codecs apart.
+class JsonCodec:
+    name = 'json'
+
+    def to_bytes(self, df: pd.DataFrame) -> bytes:
+        return df.to_json(orient='split').encode()
+
+    def from_bytes(self, raw) -> pd.DataFrame:
+        return pd.read_json(io.BytesIO(bytes(raw)), orient='split')
+
+
+class NpyCodec:
+    """
+    (Optionally zlib compressed) raw numpy buffers.
+
+    Homogeneous frames are stored as one 2D block so that decoding is a single
+    np.frombuffer and the DataFrame wraps that buffer without copying.
+    Mixed frames fall back to one buffer per column. Index and column labels
+    travel in a small JSON header, as do object columns.
+    """
+    name = 'npy'
+
+    def __init__(self, level: int = 1):
+        self.level = level
+
+    def to_bytes(self, df: pd.DataFrame) -> bytes:
+        dtypes = df.dtypes.unique()
+        homogeneous = len(dtypes) == 1 and isinstance(dtypes[0], np.dtype) and dtypes[0] != object
+        if homogeneous:
+            blocks = [np.ascontiguousarray(df.to_numpy())]
+        else:
+            blocks = [np.ascontiguousarray(df[col].to_numpy()) for col in df.columns]
+
+        header = {'index': _labels_to_json(df.index),
+                  'columns': _labels_to_json(df.columns),
+                  'blocks': [[b.dtype.str, list(b.shape)] for b in blocks]}
+
+        raw = b''.join(b.tobytes() for b in blocks if b.dtype != object)
+        header['objects'] = [b.tolist() for b in blocks if b.dtype == object]
+        if self.level:
+            raw = zlib.compress(raw, self.level)
+        header['compressed'] = bool(self.level)
+
+        header_bytes = json.dumps(header, default=_json_default).encode()
+        return len(header_bytes).to_bytes(4, 'little') + header_bytes + raw
+
+    def from_bytes(self, raw) -> pd.DataFrame:
+        body = memoryview(raw)
+        size = int.from_bytes(body[:4], 'little')
+        header = json.loads(bytes(body[4:4 + size]))
+        raw = body[4 + size:]
+        if header['compressed']:
+            raw = memoryview(zlib.decompress(raw))
+
+        index = _labels_from_json(header['index'])
+        columns = _labels_from_json(header['columns'])
+
+        arrays, offset, objects = [], 0, iter(header['objects'])
+        for dtype, shape in header['blocks']:
+            dtype = np.dtype(dtype)
+            if dtype == object:
+                arrays.append(np.array(next(objects), dtype=object))
+                continue
+            count = int(np.prod(shape))
+            arrays.append(np.frombuffer(raw, dtype=dtype, count=count, offset=offset).reshape(shape))
+            offset += count * dtype.itemsize
+
+        if len(arrays) == 1 and arrays[0].ndim == 2:
+            return pd.DataFrame(arrays[0], index=index, columns=columns, copy=False)
+        return pd.DataFrame(dict(zip(range(len(arrays)), arrays)), index=index, copy=False).set_axis(columns, axis=1)
+
+
+class ArrowCodec:
+    """An Arrow IPC stream. Numeric columns without nulls decode zero-copy."""
+    name = 'arrow'
+
+    def to_bytes(self, df: pd.DataFrame) -> bytes:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def from_bytes(self, raw) -> pd.DataFrame:
+        table = pa.ipc.open_stream(pa.py_buffer(raw)).read_all()
+        return table.to_pandas(split_blocks=True, zero_copy_only=False)
+
+
+def _labels_to_json(labels: pd.Index):
+    return {'dtype': str(labels.dtype), 'values': labels.tolist()}
+
+
+def _labels_from_json(labels: dict) -> pd.Index:
+    return pd.Index(labels['values'], dtype=labels['dtype'])
+
+
+def _json_default(value):
+    # numpy scalars that end up in object columns / labels
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'{type(value).__name__} is not JSON serialisable')
+
+
+# REGISTRY
+# ======================================================================================================================
+CODECS = {codec.name: codec for codec in (JsonCodec(), NpyCodec())}
+if pa is not None:
+    CODECS[ArrowCodec.name] = ArrowCodec()
+
+DEFAULT_CODEC = 'arrow' if pa is not None else 'npy'
+
+
+def register_codec(codec):
+    CODECS[codec.name] = codec
+
+
+def get_codec(name: str = None):
+    return CODECS[name or DEFAULT_CODEC]
+
+
+def frame_to_bytes(df: pd.DataFrame, codec: str = None) -> bytes:
+    codec = get_codec(codec)
+    return codec.name.encode() + b':' + codec.to_bytes(df)
+
+
+def frame_from_bytes(raw) -> pd.DataFrame:
+    """Decodes frame_to_bytes output; ValueError for a codec this process does not have."""
+    raw = memoryview(raw)
+    name, sep, _ = bytes(raw[:16]).partition(b':')
+    codec = CODECS.get(name.decode('ascii', 'replace')) if sep else None
+    if codec is None:
+        raise ValueError(f'Not a known frame encoding: {bytes(raw[:16])!r}')
+    return codec.from_bytes(raw[len(name) + 1:])
+
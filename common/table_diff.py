@@ -0,0 +1,86 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+from dash import Patch, no_update
+
+
+# CELL-LEVEL TABLE UPDATES
+# ======================================================================================================================
+# A DataTable refreshed with to_dict('records') resends every cell, however few changed. table_update(old, new)
+# compares the frame the client was last sent with the new one and returns, for the table's data property:
+#   - no_update when nothing changed
+#   - a Patch assigning only the changed cells, when at most max_change_ratio of them changed - a row with
+#     most of its cells changed is assigned as a whole record instead
+#   - the full records otherwise (or when the shape / columns differ)
+# and the changed cells, for highlight_styles() to mark them through style_data_conditional.
+#
+# An Assign operation ({'operation': 'Assign', 'location': [row, column], 'params': {'value': ...}}) is
+# ~60 bytes where the same cell is ~10 in the records, which is why the ratio is low: measured with
+# benchmarks/bench_table_diff.py, a patch of 2% of the cells is a sixth of the records' size and one of
+# 10% four fifths of it.
+#
+# The caller keeps what each client was sent: frame_key(df) names a frame by its content, so the frame can
+# sit in the result store and only the key travel with the client (see the viewer tables in 06_dash).
+MAX_CHANGE_RATIO = 0.1
+ROW_RATIO = 0.5
+HIGHLIGHT = {'backgroundColor': '#806000', 'fontWeight': 'bold'}
+
+
+def frame_key(df: pd.DataFrame) -> str:
+    """Content hash of a frame - equal frames get the same key in every process."""
+    digest = hashlib.blake2b(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes(), digest_size=16)
+    digest.update('|'.join(map(str, df.columns)).encode())
+    return digest.hexdigest()
+
+
+def changed_cells(old: pd.DataFrame, new: pd.DataFrame):
+    """[(row, column)] of the cells of new that differ from old, or None if the two are not the same grid."""
+    if old.shape != new.shape or not old.columns.equals(new.columns):
+        return None
+    changed = []
+    for column in new.columns:
+        a, b = old[column].to_numpy(), new[column].to_numpy()
+        differs = a != b
+        if differs.any():
+            differs &= ~(pd.isna(a) & pd.isna(b))
+            changed.extend((row, column) for row in np.flatnonzero(differs).tolist())
+    return changed
+
+
+def table_update(old: pd.DataFrame, new: pd.DataFrame, max_change_ratio: float = MAX_CHANGE_RATIO):
+    """(value for the table's data property, changed cells) - see above. old may be None (not known)."""
+    changed = changed_cells(old, new) if old is not None else None
+    if changed is None:
+        return new.to_dict('records'), []
+    if not changed:
+        return no_update, []
+    if len(changed) > max_change_ratio * new.size:
+        return new.to_dict('records'), changed
+
+    by_row = {}
+    for row, column in changed:
+        by_row.setdefault(row, []).append(column)
+
+    whole = [row for row, columns in by_row.items() if len(columns) > ROW_RATIO * new.shape[1]]
+    records = dict(zip(whole, new.iloc[whole].to_dict('records')))
+
+    patch = Patch()
+    for row, columns in by_row.items():
+        if row in records:
+            patch[row] = records[row]
+            continue
+        for column in columns:
+            value = new[column].iat[row]
+            patch[row][column] = value.item() if isinstance(value, np.generic) else value
+    return patch, changed
+
+
+def highlight_styles(changed: list, base: list = (), style: dict = None) -> list:
+    """style_data_conditional: the table's own rules, then one rule per column with changed cells."""
+    style = style or HIGHLIGHT
+    rows = {}
+    for row, column in changed:
+        rows.setdefault(column, []).append(row)
+    return list(base) + [{'if': {'column_id': column, 'row_index': column_rows}, **style}
+                         for column, column_rows in rows.items()]
@@ -0,0 +1,181 @@
+import math
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# SERVER-SIDE TABLE ENGINE
+# ======================================================================================================================
+# Backend for a DataTable with page_action / sort_action / filter_action = 'custom'. The browser only ever
+# receives one page. Filters in the DataTable query language are turned into vectorized boolean masks and
+# sort orders are cached as row permutations of the full frame, so a page request is a couple of array
+# lookups once the sort / filter have been seen.
+#
+# Every record sent carries an 'id' with its global row number, which DataTable echoes back as
+# active_cell['row_id'] - use that (not active_cell['row'], which is relative to the page). A frame with its
+# own 'id' column keeps it, and row_id is then that id.
+
+# {col} <op> <value>  -  op may carry an 's' (case sensitive) or 'i' (insensitive) prefix
+_TERM = re.compile(r'^\s*\{(?P<col>(?:[^}\\]|\\.)+)\}\s+'
+                   r'(?P<op>[si]?(?:>=|<=|!=|=|>|<|eq|ne|lt|le|gt|ge|contains|datestartswith)'
+                   r'|is (?:blank|nil|num|str))'
+                   r'\s*(?P<value>.*?)\s*$')
+
+_OPERATORS = {'>=': 'ge', '<=': 'le', '!=': 'ne', '=': 'eq', '>': 'gt', '<': 'lt'}
+
+
+def parse_value(text: str):
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '"\'`':
+        return text[1:-1].replace('\\' + text[0], text[0])
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _as_text(value) -> str:
+    # parse_value turns 5 into 5.0 - compare text columns against '5'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def parse_filter(filter_query: str):
+    """
+    Split a filter query into [[(column, operator, value, case_sensitive), ...], ...] - OR of ANDs.
+    Terms that cannot be parsed are skipped, as the DataTable docs do.
+    """
+    clauses = []
+    for clause in (filter_query or '').split(' || '):
+        terms = []
+        for part in clause.split(' && '):
+            match = _TERM.match(part)
+            if not match:
+                continue
+            op = match['op']
+            case_sensitive = not op.startswith('i')
+            if op[0] in 'si' and not op.startswith('is '):
+                op = op[1:]
+            terms.append((match['col'].replace('\\}', '}'), _OPERATORS.get(op, op), parse_value(match['value']),
+                          case_sensitive))
+        if terms:
+            clauses.append(terms)
+    return clauses
+
+
+class TableEngine:
+    def __init__(self, df: pd.DataFrame, cache_size: int = 32):
+        self.df = df.reset_index(drop=True)
+        self.cache_size = cache_size
+        self._masks = OrderedDict()
+        self._orders = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Filtering
+    # ------------------------------------------------------------------------------------------------------------------
+    def mask(self, filter_query: str) -> np.ndarray:
+        return self._cached(self._masks, filter_query or '', lambda: self._build_mask(filter_query))
+
+    def _build_mask(self, filter_query: str) -> np.ndarray:
+        clauses = parse_filter(filter_query)
+        if not clauses:
+            return np.ones(len(self.df), dtype=bool)
+
+        result = np.zeros(len(self.df), dtype=bool)
+        for terms in clauses:
+            clause = np.ones(len(self.df), dtype=bool)
+            for col, op, value, case_sensitive in terms:
+                if col in self.df.columns:
+                    clause &= self._term(self.df[col], op, value, case_sensitive)
+            result |= clause
+        return result
+
+    @staticmethod
+    def _term(series: pd.Series, op: str, value, case_sensitive: bool) -> np.ndarray:
+        if op == 'is blank':
+            return (series.isna() | (series.astype(str).str.strip() == '')).to_numpy()
+        if op == 'is nil':
+            return series.isna().to_numpy()
+        if op == 'is num':
+            return np.full(len(series), pd.api.types.is_numeric_dtype(series))
+        if op == 'is str':
+            return np.full(len(series), pd.api.types.is_string_dtype(series))
+
+        present = series.notna().to_numpy()
+        if op in ('contains', 'datestartswith'):
+            text = series.astype(str)
+            value = _as_text(value)
+            if op == 'datestartswith':
+                matched = text.str.startswith(value)
+            else:
+                matched = text.str.contains(value, regex=False, case=case_sensitive)
+            return matched.fillna(False).to_numpy(dtype=bool) & present
+
+        numeric = pd.api.types.is_numeric_dtype(series)
+        if numeric and isinstance(value, str):
+            return np.zeros(len(series), dtype=bool)
+        if not numeric:
+            series = series.astype(str)
+            value = _as_text(value)
+            if not case_sensitive:
+                series, value = series.str.lower(), value.lower()
+        return getattr(series, op)(value).fillna(False).to_numpy(dtype=bool) & present
+
+    # Sorting
+    # ------------------------------------------------------------------------------------------------------------------
+    def order(self, sort_by: list) -> np.ndarray:
+        key = tuple((s['column_id'], s['direction']) for s in sort_by or [] if s['column_id'] in self.df.columns)
+        return self._cached(self._orders, key, lambda: self._build_order(key))
+
+    def _build_order(self, key: tuple) -> np.ndarray:
+        if not key:
+            return np.arange(len(self.df))
+        # Rank every column as integer codes so mixed / object columns sort with one lexsort.
+        # Missing values rank last whatever the direction.
+        keys = []
+        for col, direction in key:
+            codes, _ = pd.factorize(self.df[col], sort=True)
+            missing = codes < 0
+            if direction == 'desc':
+                codes = codes.max(initial=0) - codes
+            keys.append(np.where(missing, len(self.df), codes))
+        return np.lexsort(keys[::-1])
+
+    # Paging
+    # ------------------------------------------------------------------------------------------------------------------
+    def rows(self, sort_by: list = None, filter_query: str = None) -> np.ndarray:
+        """Global row numbers that pass the filter, in sort order."""
+        order = self.order(sort_by)
+        return order[self.mask(filter_query)[order]]
+
+    def page(self, page_current: int, page_size: int, sort_by: list = None, filter_query: str = None):
+        """
+        Returns (records, page_count, page_current) for one page of the filtered, sorted frame. page_current is
+        clamped to the last page, e.g. when a filter leaves fewer pages than the table was on.
+        """
+        rows = self.rows(sort_by, filter_query)
+        page_count = max(1, math.ceil(len(rows) / page_size))
+        page_current = min(max(page_current or 0, 0), page_count - 1)
+        start = page_current * page_size
+        selected = rows[start:start + page_size]
+
+        records = self.df.iloc[selected].to_dict('records')
+        if 'id' not in self.df.columns:
+            for record, row in zip(records, selected.tolist()):
+                record['id'] = row
+        return records, page_count, page_current
+
+    def _cached(self, cache: OrderedDict, key, build):
+        with self._lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        value = build()
+        with self._lock:
+            cache[key] = value
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return value